@@ -5,50 +5,231 @@ This script generates a complete DOCX manual with screenshots, API documentation
 """
 
 from docx import Document
-from docx.shared import Inches, Pt, RGBColor
+from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.style import WD_STYLE_TYPE
+import argparse
+import datetime
+import json
 import os
 import glob
+from concurrent.futures import ProcessPoolExecutor
 
-def add_screenshot(doc, image_path, caption=''):
-    """Add a screenshot image to the document with optional caption"""
-    full_path = os.path.join(os.getcwd(), image_path)
-    if os.path.exists(full_path):
-        try:
-            # Add the image with a reasonable width (6 inches)
-            doc.add_picture(full_path, width=Inches(6.0))
-            # Center the image
-            last_paragraph = doc.paragraphs[-1]
-            last_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            # Add caption if provided
-            if caption:
-                p = doc.add_paragraph(caption)
-                p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                p.runs[0].font.size = Pt(10)
-                p.runs[0].font.italic = True
-                p.runs[0].font.color.rgb = RGBColor(128, 128, 128)
-            
-            doc.add_paragraph()  # Add spacing after image
-        except Exception as e:
-            doc.add_paragraph(f'📸 Screenshot: {image_path} (Image could not be loaded: {e})')
+from manual.api_index import ROUTE_FILES, api_routes, describe_response, error_statuses, format_shape, success_response
+from manual.assets import asset_digest
+from manual.batch import employee_records, load_pending_requests, write_employee_documents
+from manual.emit import add_paragraphs, add_table
+from manual.cache import CACHE_DIR, cache_path, file_digest, make_key, write_atomic
+from manual.fragments import build_fragments, builder_assets, builder_data_files, fragment_size, uses_files
+from manual.content import add_content, content_files
+from manual.images import SCREENSHOT_SETTINGS, add_screenshot
+from manual.model import document_model, fragment_model
+from manual.package import OUTPUT_BACKENDS, package_date_time
+from manual.render import RENDERERS, check_output_dir
+from manual.size import check_budgets, parse_budgets, print_size_report, size_report
+from manual.trace import enable_trace, finish_trace, instrument, span, summarize
+from manual.watch import code_files, serve_preview, watch
+
+try:
+    from manual.coverage import assigned_days, coverage_gaps, coverage_matrix, format_hour, heatmap_image
+    from manual.roster import load_roster
+    from manual.stats import shift_statistics
+except ImportError:  # NumPy is optional; the roster-driven appendix is skipped without it
+    load_roster = shift_statistics = coverage_matrix = None
+
+# Google Sheet roster exports used by the data-driven appendix sections and the employee documents
+ROSTER_FILES = 'data/**/*.csv'
+# Blank monthly schedules still to be filled in; they match ROSTER_FILES but hold no roster data
+ROSTER_TEMPLATES = 'data/roster_templates'
+
+# Manual variants: output file, subtitle, chapter numbers (None = all) and the admin role
+# the admin chapter is written for (None = every role)
+MANUAL_VARIANTS = {
+    'full': {'output': 'USER_MANUAL.docx', 'subtitle': 'Complete User Manual', 'chapters': None, 'role': None},
+    'client': {'output': 'USER_MANUAL_client.docx', 'subtitle': 'Employee Guide', 'chapters': ('2',), 'role': None},
+    'admin': {'output': 'USER_MANUAL_admin.docx', 'subtitle': 'Administrator Guide', 'chapters': ('3', '4'), 'role': None},
+    'super_admin': {'output': 'USER_MANUAL_super_admin.docx', 'subtitle': 'Super Admin Guide',
+                    'chapters': ('3', '4'), 'role': 'super_admin'},
+    'admin_role': {'output': 'USER_MANUAL_admin_role.docx', 'subtitle': 'Admin Guide',
+                   'chapters': ('3',), 'role': 'admin'},
+}
+
+def create_manual(jobs=1, use_cache=True, output='memory', renders=None, variants=('full',), draft=False,
+                  force=False):
+    """Create the comprehensive user manual document and any other variants in one run.
+    
+    output names the package backend in manual.package.OUTPUT_BACKENDS. renders maps extra
+    output formats from manual.render.RENDERERS to output directories; they are produced
+    from the full manual. A draft build skips the data-driven appendix
+    sections and writes *_draft.docx files; set SCREENSHOT_SETTINGS['draft'] for its images.
+    Unless force is set (or the cache is off), nothing is rebuilt when the input fingerprint
+    matches the last successful build and its outputs are untouched.
+    """
+    for directory in (renders or {}).values():
+        check_output_dir(directory)
+    fingerprint = build_fingerprint(variants, output, renders, draft)
+    stamp = cache_path('builds', make_key(list(variants), draft), '.json')
+    if use_cache and not force:
+        outputs = unchanged_outputs(stamp, fingerprint, renders)
+        if outputs:
+            print(f"⏭️  Inputs unchanged since the last build; kept {', '.join(outputs)}")
+            return outputs
+    
+    plans = {name: variant_chapters(name, draft) for name in variants}
+    
+    # Every chapter is an independent fragment, rendered once (in parallel when jobs > 1,
+    # reused from cache when its inputs are unchanged) and shared by all variants
+    sections = list(dict.fromkeys((builder, args) for chapters in plans.values() for _, builder, args in chapters))
+    fragments, cache_hits = build_fragments(sections, jobs, use_cache)
+    
+    if len(plans) == 1:
+        # A single variant is stitched as fragments arrive, so --stream can write early chapters out
+        (name, chapters), = plans.items()
+        outputs = [write_manual(name, zip([heading for heading, _, _ in chapters], fragments), output, renders, draft)]
     else:
-        doc.add_paragraph(f'📸 Screenshot: {image_path} (Image file not found)')
+        by_section = dict(zip(sections, fragments))
+        work = [(name, [(heading, by_section[builder, args]) for heading, builder, args in chapters],
+                 output, renders if name == 'full' else None, draft) for name, chapters in plans.items()]
+        if jobs > 1:
+            # Variant packages are assembled and saved in parallel
+            with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as pool:
+                outputs = list(pool.map(write_manual, *zip(*work)))
+        else:
+            outputs = [write_manual(*item) for item in work]
+    
+    print(f"♻️  Reused {cache_hits} of {len(sections)} cached chapters")
+    digests = {path: file_digest(path) for path in outputs}
+    rendered = {directory: directory_digests(directory) for directory in (renders or {}).values()}
+    write_atomic(stamp, json.dumps({'fingerprint': fingerprint, 'outputs': digests,
+                                    'renders': rendered}).encode('utf-8'))
+    for path in outputs:
+        print(f"✅ User manual generated successfully: {path} (sha256 {digests[path][:12]})")
+    return outputs
+
+def watch_manual(preview_dir, port=8000, jobs=1, output='memory', variants=('full',), draft=False):
+    """Rebuild the manual and a live HTML preview whenever one of its inputs changes"""
+    state = serve_preview(preview_dir, port)
+    renders = {'html': preview_dir}
+    create_manual(jobs, True, output, renders, variants, draft)
+    print(f"\n👀 Watching {len(manual_inputs())} input files; preview at http://localhost:{port}/ (Ctrl+C to stop)")
+    
+    def rebuild(changed):
+        # Unchanged sections come straight from the fragment cache
+        create_manual(jobs, True, output, renders, variants, draft)
+        state['build'] += 1
+    
+    watch(manual_inputs, rebuild)
+
+def manual_inputs():
+    """Return every content file, screenshot and data file the chapter builders read"""
+    files = set()
+    for _, builder, _ in variant_chapters('full'):
+        files.update(builder_data_files(builder))
+        files.update(builder_assets(builder))
+    return sorted(files)
+
+def build_fingerprint(variants, output, renders, draft):
+    """Return a digest of every input file, generator source and option the outputs depend on"""
+    files = sorted(set(manual_inputs()) | set(code_files()))
+    digests = [(path, asset_digest(path) if os.path.exists(path) else None) for path in files]
+    return make_key(digests, list(variants), output, sorted((renders or {}).items()), draft,
+                    SCREENSHOT_SETTINGS, package_date_time())
+
+def unchanged_outputs(stamp, fingerprint, renders=None):
+    """Return the outputs recorded in stamp if they were built from fingerprint and are intact"""
+    if not os.path.exists(stamp):
+        return None
+    with open(stamp, encoding='utf-8') as f:
+        record = json.load(f)
+    if record['fingerprint'] != fingerprint:
+        return None
+    if not all(os.path.exists(path) and file_digest(path) == digest for path, digest in record['outputs'].items()):
+        return None
+    # Rendered sites must hold exactly the files that build wrote, unmodified
+    rendered = record.get('renders', {})
+    if set(rendered) != set((renders or {}).values()):
+        return None
+    if not all(directory_digests(directory) == files for directory, files in rendered.items()):
+        return None
+    return list(record['outputs'])
+
+def directory_digests(directory):
+    """Return {relative path: SHA-256} for every file under directory"""
+    digests = {}
+    for root, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(root, name)
+            digests[os.path.relpath(path, directory)] = file_digest(path)
+    return digests
 
-def create_manual():
-    """Create the comprehensive user manual document"""
+def variant_chapters(name, draft=False):
+    """Return the (heading, builder, args) chapters of a manual variant"""
+    variant = MANUAL_VARIANTS[name]
+    role_args = (variant['role'],) if variant['role'] else ()
+    draft_args = (True,) if draft else ()
+    chapters = [
+        ('1. Introduction', add_introduction_section, ()),
+        ('2. Client Panel User Guide', add_client_panel_sections, ()),
+        ('3. Admin Panel User Guide', add_admin_panel_sections, role_args),
+        ('4. API Documentation', add_api_documentation, ()),
+        ('5. Frequently Asked Questions (FAQ)', add_faq_section, ()),
+        ('6. Appendices', add_appendices, draft_args),
+    ]
+    if variant['chapters'] is None:
+        return chapters
+    return [chapter for chapter in chapters if chapter[0].split('.')[0] in variant['chapters']]
+
+def write_manual(name, chapters, output='memory', renders=None, draft=False):
+    """Assemble one manual variant from (heading, fragment) pairs and save it; return its path"""
+    variant = MANUAL_VARIANTS[name]
+    if draft:
+        # Drafts never overwrite the production files
+        stem, ext = os.path.splitext(variant['output'])
+        variant = dict(variant, output=f'{stem}_draft{ext}', subtitle=f"{variant['subtitle']} (Draft)")
     doc = Document()
     
     # Set document properties
-    doc.core_properties.title = "Cartup CxP Roster Management System - User Manual"
+    doc.core_properties.title = f"Cartup CxP Roster Management System - {variant['subtitle']}"
     doc.core_properties.author = "Cartup CxP Team"
+    if 'SOURCE_DATE_EPOCH' in os.environ:
+        # The template's own timestamps are fixed; reproducible builds may pin them instead
+        doc.core_properties.created = doc.core_properties.modified = datetime.datetime(*package_date_time())
+    
+    add_title_page(doc, variant['subtitle'])
+    add_table_of_contents(doc, variant['chapters'])
+    
+    # Other formats are rendered from a content model read back from the same XML;
+    # the front matter is captured before the streaming backend flushes it
+    nodes = document_model(doc) if renders else None
+    
+    # The streaming backend writes each chapter out as soon as it is ready
+    output = OUTPUT_BACKENDS[output](variant['output'], doc)
+    seen_media = set()
+    for heading, fragment in chapters:
+        with span(heading, 'chapter', variant=name) as trace:
+            doc.add_heading(heading, 1)
+            output.append_fragment(doc, fragment)
+            trace['xml_bytes'], trace['media_bytes'] = fragment_size(fragment, seen_media)
+            trace['bytes'] = trace['xml_bytes'] + trace['media_bytes']
+        if renders:
+            nodes += fragment_model(fragment, heading)
     
-    # Title Page
+    # Save document
+    with span(f"save {variant['output']}", 'save') as trace:
+        output.close(doc)
+        trace['bytes'] = os.path.getsize(variant['output'])
+    
+    for format_name, output_dir in (renders or {}).items():
+        written = RENDERERS[format_name](nodes, output_dir)
+        print(f"✅ {format_name} output generated: {output_dir} ({len(written)} files)")
+    return variant['output']
+
+def add_title_page(doc, subtitle):
+    """Add the title page"""
     title = doc.add_heading('Cartup CxP Roster Management System', 0)
     title.alignment = WD_ALIGN_PARAGRAPH.CENTER
     
-    subtitle = doc.add_paragraph('Complete User Manual')
+    subtitle = doc.add_paragraph(subtitle)
     subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
     subtitle.runs[0].font.size = Pt(18)
     
@@ -56,8 +237,9 @@ def create_manual():
     version.alignment = WD_ALIGN_PARAGRAPH.CENTER
     
     doc.add_page_break()
-    
-    # Table of Contents
+
+def add_table_of_contents(doc, chapters=None):
+    """Add the table of contents, limited to the given chapter numbers if any"""
     doc.add_heading('Table of Contents', 1)
     toc_items = [
         ("1.", "Introduction", "4"),
@@ -99,245 +281,47 @@ def create_manual():
         ("  5.4", "Troubleshooting", "71"),
         ("6.", "Appendices", "73"),
         ("  6.1", "Shift Codes Reference", "73"),
-        ("  6.2", "Quick Reference Guide", "74"),
-    ]
-    
-    table = doc.add_table(rows=len(toc_items), cols=3)
-    table.style = 'Light Grid Accent 1'
-    
-    for idx, (num, title, page) in enumerate(toc_items):
-        row = table.rows[idx]
-        row.cells[0].text = num
-        row.cells[1].text = title
-        row.cells[2].text = page
-    
-    doc.add_page_break()
-    
-    # CHAPTER 1: Introduction
-    doc.add_heading('1. Introduction', 1)
-    
-    doc.add_heading('1.1 About This Manual', 2)
-    doc.add_paragraph(
-        'This comprehensive manual provides step-by-step instructions for using the Cartup CxP '
-        'Roster Management System. Whether you are an employee accessing your schedule or an '
-        'administrator managing team rosters, this guide will help you understand and utilize '
-        'all features of the system effectively.'
-    )
-    
-    doc.add_heading('1.2 System Overview', 2)
-    doc.add_paragraph(
-        'The Cartup CxP Roster Management System is a modern web-based application designed to '
-        'streamline shift scheduling, request management, and team coordination. The system '
-        'consists of two main components:'
-    )
-    
-    features = [
-        ('Client Panel', 'For employees to view schedules, request changes, and manage their shifts'),
-        ('Admin Panel', 'For administrators to manage rosters, approve requests, and oversee operations'),
-    ]
-    
-    for feature, desc in features:
-        p = doc.add_paragraph(style='List Bullet')
-        p.add_run(f'{feature}: ').bold = True
-        p.add_run(desc)
-    
-    doc.add_heading('1.3 Key Features', 2)
-    
-    client_features = [
-        'Real-time schedule viewing',
-        'Interactive calendar for date selection',
-        'Shift change request submission',
-        'Shift swap requests with team members',
-        'Employee search functionality',
-        'Personal statistics and upcoming shifts',
-        'Multiple theme options for personalization',
-        'Mobile-responsive design',
-    ]
-    
-    admin_features = [
-        'Comprehensive dashboard with analytics',
-        'Request approval/rejection workflow',
-        'Team and employee management',
-        'Google Sheets integration',
-        'CSV import/export capabilities',
-        'User management with role-based access',
-        'Activity logging and audit trails',
-        'Shift modification tracking',
+        ("  6.2", "Shift Distribution Statistics", "74"),
+        ("  6.3", "Staffing Coverage", "76"),
+        ("  6.4", "Quick Reference Guide", "80"),
     ]
     
-    doc.add_paragraph('Client Panel Features:').bold = True
-    for feature in client_features:
-        doc.add_paragraph(f'• {feature}', style='List Bullet 2')
-    
-    doc.add_paragraph('Admin Panel Features:').bold = True
-    for feature in admin_features:
-        doc.add_paragraph(f'• {feature}', style='List Bullet 2')
+    if chapters is not None:
+        # Page numbers refer to the full manual, so variants list sections only
+        toc_items = [(number, name) for number, name, _ in toc_items
+                     if number.strip().split('.')[0] in chapters]
+    add_table(doc, toc_items, style='Light Grid Accent 1')
     
     doc.add_page_break()
-    
-    # CHAPTER 2: Client Panel
-    doc.add_heading('2. Client Panel User Guide', 1)
-    
-    add_client_panel_sections(doc)
-    
-    # CHAPTER 3: Admin Panel
-    doc.add_heading('3. Admin Panel User Guide', 1)
-    
-    add_admin_panel_sections(doc)
-    
-    # CHAPTER 4: API Documentation
-    doc.add_heading('4. API Documentation', 1)
-    
-    add_api_documentation(doc)
-    
-    # CHAPTER 5: FAQ
-    doc.add_heading('5. Frequently Asked Questions (FAQ)', 1)
-    
-    add_faq_section(doc)
-    
-    # CHAPTER 6: Appendices
-    doc.add_heading('6. Appendices', 1)
-    
-    add_appendices(doc)
-    
-    # Save document
-    doc.save('USER_MANUAL.docx')
-    print("✅ User manual generated successfully: USER_MANUAL.docx")
 
+@uses_files(*content_files('introduction'))
+def add_introduction_section(doc):
+    """Add the introduction chapter"""
+    add_content(doc, 'introduction')
+
+def roster_paths():
+    """Return the roster CSVs matching ROSTER_FILES, leaving out the blank templates"""
+    return sorted(path for path in glob.glob(ROSTER_FILES, recursive=True)
+                  if os.path.commonpath([path, ROSTER_TEMPLATES]) != ROSTER_TEMPLATES)
+
+def create_employee_documents(output, jobs=1, use_cache=True):
+    """Create one personalised schedule document per employee in the roster CSVs"""
+    if load_roster is None:
+        print("⚠️  Employee documents need NumPy to read the rosters; skipping")
+        return
+    
+    rosters = [load_roster(path) for path in roster_paths()]
+    records = employee_records(rosters, load_pending_requests())
+    
+    # Manual excerpts are rendered once and shared by every document
+    fragments, _ = build_fragments([add_shift_change_section, add_swap_request_section], jobs, use_cache)
+    count = write_employee_documents(records, list(fragments), output, jobs)
+    print(f"✅ {count} employee schedule documents written to {output}")
+
+@uses_files(*content_files('client_panel'))
 def add_client_panel_sections(doc):
     """Add detailed client panel documentation"""
-    
-    # 2.1 Logging In
-    doc.add_heading('2.1 Logging In to the Client Panel', 2)
-    doc.add_paragraph(
-        'To access your schedule and manage your shifts, you need to log in to the Client Panel.'
-    )
-    
-    doc.add_paragraph('Steps:').bold = True
-    steps = [
-        'Navigate to the application URL (http://localhost:3000 or your organization URL)',
-        'Enter your Full Name in the first field',
-        'Enter your Employee ID in the format SLL-XXXXX',
-        'The team password is pre-filled as "cartup123"',
-        'Click the "🔓 Access Roster" button',
-        'You will be redirected to your personal dashboard',
-    ]
-    for step in steps:
-        doc.add_paragraph(step, style='List Number')
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/client/01_client_login_page.png', 'Client Login Page')
-    
-    doc.add_paragraph()
-    p = doc.add_paragraph()
-    p.add_run('Note: ').bold = True
-    p.add_run('The Employee ID is case-sensitive. Make sure to enter it exactly as provided.')
-    
-    # 2.2 Dashboard Overview
-    doc.add_heading('2.2 Dashboard Overview', 2)
-    doc.add_paragraph(
-        'Once logged in, you will see your personalized dashboard displaying:'
-    )
-    
-    dashboard_elements = [
-        ('Welcome Header', 'Shows your name and Employee ID'),
-        ('Action Buttons', 'Logout, Refresh, and Theme buttons'),
-        ('Current Shift Information', 'Today and tomorrow shift details'),
-        ('Selected Date Shift', 'Shows shift for any selected calendar date'),
-        ('Action Buttons Row', 'Request Shift Change, Request Swap, and Shift View buttons'),
-        ('Employee Search', 'Search bar to find and view other employees\' schedules'),
-        ('Statistics Cards', 'Upcoming Days, Planned Time Off, and Shift Changes'),
-    ]
-    
-    for element, description in dashboard_elements:
-        p = doc.add_paragraph(style='List Bullet')
-        p.add_run(f'{element}: ').bold = True
-        p.add_run(description)
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/client/02_client_dashboard_main.png', 'Client Dashboard Overview')
-    
-    # 2.3 Refresh Function
-    doc.add_heading('2.3 Refresh Function', 2)
-    doc.add_paragraph(
-        'The Refresh button allows you to reload your schedule data to see the most up-to-date '
-        'information including any recently approved shift changes.'
-    )
-    
-    doc.add_paragraph('How to use:').bold = True
-    refresh_steps = [
-        'Locate the "🔄 Refresh" button in the top action bar',
-        'Click the button',
-        'The system will reload all schedule data',
-        'The button will show "Refreshing..." while loading',
-        'Once complete, all information will be updated',
-    ]
-    for step in refresh_steps:
-        doc.add_paragraph(step, style='List Number')
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/client/03_after_refresh.png', 'Dashboard After Refresh')
-    
-    # 2.4 Theme Customization
-    doc.add_heading('2.4 Theme Customization', 2)
-    doc.add_paragraph(
-        'The system offers multiple color themes to personalize your experience. You can switch '
-        'between different themes to find one that suits your preference.'
-    )
-    
-    doc.add_paragraph('Available Themes:').bold = True
-    themes = [
-        '🌈 Bright Vibrant - Colorful and energetic',
-        '🌅 Bright Sunset - Warm and inviting',
-        '🌊 Medium Ocean - Cool blue tones',
-        '🌍 Medium Earth - Natural earth tones',
-        '🍃 Peaceful Sage - Calming green',
-        '💜 Peaceful Lavender - Soft purple',
-        '🌑 Dark Blue - Professional dark blue',
-        '🌃 Dark Midnight - Deep dark theme',
-        '🕳️ Dark Void - Maximum contrast black',
-    ]
-    for theme in themes:
-        doc.add_paragraph(theme, style='List Bullet')
-    
-    doc.add_paragraph('How to change theme:').bold = True
-    theme_steps = [
-        'Click the "🎨 Theme" button in the top action bar',
-        'A dropdown menu will appear showing all available themes',
-        'Click on any theme to apply it immediately',
-        'The entire website will update with the new color scheme',
-        'Your selection is saved and will persist across sessions',
-    ]
-    for step in theme_steps:
-        doc.add_paragraph(step, style='List Number')
-    
-    # Add screenshots
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/client/04_theme_menu_open.png', 'Theme Menu Dropdown')
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/client/05_theme_changed_ocean.png', 'Medium Ocean Theme Applied')
-    
-    # 2.5 Calendar Feature
-    doc.add_heading('2.5 Calendar Feature', 2)
-    doc.add_paragraph(
-        'The calendar allows you to view your shift schedule for any date. When you select a date, '
-        'the system displays your assigned shift for that day.'
-    )
-    
-    doc.add_paragraph('How to use the calendar:').bold = True
-    calendar_steps = [
-        'Click the "📅 Show Calendar" button',
-        'The calendar will expand, showing the current month',
-        'Use the arrow buttons (← →) to navigate between months',
-        'Click on any date to view your shift for that day',
-        'The selected date and shift will appear above the calendar',
-        'Click "📅 Hide Calendar" to collapse the calendar',
-    ]
-    for step in calendar_steps:
-        doc.add_paragraph(step, style='List Number')
-    
-    # Add screenshots
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/client/06_calendar_opened.png', 'Calendar Expanded (September)')
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/client/07_calendar_october.png', 'Calendar Showing October')
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/client/08_date_selected_oct20.png', 'Date Selected (October 20)')
+    add_content(doc, 'client_panel')
     
     # Continue with other client sections...
     add_shift_change_section(doc)
@@ -346,207 +330,35 @@ def add_client_panel_sections(doc):
     add_employee_search_section(doc)
     add_stat_cards_section(doc)
 
+@uses_files(*content_files('shift_change'))
 def add_shift_change_section(doc):
     """Add shift change request documentation"""
-    doc.add_heading('2.6 Requesting Shift Changes', 2)
-    doc.add_paragraph(
-        'If you need to change your assigned shift for a specific date, you can submit a shift '
-        'change request through the system. An administrator will review and approve or reject '
-        'your request.'
-    )
-    
-    doc.add_paragraph('Step-by-step process:').bold = True
-    steps = [
-        'Click the "✏️ Request Shift Change" button on the dashboard',
-        'The Shift Change Request modal will open',
-        'You will see your employee information and current team displayed',
-        'Select the date for which you want to change your shift using the mini calendar',
-        'Use the arrow buttons to navigate to the correct month if needed',
-        'Click on the desired date',
-        'Your current shift for that date will be displayed',
-        'Select your requested shift from the dropdown menu (M2, M3, M4, D1, D2, DO, SL, CL, EL, HL)',
-        'Enter a reason for your request in the text area',
-        'Click "Submit Request" to send your request to administrators',
-        'Click "Cancel" if you want to close the modal without submitting',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/client/09_shift_change_modal_opened.png', 'Shift Change Request Modal')
-    
-    doc.add_paragraph()
-    p = doc.add_paragraph()
-    p.add_run('Important: ').bold = True
-    p.add_run('All shift change requests require administrator approval. You will be notified once '
-              'your request is processed.')
+    add_content(doc, 'shift_change')
 
+@uses_files(*content_files('swap_request'))
 def add_swap_request_section(doc):
     """Add swap request documentation"""
-    doc.add_heading('2.7 Requesting Shift Swaps', 2)
-    doc.add_paragraph(
-        'A shift swap allows you to exchange shifts with another team member. Both the requester '
-        'and the target employee must be on the same team for a swap to be processed.'
-    )
-    
-    doc.add_paragraph('How to request a swap:').bold = True
-    steps = [
-        'Click the "🔁 Request Swap" button on the dashboard',
-        'The Swap Request modal will open',
-        'Select the date for the swap using the calendar',
-        'Your current shift for that date will be displayed',
-        'In the "Swap With" field, start typing an employee name or ID',
-        'A list of team members will appear as you type',
-        'Select the employee you want to swap with',
-        'Enter a reason for the swap request',
-        'Click "Submit Swap Request"',
-        'The request will be sent to administrators for approval',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    doc.add_paragraph()
-    p = doc.add_paragraph()
-    p.add_run('Note: ').bold = True
-    p.add_run('The system will only show employees from your team in the search suggestions. '
-              'Cross-team swaps are not currently supported.')
+    add_content(doc, 'swap_request')
 
+@uses_files(*content_files('shift_view'))
 def add_shift_view_section(doc):
     """Add shift view documentation"""
-    doc.add_heading('2.8 Shift View', 2)
-    doc.add_paragraph(
-        'The Shift View feature provides a comprehensive calendar-style view of team schedules, '
-        'allowing you to see who is working on specific dates.'
-    )
-    
-    doc.add_paragraph('Using Shift View:').bold = True
-    steps = [
-        'Click the "👁️ Shift View" button',
-        'The Shift View modal will open showing a calendar',
-        'Select a date from the calendar to view all shifts for that day',
-        'You can filter by team using the team dropdown',
-        'The view shows all employees and their assigned shifts',
-        'Use the arrow buttons to navigate between months',
-        'Click outside the modal or the close button to exit',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    doc.add_paragraph()
-    p = doc.add_paragraph()
-    p.add_run('Tip: ').bold = True
-    p.add_run('Use this feature to coordinate with team members and plan coverage.')
+    add_content(doc, 'shift_view')
 
+@uses_files(*content_files('employee_search'))
 def add_employee_search_section(doc):
     """Add employee search documentation"""
-    doc.add_heading('2.9 Employee Search', 2)
-    doc.add_paragraph(
-        'The employee search feature allows you to look up any employee in the system and view '
-        'their schedule.'
-    )
-    
-    doc.add_paragraph('How to search for employees:').bold = True
-    steps = [
-        'Locate the "Search Other Employees" section on the dashboard',
-        'Click in the search box',
-        'Start typing an employee name, ID, or team name',
-        'A dropdown list of matching employees will appear',
-        'Click on an employee from the list',
-        'Their schedule will replace yours on the dashboard temporarily',
-        'You can select dates from the calendar to see their shifts',
-        'Click the "← Back to My Schedule" button to return to your own schedule',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    doc.add_paragraph()
-    p = doc.add_paragraph()
-    p.add_run('Use case: ').bold = True
-    p.add_run('This is useful for checking if a colleague is available on a specific day before '
-              'requesting a swap.')
+    add_content(doc, 'employee_search')
 
+@uses_files(*content_files('stat_cards'))
 def add_stat_cards_section(doc):
     """Add statistics cards documentation"""
-    doc.add_heading('2.10 Statistics Cards', 2)
-    doc.add_paragraph(
-        'The bottom of your dashboard displays three statistics cards that provide quick insights '
-        'into your schedule:'
-    )
-    
-    cards = [
-        ('📅 Upcoming Days', 
-         'Shows the number of working days in the next 7 days. Click to expand and see the list '
-         'of dates you are scheduled to work.'),
-        ('🏖️ Planned Time Off', 
-         'Displays your time off days (DO, SL, CL, EL, HL) within the next 30 days. Click to '
-         'expand and see all your scheduled off days with their types.'),
-        ('🔄 Shift Changes', 
-         'Shows the number of shifts that have been modified from the original Google Sheets roster. '
-         'Click to expand and see details of what changed and when.'),
-    ]
-    
-    for title, description in cards:
-        p = doc.add_paragraph(style='List Bullet')
-        p.add_run(f'{title}: ').bold = True
-        p.add_run(description)
-    
-    doc.add_paragraph('How to use:').bold = True
-    doc.add_paragraph('1. Click on any card to expand it')
-    doc.add_paragraph('2. The card will show detailed information')
-    doc.add_paragraph('3. Click the "▲" arrow or anywhere outside to collapse')
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/client/10_stat_card_upcoming_days_expanded.png', 'Upcoming Days Stat Card Expanded')
-    
-    doc.add_paragraph()
-    p = doc.add_paragraph()
-    p.add_run('Tip: ').bold = True
-    p.add_run('Check these cards regularly to stay aware of your upcoming schedule and any changes.')
+    add_content(doc, 'stat_cards')
 
-def add_admin_panel_sections(doc):
-    """Add detailed admin panel documentation"""
-    
-    # 3.1 Admin Login
-    doc.add_heading('3.1 Admin Login', 2)
-    doc.add_paragraph(
-        'Administrators access a separate panel with advanced features for managing the entire roster system.'
-    )
-    
-    doc.add_paragraph('Default Admin Credentials:').bold = True
-    admin_creds = [
-        ('Super Admin', 'Username: developer', 'Password: devneversleeps'),
-        ('Admin', 'Username: istiaque', 'Password: cartup123'),
-        ('Admin', 'Username: admin', 'Password: password123'),
-    ]
-    
-    table = doc.add_table(rows=len(admin_creds) + 1, cols=3)
-    table.style = 'Light Grid Accent 1'
-    
-    hdr_cells = table.rows[0].cells
-    hdr_cells[0].text = 'Role'
-    hdr_cells[1].text = 'Username'
-    hdr_cells[2].text = 'Password'
-    
-    for idx, (role, username, password) in enumerate(admin_creds, 1):
-        row = table.rows[idx]
-        row.cells[0].text = role
-        row.cells[1].text = username
-        row.cells[2].text = password
-    
-    doc.add_paragraph()
-    doc.add_paragraph('Steps to login:').bold = True
-    steps = [
-        'Navigate to http://localhost:3000/admin/login',
-        'Enter your admin username',
-        'Enter your password',
-        'Click "Login"',
-        'You will be redirected to the admin dashboard',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/01_admin_login_page.png', 'Admin Login Page')
+@uses_files(*content_files('admin_panel'))
+def add_admin_panel_sections(doc, role=None):
+    """Add detailed admin panel documentation, tailored to one admin role if given"""
+    add_content(doc, 'admin_panel', role=role)
     
     # Continue with other admin sections...
     add_admin_dashboard_section(doc)
@@ -557,849 +369,372 @@ def add_admin_panel_sections(doc):
     add_csv_section(doc)
     add_profile_section(doc)
     add_team_mgmt_section(doc)
-    add_user_mgmt_section(doc)
+    add_user_mgmt_section(doc, role)
 
+@uses_files(*content_files('admin_dashboard'))
 def add_admin_dashboard_section(doc):
     """Add admin dashboard documentation"""
-    doc.add_heading('3.2 Dashboard Tab', 2)
-    doc.add_paragraph(
-        'The admin dashboard provides an overview of the entire roster system with key metrics '
-        'and recent activity.'
-    )
-    
-    doc.add_paragraph('Dashboard Components:').bold = True
-    
-    components = [
-        ('👥 Total Employees This Month', 
-         'Shows the total number of employees in the system.'),
-        ('👷 Employees Working Today', 
-         'Displays count of employees with shifts today. Click to see the full list with their shifts.'),
-        ('Shift Change / Swap Requests Overview', 
-         'Statistics card showing pending, approved, and rejected requests. Click to expand for details.'),
-        ('Team Health Overview', 
-         'Shows team distribution and metrics. Expand to see detailed team information.'),
-        ('Activity Log', 
-         'Recent actions including approved requests, rejected requests, and shift modifications. '
-         'Shows admin username who performed each action.'),
-    ]
-    
-    for title, description in components:
-        p = doc.add_paragraph(style='List Bullet')
-        p.add_run(f'{title}: ').bold = True
-        p.add_run(description)
-    
-    # Add screenshots
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/02_admin_dashboard.png', 'Admin Dashboard Overview')
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/03_dashboard_overview.png', 'Dashboard with All Stat Cards')
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/04_employees_working_today_modal.png', 'Employees Working Today Modal')
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/05_team_health_expanded.png', 'Team Health Overview Expanded')
-    
-    doc.add_paragraph()
-    p = doc.add_paragraph()
-    p.add_run('How to use: ').bold = True
-    p.add_run('Click on any stat card to expand it and view detailed information. '
-              'The activity log updates automatically as changes are made.')
+    add_content(doc, 'admin_dashboard')
 
+@uses_files(*content_files('schedule_requests'))
 def add_schedule_requests_section(doc):
     """Add schedule requests documentation"""
-    doc.add_heading('3.3 Schedule Requests Tab', 2)
-    doc.add_paragraph(
-        'This tab is where administrators review and process shift change and swap requests from employees.'
-    )
-    
-    doc.add_paragraph('Request Management:').bold = True
-    
-    steps = [
-        'Click on the "Schedule Requests" tab in the sidebar',
-        'You will see a list of all requests',
-        'Use the filter buttons to view: All, Pending, Approved, Rejected',
-        'For each request, you can see:',
-        '  - Employee name and ID',
-        '  - Request type (Shift Change or Swap)',
-        '  - Requested date',
-        '  - Current shift and requested shift',
-        '  - Reason provided by employee',
-        '  - Request submission date',
-        'To approve a request: Click the "✅ Approve" button',
-        'To reject a request: Click the "❌ Reject" button',
-        'You will be asked to confirm your action',
-        'Once processed, the request status updates immediately',
-        'The employee\'s schedule is updated for approved requests',
-    ]
-    for step in steps:
-        doc.add_paragraph(step, style='List Number')
-    
-    # Add screenshots
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/06_schedule_requests_all.png', 'Schedule Requests - All View')
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/07_schedule_requests_pending.png', 'Schedule Requests - Pending Filter')
-    
-    doc.add_paragraph()
-    p = doc.add_paragraph()
-    p.add_run('Important: ').bold = True
-    p.add_run('All actions are logged and cannot be undone. Approved shift changes immediately '
-              'update the roster.')
+    add_content(doc, 'schedule_requests')
 
+@uses_files(*content_files('data_sync'))
 def add_data_sync_section(doc):
     """Add data sync documentation"""
-    doc.add_heading('3.4 Data Sync Tab', 2)
-    doc.add_paragraph(
-        'The Data Sync tab allows you to synchronize roster data from Google Sheets and manage '
-        'automatic synchronization settings.'
-    )
-    
-    doc.add_paragraph('Features:').bold = True
-    
-    features = [
-        ('Manual Sync Button', 
-         'Click to immediately fetch and update data from all configured Google Sheets links.'),
-        ('Auto-Sync Toggle', 
-         'Enable or disable automatic synchronization that runs at regular intervals.'),
-        ('Last Sync Time', 
-         'Shows when the last successful sync occurred.'),
-        ('Sync Statistics', 
-         'Displays number of employees and sheets synced.'),
-    ]
-    
-    for title, description in features:
-        p = doc.add_paragraph(style='List Bullet')
-        p.add_run(f'{title}: ').bold = True
-        p.add_run(description)
-    
-    doc.add_paragraph('How to perform a manual sync:').bold = True
-    steps = [
-        'Navigate to the Data Sync tab',
-        'Click the "Sync Now" button',
-        'Wait for the sync to complete',
-        'A success message will appear',
-        'Check the sync statistics to verify',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/08_data_sync_tab.png', 'Data Sync Tab')
+    add_content(doc, 'data_sync')
 
+@uses_files(*content_files('google_sheets'))
 def add_google_sheets_section(doc):
     """Add Google Sheets configuration documentation"""
-    doc.add_heading('3.5 Google Sheets Tab', 2)
-    doc.add_paragraph(
-        'Configure Google Sheets links for roster data import. The system supports multiple sheets '
-        'to aggregate data from different teams or sources.'
-    )
-    
-    doc.add_paragraph('Managing Google Sheets Links:').bold = True
-    
-    doc.add_paragraph('To add a new link:').bold = True
-    steps = [
-        'Click on the "Google Sheets" tab',
-        'Enter a descriptive name for the sheet (e.g., "Voice Team Roster")',
-        'Paste the published CSV link from your Google Sheet',
-        'Click "Add Link"',
-        'The link will be saved and used for future syncs',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    doc.add_paragraph('To delete a link:').bold = True
-    doc.add_paragraph('1. Find the link in the list')
-    doc.add_paragraph('2. Click the "Delete" button next to it')
-    doc.add_paragraph('3. Confirm the deletion')
-    
-    doc.add_paragraph()
-    p = doc.add_paragraph()
-    p.add_run('How to get a Google Sheets CSV link:').bold = True
-    doc.add_paragraph('1. Open your Google Sheet')
-    doc.add_paragraph('2. Go to File → Share → Publish to web')
-    doc.add_paragraph('3. Select "Comma-separated values (.csv)"')
-    doc.add_paragraph('4. Click "Publish"')
-    doc.add_paragraph('5. Copy the generated URL')
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/09_google_sheets_tab.png', 'Google Sheets Configuration Tab')
+    add_content(doc, 'google_sheets')
 
+@uses_files(*content_files('roster_data'))
 def add_roster_data_section(doc):
     """Add roster data management documentation"""
-    doc.add_heading('3.6 Roster Data Tab', 2)
-    doc.add_paragraph(
-        'The Roster Data tab provides an interactive interface to view and edit employee shifts directly.'
-    )
-    
-    doc.add_paragraph('Features:').bold = True
-    
-    features = [
-        ('Data Source Toggle', 
-         'Switch between viewing Google Sheets roster (original) and Admin modified roster.'),
-        ('Shift View Button', 
-         'Open a calendar-based view of the entire roster.'),
-        ('Reset to Google Button', 
-         'Reset all admin modifications and revert to the original Google Sheets data.'),
-        ('Date Selection', 
-         'Select any date to view and modify shifts for that day.'),
-        ('Employee List', 
-         'View all employees with their shifts for the selected date.'),
-        ('Shift Editing', 
-         'Click on any employee shift cell to change it.'),
-    ]
-    
-    for title, description in features:
-        p = doc.add_paragraph(style='List Bullet')
-        p.add_run(f'{title}: ').bold = True
-        p.add_run(description)
-    
-    doc.add_paragraph('How to modify a shift:').bold = True
-    steps = [
-        'Go to the Roster Data tab',
-        'Select "Admin Data" to edit the modifiable roster',
-        'Click "Select Date to Modify Shifts"',
-        'Choose a date from the calendar',
-        'Find the employee whose shift you want to change',
-        'Click on their current shift code',
-        'A dropdown will appear with all available shift codes',
-        'Select the new shift',
-        'The change is saved automatically',
-        'The modification is tracked and logged',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    # Add screenshots
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/10_roster_data_tab.png', 'Roster Data Tab with Calendar')
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/11_roster_date_selected_oct15.png', 'Roster for October 15 with All Employees')
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/12_roster_shift_edit_modal.png', 'Shift Edit Modal with Options')
+    add_content(doc, 'roster_data')
 
+@uses_files(*content_files('csv_import_export'))
 def add_csv_section(doc):
     """Add CSV import/export documentation"""
-    doc.add_heading('3.7 CSV Import/Export Tab', 2)
-    doc.add_paragraph(
-        'Import and export roster data in CSV format for backup, bulk editing, or integration '
-        'with external systems.'
-    )
-    
-    doc.add_paragraph('CSV Import:').bold = True
-    steps = [
-        'Click on "CSV Import" tab',
-        'Click "Choose File" or drag and drop a CSV file',
-        'The file should follow the template format',
-        'Select the month this data is for',
-        'Click "Upload CSV"',
-        'The system will process and import the data',
-        'A success message confirms the import',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    doc.add_paragraph('CSV Export:').bold = True
-    steps = [
-        'Go to the CSV Import tab',
-        'Select specific months to export or choose "Export All"',
-        'Click "📥 Export CSV"',
-        'The file will be generated and downloaded',
-        'Open the file in Excel or any spreadsheet application',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/13_csv_import_tab.png', 'CSV Import/Export Tab')
-    
-    doc.add_paragraph()
-    p = doc.add_paragraph()
-    p.add_run('CSV Format: ').bold = True
-    p.add_run('The CSV must have columns for Employee Name, Employee ID, Team, and date columns '
-              'with shift codes.')
+    add_content(doc, 'csv_import_export')
 
+@uses_files(*content_files('profile'))
 def add_profile_section(doc):
     """Add profile management documentation"""
-    doc.add_heading('3.8 My Profile Tab', 2)
-    doc.add_paragraph(
-        'Manage your admin account information and change your password.'
-    )
-    
-    doc.add_paragraph('Profile Information:').bold = True
-    info_items = [
-        'Username (read-only)',
-        'Role (read-only)',
-        'Change password functionality',
-    ]
-    for item in info_items:
-        doc.add_paragraph(item, style='List Bullet')
-    
-    doc.add_paragraph('How to change your password:').bold = True
-    steps = [
-        'Go to the "My Profile" tab',
-        'Enter your current password',
-        'Enter your new password',
-        'Re-enter the new password to confirm',
-        'Click "Change Password"',
-        'You will receive a confirmation message',
-        'Use your new password for future logins',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/14_my_profile_tab.png', 'My Profile Tab')
+    add_content(doc, 'profile')
 
+@uses_files(*content_files('team_management'))
 def add_team_mgmt_section(doc):
     """Add team management documentation"""
-    doc.add_heading('3.9 Team Management Tab', 2)
-    doc.add_paragraph(
-        'Manage teams and employees, including adding new employees, modifying information, and '
-        'organizing team structures.'
-    )
-    
-    doc.add_paragraph('Team Management Features:').bold = True
-    
-    doc.add_paragraph('Adding a new team:').bold = True
-    steps = [
-        'Click on "Team Management" tab',
-        'Click "Add New Team" button',
-        'Enter the team name',
-        'Optionally add a description',
-        'Click "Save"',
-        'The team will appear in the list',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    doc.add_paragraph('Adding a new employee:').bold = True
-    steps = [
-        'Select the team from the dropdown',
-        'Click "Add Employee"',
-        'Fill in employee details:',
-        '  - Full Name',
-        '  - Employee ID (format: SLL-XXXXX)',
-        '  - Team assignment',
-        'Click "Save Employee"',
-        'The employee will be added to the roster',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    doc.add_paragraph('Modifying employee information:').bold = True
-    doc.add_paragraph('1. Find the employee in the list')
-    doc.add_paragraph('2. Click "Edit" next to their name')
-    doc.add_paragraph('3. Update the information')
-    doc.add_paragraph('4. Click "Save Changes"')
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/15_team_management_tab.png', 'Team Management Tab')
+    add_content(doc, 'team_management')
 
-def add_user_mgmt_section(doc):
+@uses_files(*content_files('user_management'))
+def add_user_mgmt_section(doc, role=None):
     """Add user management documentation"""
-    doc.add_heading('3.10 User Management Tab', 2)
-    doc.add_paragraph(
-        'Manage administrator accounts, including creating new users, updating roles, and deleting accounts. '
-        'Note: This tab is only visible to Super Admins and Admins.'
-    )
-    
-    doc.add_paragraph('User Roles:').bold = True
-    roles = [
-        ('super_admin', 'Full system access including user management'),
-        ('admin', 'Can manage rosters and requests, view user management'),
-        ('team_leader', 'Limited access to team-specific functions'),
-    ]
-    
-    for role, description in roles:
-        p = doc.add_paragraph(style='List Bullet')
-        p.add_run(f'{role}: ').bold = True
-        p.add_run(description)
-    
-    doc.add_paragraph('Adding a new admin user:').bold = True
-    steps = [
-        'Go to the "User Management" tab',
-        'Click "Add New User"',
-        'Fill in the form:',
-        '  - Username (unique)',
-        '  - Password',
-        '  - Confirm Password',
-        '  - Select Role',
-        'Click "Create User"',
-        'The user can now log in with these credentials',
-    ]
-    for i, step in enumerate(steps, 1):
-        doc.add_paragraph(f'{i}. {step}')
-    
-    doc.add_paragraph('Deleting a user:').bold = True
-    doc.add_paragraph('1. Find the user in the list')
-    doc.add_paragraph('2. Click the "Delete" button')
-    doc.add_paragraph('3. Confirm the deletion')
-    doc.add_paragraph('4. The user account will be permanently removed')
-    
-    # Add screenshot
-    add_screenshot(doc, 'MANUAL_SCREENSHOTS/admin/16_user_management_tab.png', 'User Management Tab')
+    add_content(doc, 'user_management', role=role)
+
+# Chapter 4 subsections, each claiming endpoints by path prefix; the first match wins
+API_SECTIONS = [
+    ('4.1 Authentication APIs', ('/api/admin/login', '/api/admin/logout', '/api/admin/users/')),
+    ('4.2 Schedule APIs', ('/api/my-schedule/', '/api/admin/get-display-data',
+                           '/api/admin/get-admin-data', '/api/admin/get-google-data')),
+    ('4.3 Request APIs', ('/api/schedule-requests/',)),
+    ('4.5 Data Sync APIs', ('/api/admin/sync-', '/api/admin/set-auto-sync', '/api/admin/reset-to-google',
+                            '/api/admin/hard-reset', '/api/admin/get-modified-shifts',
+                            '/api/admin/get-google-links', '/api/admin/save-google-link',
+                            '/api/admin/delete-google-link')),
+    ('4.4 Admin APIs', ('/api/',)),
+]
 
+# Descriptions for endpoints; anything not listed is described from its path
+API_DESCRIPTIONS = {
+    'POST /api/admin/login': 'Admin login endpoint',
+    'POST /api/admin/logout': 'Admin logout endpoint',
+    'POST /api/admin/users/add': 'Create an admin user (Super Admin only)',
+    'POST /api/admin/users/delete': 'Delete an admin user (Super Admin only)',
+    'GET /api/admin/users/list': 'List admin users',
+    'POST /api/admin/users/update': 'Update an admin user\'s details or role',
+    'GET /api/my-schedule/[employeeId]': 'Get an employee\'s schedule overview',
+    'GET /api/admin/get-display-data': 'Get merged display roster data',
+    'GET /api/admin/get-admin-data': 'Get admin-modified roster data',
+    'GET /api/admin/get-google-data': 'Get original Google Sheets roster data',
+    'POST /api/schedule-requests/submit-shift-change': 'Submit a shift change request',
+    'POST /api/schedule-requests/submit-swap-request': 'Submit a shift swap request',
+    'GET /api/schedule-requests/get-all': 'Get all schedule requests',
+    'GET /api/schedule-requests/get-pending': 'Get pending requests with request statistics',
+    'POST /api/schedule-requests/get-employee-requests': 'Get the requests submitted by or involving an employee',
+    'POST /api/schedule-requests/get-team-members': 'Get an employee\'s teammates and their shifts on a date',
+    'POST /api/schedule-requests/update-status': 'Approve or reject a request (admin only)',
+    'POST /api/admin/update-shift': 'Update employee shift for a specific date',
+    'POST /api/admin/upload-csv': 'Upload roster CSV file',
+    'POST /api/admin/export-csv': 'Export roster data as CSV',
+    'GET /api/admin/download-template': 'Download a blank roster CSV template for the current month',
+    'POST /api/admin/save-team': 'Create or update a team',
+    'POST /api/admin/delete-team': 'Delete a team',
+    'POST /api/admin/save-employee': 'Create or update an employee',
+    'POST /api/admin/delete-employee': 'Delete an employee',
+    'GET /api/admin/get-settings': 'Get system settings',
+    'GET /api/admin/list-roster-templates': 'List saved roster templates',
+    'GET /api/admin/get-roster-template': 'Get a saved roster template',
+    'POST /api/admin/save-roster-template': 'Save a roster template',
+    'POST /api/admin/delete-roster-template': 'Delete a saved roster template',
+    'POST /api/admin/sync-google-sheets': 'Manually trigger Google Sheets sync',
+    'POST /api/admin/sync-roster-templates': 'Merge roster templates into the roster data',
+    'POST /api/admin/set-auto-sync': 'Enable or disable automatic sync',
+    'POST /api/admin/reset-to-google': 'Reset admin data to Google Sheets data',
+    'POST /api/admin/hard-reset': 'Delete all roster, modification and request data',
+    'GET /api/admin/get-modified-shifts': 'Get list of all modified shifts',
+    'GET /api/admin/get-google-links': 'Get the Google Sheets links per month',
+    'POST /api/admin/save-google-link': 'Save the Google Sheets link for a month',
+    'POST /api/admin/delete-google-link': 'Delete the Google Sheets link for a month',
+}
+
+def api_section(path):
+    """Return the Chapter 4 subsection an endpoint belongs to"""
+    for title, prefixes in API_SECTIONS:
+        if path.startswith(prefixes):
+            return title
+    return API_SECTIONS[-1][0]
+
+def api_paragraphs(route):
+    """Return the reference paragraphs for one indexed endpoint"""
+    endpoint = f"{route['method']} {route['path']}"
+    description = API_DESCRIPTIONS.get(endpoint) or os.path.basename(route['path']).replace('-', ' ').capitalize()
+    paragraphs = [
+        [(endpoint, True)],
+        f"Description: {description}",
+        f"Authentication: {'Admin session required' if route['auth'] else 'None required'}",
+    ]
+    if route['path_params']:
+        paragraphs.append(f"Path Parameters: {', '.join(route['path_params'])}")
+    if route['query_params']:
+        paragraphs.append(f"Query Parameters: {', '.join(route['query_params'])}")
+    if route['json_fields']:
+        paragraphs.append(f"Request Body: {format_shape(dict.fromkeys(route['json_fields'], '...'))}")
+    elif route['form_fields']:
+        paragraphs.append(f"Request Body: multipart/form-data with {', '.join(route['form_fields'])}")
+    elif route['method'] != 'GET':
+        paragraphs.append('Request Body: None')
+    paragraphs.append(f"Response: {describe_response(success_response(route))}")
+    errors = error_statuses(route)
+    if errors:
+        paragraphs.append(f"Error Statuses: {', '.join(map(str, errors))}")
+    paragraphs.append('')
+    return paragraphs
+
+@uses_files(ROUTE_FILES)
 def add_api_documentation(doc):
-    """Add comprehensive API documentation"""
+    """Add API documentation extracted from the app/api route handlers"""
     
+    routes = api_routes()
     doc.add_paragraph(
-        'This section documents all API endpoints available in the Cartup CxP Roster Management System. '
-        'All APIs use JSON for request and response bodies.'
+        f'This section documents all {len(routes)} API endpoints available in the Cartup CxP Roster Management System. '
+        'All APIs use JSON for request and response bodies unless noted otherwise. '
+        'It is generated from the route handlers under app/api, so it always matches the running code.'
     )
     
-    # Authentication APIs
-    doc.add_heading('4.1 Authentication APIs', 2)
-    
-    apis = [
-        {
-            'endpoint': 'POST /api/admin/login',
-            'description': 'Admin login endpoint',
-            'request': '{"username": "string", "password": "string"}',
-            'response': '{"success": true, "user": {"username": "string", "role": "string"}}',
-            'auth': 'None required',
-        },
-        {
-            'endpoint': 'POST /api/admin/logout',
-            'description': 'Admin logout endpoint',
-            'request': 'None',
-            'response': '{"success": true}',
-            'auth': 'Admin cookie required',
-        },
-    ]
-    
-    for api in apis:
-        doc.add_paragraph(api['endpoint']).bold = True
-        doc.add_paragraph(f"Description: {api['description']}")
-        doc.add_paragraph(f"Authentication: {api['auth']}")
-        doc.add_paragraph(f"Request Body: {api['request']}")
-        doc.add_paragraph(f"Response: {api['response']}")
-        doc.add_paragraph()
-    
-    # Schedule APIs
-    doc.add_heading('4.2 Schedule APIs', 2)
-    
-    schedule_apis = [
-        {
-            'endpoint': 'GET /api/my-schedule/[employeeId]',
-            'description': 'Get employee schedule',
-            'params': 'employeeId - Employee ID (e.g., SLL-88717)',
-            'response': '{"employee": {...}, "headers": [...], "schedule": [...]}',
-        },
-        {
-            'endpoint': 'GET /api/admin/get-display-data',
-            'description': 'Get merged display roster data',
-            'response': '{"teams": {...}, "headers": [...], "allEmployees": [...]}',
-        },
-        {
-            'endpoint': 'GET /api/admin/get-admin-data',
-            'description': 'Get admin-modified roster data',
-            'response': '{"teams": {...}, "headers": [...], "allEmployees": [...]}',
-        },
-        {
-            'endpoint': 'GET /api/admin/get-google-data',
-            'description': 'Get original Google Sheets roster data',
-            'response': '{"teams": {...}, "headers": [...], "allEmployees": [...]}',
-        },
-    ]
-    
-    for api in schedule_apis:
-        doc.add_paragraph(api['endpoint']).bold = True
-        doc.add_paragraph(f"Description: {api['description']}")
-        if 'params' in api:
-            doc.add_paragraph(f"Parameters: {api['params']}")
-        doc.add_paragraph(f"Response: {api['response']}")
-        doc.add_paragraph()
-    
-    # Request APIs
-    doc.add_heading('4.3 Request APIs', 2)
-    
-    request_apis = [
-        {
-            'endpoint': 'POST /api/schedule-requests/submit-shift-change',
-            'description': 'Submit a shift change request',
-            'request': '''{
-  "employee_id": "string",
-  "employee_name": "string",
-  "team": "string",
-  "date": "string",
-  "current_shift": "string",
-  "requested_shift": "string",
-  "reason": "string"
-}''',
-            'response': '{"success": true, "message": "Request submitted"}',
-        },
-        {
-            'endpoint': 'POST /api/schedule-requests/submit-swap-request',
-            'description': 'Submit a shift swap request',
-            'request': '''{
-  "requester_id": "string",
-  "requester_name": "string",
-  "swap_with_id": "string",
-  "swap_with_name": "string",
-  "team": "string",
-  "date": "string",
-  "reason": "string"
-}''',
-            'response': '{"success": true, "message": "Swap request submitted"}',
-        },
-        {
-            'endpoint': 'GET /api/schedule-requests/get-all',
-            'description': 'Get all schedule requests',
-            'response': '[{"id": "string", "type": "string", "status": "string", ...}]',
-        },
-        {
-            'endpoint': 'POST /api/schedule-requests/update-status',
-            'description': 'Approve or reject a request (admin only)',
-            'request': '{"id": "string", "status": "approved|rejected", "admin_username": "string"}',
-            'response': '{"success": true}',
-        },
-    ]
-    
-    for api in request_apis:
-        doc.add_paragraph(api['endpoint']).bold = True
-        doc.add_paragraph(f"Description: {api['description']}")
-        if 'request' in api:
-            doc.add_paragraph(f"Request Body:")
-            doc.add_paragraph(api['request'])
-        doc.add_paragraph(f"Response:")
-        doc.add_paragraph(api['response'])
-        doc.add_paragraph()
-    
-    # Admin APIs
-    doc.add_heading('4.4 Admin APIs', 2)
-    
-    admin_apis = [
-        {
-            'endpoint': 'POST /api/admin/update-shift',
-            'description': 'Update employee shift for a specific date',
-            'request': '''{
-  "employee_id": "string",
-  "date": "string",
-  "shift_code": "string",
-  "admin_username": "string"
-}''',
-            'response': '{"success": true}',
-        },
-        {
-            'endpoint': 'POST /api/admin/upload-csv',
-            'description': 'Upload roster CSV file',
-            'request': 'multipart/form-data with file and month',
-            'response': '{"success": true, "message": "CSV imported"}',
-        },
-        {
-            'endpoint': 'POST /api/admin/export-csv',
-            'description': 'Export roster data as CSV',
-            'request': '{"months": ["string"]}',
-            'response': 'CSV file download',
-        },
-        {
-            'endpoint': 'POST /api/admin/save-team',
-            'description': 'Create or update a team',
-            'request': '{"name": "string", "description": "string"}',
-            'response': '{"success": true}',
-        },
-        {
-            'endpoint': 'POST /api/admin/save-employee',
-            'description': 'Create or update an employee',
-            'request': '{"id": "string", "name": "string", "team": "string"}',
-            'response': '{"success": true}',
-        },
-    ]
-    
-    for api in admin_apis:
-        doc.add_paragraph(api['endpoint']).bold = True
-        doc.add_paragraph(f"Description: {api['description']}")
-        doc.add_paragraph(f"Request Body:")
-        doc.add_paragraph(api['request'])
-        doc.add_paragraph(f"Response:")
-        doc.add_paragraph(api['response'])
-        doc.add_paragraph()
-    
-    # Data Sync APIs
-    doc.add_heading('4.5 Data Sync APIs', 2)
-    
-    sync_apis = [
-        {
-            'endpoint': 'POST /api/admin/sync-google-sheets',
-            'description': 'Manually trigger Google Sheets sync',
-            'response': '{"success": true, "employees": number, "sheets": number}',
-        },
-        {
-            'endpoint': 'POST /api/admin/set-auto-sync',
-            'description': 'Enable or disable automatic sync',
-            'request': '{"enabled": boolean}',
-            'response': '{"success": true}',
-        },
-        {
-            'endpoint': 'POST /api/admin/reset-to-google',
-            'description': 'Reset admin data to Google Sheets data',
-            'response': '{"success": true, "message": "Data reset"}',
-        },
-        {
-            'endpoint': 'GET /api/admin/get-modified-shifts',
-            'description': 'Get list of all modified shifts',
-            'response': '[{"employee_id": "string", "date": "string", "old_shift": "string", "new_shift": "string", ...}]',
-        },
-    ]
+    sections = {title: [] for title, _ in sorted(API_SECTIONS)}
+    for route in routes:
+        sections[api_section(route['path'])].append(route)
     
-    for api in sync_apis:
-        doc.add_paragraph(api['endpoint']).bold = True
-        doc.add_paragraph(f"Description: {api['description']}")
-        if 'request' in api:
-            doc.add_paragraph(f"Request Body:")
-            doc.add_paragraph(api['request'])
-        doc.add_paragraph(f"Response:")
-        doc.add_paragraph(api['response'])
-        doc.add_paragraph()
+    for title, section_routes in sections.items():
+        doc.add_heading(title, 2)
+        paragraphs = []
+        for route in section_routes:
+            paragraphs += api_paragraphs(route)
+        add_paragraphs(doc, paragraphs)
 
+@uses_files(*content_files('faq'))
 def add_faq_section(doc):
     """Add FAQ section"""
-    
-    # General Questions
-    doc.add_heading('5.1 General Questions', 2)
-    
-    general_faqs = [
-        {
-            'q': 'What browsers are supported?',
-            'a': 'The system works best on modern browsers including Chrome, Firefox, Safari, and Edge. '
-                 'We recommend using the latest version of Chrome for the best experience.',
-        },
-        {
-            'q': 'Is the system mobile-friendly?',
-            'a': 'Yes! The system is fully responsive and works on mobile devices, tablets, and desktops. '
-                 'The interface adapts to your screen size.',
-        },
-        {
-            'q': 'How often is the data updated?',
-            'a': 'If auto-sync is enabled, data is synchronized from Google Sheets every hour. You can also '
-                 'manually refresh at any time using the Refresh button.',
-        },
-        {
-            'q': 'Can I access the system from home?',
-            'a': 'Yes, if your organization has made the system accessible externally. Contact your IT '
-                 'department for the correct URL and VPN requirements if needed.',
-        },
-    ]
-    
-    for faq in general_faqs:
-        p = doc.add_paragraph()
-        p.add_run(f"Q: {faq['q']}").bold = True
-        doc.add_paragraph(f"A: {faq['a']}")
-        doc.add_paragraph()
-    
-    # Client Panel Questions
-    doc.add_heading('5.2 Client Panel Questions', 2)
-    
-    client_faqs = [
-        {
-            'q': 'Why can\'t I log in?',
-            'a': 'Make sure you are entering your Employee ID correctly (format: SLL-XXXXX). The ID is '
-                 'case-sensitive. Also verify that the password is "cartup123". If issues persist, '
-                 'contact your administrator.',
-        },
-        {
-            'q': 'How do I know if my request was approved?',
-            'a': 'Check the "Shift Changes" stat card on your dashboard. Approved changes will be reflected '
-                 'there. You can also check your schedule - approved changes will show the new shift.',
-        },
-        {
-            'q': 'Can I cancel a request after submitting?',
-            'a': 'Currently, you cannot cancel a request yourself. Contact your administrator if you need '
-                 'to cancel a pending request.',
-        },
-        {
-            'q': 'Why can\'t I request a swap with someone?',
-            'a': 'You can only swap shifts with team members from your own team. The system will only show '
-                 'employees from your team in the swap request search.',
-        },
-        {
-            'q': 'What do the shift codes mean?',
-            'a': 'M2 (8 AM-5 PM), M3 (9 AM-6 PM), M4 (10 AM-7 PM), D1 (12 PM-9 PM), D2 (1 PM-10 PM), '
-                 'DO (Day Off), SL (Sick Leave), CL (Casual Leave), EL (Emergency Leave), HL (Holiday Leave).',
-        },
-    ]
-    
-    for faq in client_faqs:
-        p = doc.add_paragraph()
-        p.add_run(f"Q: {faq['q']}").bold = True
-        doc.add_paragraph(f"A: {faq['a']}")
-        doc.add_paragraph()
-    
-    # Admin Panel Questions
-    doc.add_heading('5.3 Admin Panel Questions', 2)
-    
-    admin_faqs = [
-        {
-            'q': 'How do I add a new employee to the system?',
-            'a': 'Go to Team Management tab, select the team, click "Add Employee", fill in the details '
-                 '(Name, ID, Team), and save. The employee will appear in the roster immediately.',
-        },
-        {
-            'q': 'What happens when I approve a shift change request?',
-            'a': 'The employee\'s shift is immediately updated in the admin roster. The change is logged '
-                 'in the modification history and appears in the activity feed.',
-        },
-        {
-            'q': 'Can I undo a shift modification?',
-            'a': 'Yes, you can manually change the shift back to the original value, or use the '
-                 '"Reset to Google" button to reset all modifications at once (warning: this resets ALL changes).',
-        },
-        {
-            'q': 'How do I bulk import employee schedules?',
-            'a': 'Use the CSV Import tab. Download the template, fill it with your data following the format, '
-                 'then upload it. Select the correct month before uploading.',
-        },
-        {
-            'q': 'What\'s the difference between Google Data and Admin Data?',
-            'a': 'Google Data is the original roster from Google Sheets (read-only). Admin Data includes '
-                 'all modifications made by administrators. The system displays a merge of both.',
-        },
-    ]
-    
-    for faq in admin_faqs:
-        p = doc.add_paragraph()
-        p.add_run(f"Q: {faq['q']}").bold = True
-        doc.add_paragraph(f"A: {faq['a']}")
-        doc.add_paragraph()
-    
-    # Troubleshooting
-    doc.add_heading('5.4 Troubleshooting', 2)
-    
-    troubleshooting = [
-        {
-            'issue': 'Page not loading or showing errors',
-            'solution': 'Try refreshing the page (F5). Clear your browser cache. Check your internet connection. '
-                       'If the issue persists, contact IT support.',
-        },
-        {
-            'issue': 'Data not updating after sync',
-            'solution': 'Click the manual refresh button. Check if the Google Sheets links are correctly configured. '
-                       'Verify that the Google Sheet is published correctly as CSV.',
-        },
-        {
-            'issue': 'Cannot upload CSV file',
-            'solution': 'Ensure the file is in CSV format (.csv extension). Check that the file follows the '
-                       'template format. File size should not exceed 5MB. Try a different browser.',
-        },
-        {
-            'issue': 'Theme not applying correctly',
-            'solution': 'Clear your browser cache. Try selecting the theme again. Check if JavaScript is enabled '
-                       'in your browser settings.',
-        },
-        {
-            'issue': 'Forgot admin password',
-            'solution': 'Contact a Super Admin to reset your password through the User Management tab. Super Admins '
-                       'can reset passwords for other users.',
-        },
-    ]
-    
-    for item in troubleshooting:
-        p = doc.add_paragraph()
-        p.add_run(f"Issue: {item['issue']}").bold = True
-        doc.add_paragraph(f"Solution: {item['solution']}")
-        doc.add_paragraph()
+    add_content(doc, 'faq')
 
-def add_appendices(doc):
+@uses_files(*content_files('shift_codes'), *content_files('quick_reference'))
+def add_appendices(doc, draft=False):
     """Add appendices"""
+    add_content(doc, 'shift_codes')
+    
+    if draft:
+        # Roster statistics and coverage charts are the slowest sections; drafts leave them out
+        doc.add_heading('6.2 Shift Distribution Statistics', 2)
+        doc.add_paragraph('Omitted from draft builds.')
+        doc.add_heading('6.3 Staffing Coverage', 2)
+        doc.add_paragraph('Omitted from draft builds.')
+    else:
+        # Shift Distribution Statistics
+        add_shift_statistics_section(doc)
+        
+        # Staffing Coverage
+        add_coverage_section(doc)
+    
+    # Quick Reference Guide and support contacts
+    add_content(doc, 'quick_reference')
+
+@uses_files(ROSTER_FILES)
+def add_shift_statistics_section(doc):
+    """Add shift distribution statistics computed from the roster CSVs"""
+    doc.add_heading('6.2 Shift Distribution Statistics', 2)
     
-    # Shift Codes Reference
-    doc.add_heading('6.1 Shift Codes Reference', 2)
-    
-    doc.add_paragraph('Complete list of all shift codes used in the system:')
-    
-    shift_codes = [
-        ('M2', '8 AM – 5 PM', 'Morning Shift 2'),
-        ('M3', '9 AM – 6 PM', 'Morning Shift 3'),
-        ('M4', '10 AM – 7 PM', 'Morning Shift 4'),
-        ('D1', '12 PM – 9 PM', 'Day Shift 1'),
-        ('D2', '1 PM – 10 PM', 'Day Shift 2'),
-        ('DO', 'Day Off', 'Scheduled day off'),
-        ('SL', 'Sick Leave', 'Medical leave'),
-        ('CL', 'Casual Leave', 'Personal leave'),
-        ('EL', 'Emergency Leave', 'Urgent/emergency leave'),
-        ('HL', 'Holiday Leave', 'Public holiday or scheduled holiday'),
-    ]
-    
-    table = doc.add_table(rows=len(shift_codes) + 1, cols=3)
-    table.style = 'Light Grid Accent 1'
-    
-    hdr_cells = table.rows[0].cells
-    hdr_cells[0].text = 'Code'
-    hdr_cells[1].text = 'Time/Type'
-    hdr_cells[2].text = 'Description'
+    paths = roster_paths()
+    if shift_statistics is None or not paths:
+        doc.add_paragraph('Shift statistics are not available for this build (no roster data or NumPy not installed).')
+        return
     
-    for idx, (code, time, desc) in enumerate(shift_codes, 1):
-        row = table.rows[idx]
-        row.cells[0].text = code
-        row.cells[1].text = time
-        row.cells[2].text = desc
+    rosters = [load_roster(path) for path in paths]
+    stats = shift_statistics(rosters)
+    codes = list(stats['codes'])
     
-    # Quick Reference Guide
-    doc.add_heading('6.2 Quick Reference Guide', 2)
+    doc.add_paragraph(
+        'The tables below count every shift code in the current roster data '
+        f'({", ".join(os.path.basename(path) for path in paths)}).'
+    )
     
-    doc.add_paragraph('Client Panel Quick Actions:').bold = True
-    client_actions = [
-        ('View Schedule', 'Login → Dashboard shows today/tomorrow'),
-        ('Change Theme', 'Click Theme button → Select from dropdown'),
-        ('Request Shift Change', 'Click Request Shift Change → Select date → Choose shift → Submit'),
-        ('Request Swap', 'Click Request Swap → Select date → Choose employee → Submit'),
-        ('View Team Schedule', 'Click Shift View → Select date and team'),
-        ('Search Employee', 'Type in search box → Click employee'),
+    add_paragraphs(doc, [[('Shifts per Team:', True)]])
+    team_rows = [
+        [team] + [int(n) for n in counts] + [int(counts.sum())]
+        for team, counts in stats['teams'].items()
     ]
-    
-    table = doc.add_table(rows=len(client_actions) + 1, cols=2)
-    table.style = 'Light List Accent 1'
-    
-    hdr_cells = table.rows[0].cells
-    hdr_cells[0].text = 'Action'
-    hdr_cells[1].text = 'How To'
-    
-    for idx, (action, howto) in enumerate(client_actions, 1):
-        row = table.rows[idx]
-        row.cells[0].text = action
-        row.cells[1].text = howto
+    add_table(doc, team_rows, header=['Team'] + codes + ['Total'], style='Light Grid Accent 1')
     
     doc.add_paragraph()
-    doc.add_paragraph('Admin Panel Quick Actions:').bold = True
-    admin_actions = [
-        ('Approve Request', 'Schedule Requests tab → Find request → Click Approve'),
-        ('Modify Shift', 'Roster Data tab → Select date → Click shift → Choose new shift'),
-        ('Sync Data', 'Data Sync tab → Click Sync Now'),
-        ('Add Employee', 'Team Management tab → Add Employee → Fill form → Save'),
-        ('Export CSV', 'CSV Import tab → Select months → Click Export'),
-        ('Add Admin User', 'User Management tab → Add New User → Fill details → Create'),
+    add_paragraphs(doc, [[('Shifts per Employee:', True)]])
+    employee_rows = [
+        [name, team] + [int(n) for n in counts]
+        for name, team, counts in stats['employees'].values()
     ]
+    add_table(doc, employee_rows, header=['Employee', 'Team'] + codes, style='Light Grid Accent 1')
     
-    table = doc.add_table(rows=len(admin_actions) + 1, cols=2)
-    table.style = 'Light List Accent 1'
-    
-    hdr_cells = table.rows[0].cells
-    hdr_cells[0].text = 'Action'
-    hdr_cells[1].text = 'How To'
+    doc.add_paragraph()
+    add_paragraphs(doc, [[('Checks Against Sheet Totals:', True)]])
+    mismatches = stats['mismatches']
+    if not mismatches:
+        doc.add_paragraph('All per-code counts match the summary columns in the roster sheets.')
+        return
+    doc.add_paragraph(
+        f'{len(mismatches)} summary cell(s) in the roster sheets disagree with the shift codes '
+        'entered for that employee:'
+    )
+    add_table(
+        doc,
+        [(os.path.basename(source), name, column, sheet, computed)
+         for source, _, name, column, sheet, computed in mismatches],
+        header=['Roster', 'Employee', 'Column', 'Sheet', 'Counted'],
+        style='Light Grid Accent 1',
+    )
+
+@uses_files(ROSTER_FILES)
+def add_coverage_section(doc):
+    """Add hourly staffing coverage heatmaps computed from the roster CSVs"""
+    doc.add_heading('6.3 Staffing Coverage', 2)
     
-    for idx, (action, howto) in enumerate(admin_actions, 1):
-        row = table.rows[idx]
-        row.cells[0].text = action
-        row.cells[1].text = howto
+    paths = roster_paths()
+    if coverage_matrix is None or not paths:
+        doc.add_paragraph('Staffing coverage is not available for this build (no roster data or NumPy not installed).')
+        return
     
-    # Support Contact
-    doc.add_page_break()
-    doc.add_heading('Support & Contact', 1)
     doc.add_paragraph(
-        'For technical support, questions, or issues with the Cartup CxP Roster Management System, '
-        'please contact:'
+        'Each heatmap shows how many team members are on duty in each hour of each day, using the '
+        'shift time windows from section 6.1. Red cells are hours between 8 AM and 10 PM with nobody '
+        'on duty.'
     )
-    doc.add_paragraph()
-    doc.add_paragraph('IT Support Team')
-    doc.add_paragraph('Email: support@cartup.com')
-    doc.add_paragraph('Phone: +1-XXX-XXX-XXXX')
-    doc.add_paragraph('Hours: Monday - Friday, 9 AM - 5 PM')
-    
-    doc.add_paragraph()
-    doc.add_paragraph('System Administrator')
-    doc.add_paragraph('Email: admin@cartup.com')
     
-    doc.add_paragraph()
-    doc.add_paragraph('---')
-    doc.add_paragraph('Document Version: 1.0')
-    doc.add_paragraph('Last Updated: October 2025')
-    doc.add_paragraph('© 2025 Cartup CxP. All rights reserved.')
+    gaps = []
+    for path in paths:
+        roster = load_roster(path)
+        # A roster with no shift codes entered has nothing to chart
+        if not assigned_days(roster).any():
+            continue
+        matrix = coverage_matrix(roster)
+        roster_name = os.path.splitext(os.path.basename(path))[0]
+        for t, team in enumerate(roster.teams):
+            image = heatmap_image(matrix[t], roster.dates, f'{team} - {roster_name}')
+            if image:
+                add_screenshot(doc, image, f'{team} Staffing Coverage ({roster_name})')
+        gaps += [(roster_name,) + gap for gap in coverage_gaps(roster, matrix)]
+    
+    add_paragraphs(doc, [[('Coverage Gaps:', True)]])
+    if not gaps:
+        doc.add_paragraph('Every team has at least one person on duty throughout operating hours.')
+        return
+    add_table(
+        doc,
+        [(roster_name, team, date, f'{format_hour(start)} – {format_hour(end)}')
+         for roster_name, team, date, start, end in gaps],
+        header=['Roster', 'Team', 'Date', 'Nobody on Duty'],
+        style='Light Grid Accent 1',
+    )
+
+# Every add_* builder is traced when --trace is given
+instrument(globals(), 'add_')
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description='Generate USER_MANUAL.docx')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='render chapters in this many worker processes (0 = one per CPU)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='rebuild every chapter and ignore cached fragments')
+    parser.add_argument('--force', action='store_true',
+                        help='rebuild even when no input changed since the last successful build')
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument('--stream', action='store_const', dest='output', const='stream', default='memory',
+                         help='stream chapters and media into the package instead of saving at the end')
+    backend.add_argument('--patch', action='store_const', dest='output', const='patch',
+                         help='rewrite only the entries of the previous package that changed, '
+                              'copying the rest (media, styles) without recompressing')
+    parser.add_argument('--employee-docs', metavar='PATH',
+                        help='also write one schedule document per employee to this directory or .zip file')
+    parser.add_argument('--html', metavar='DIR', nargs='?', const='public/help',
+                        help='also render a static HTML help site (default: public/help)')
+    parser.add_argument('--markdown', metavar='DIR', nargs='?', const='manual_md',
+                        help='also render the manual as Markdown files (default: manual_md)')
+    parser.add_argument('--variant', action='append', choices=sorted(MANUAL_VARIANTS) + ['all'],
+                        help='manual variant to build; repeat for several (default: full)')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='write a Chrome trace (chrome://tracing, Perfetto) of every section, '
+                             'screenshot and save to FILE and print a timing summary')
+    parser.add_argument('--size-report', action='store_true',
+                        help='print the package size per chapter, per image and for XML versus media')
+    parser.add_argument('--budget', action='append', default=[], metavar='KEY=SIZE',
+                        help='size budget that fails the build when exceeded, e.g. image=150KB, '
+                             'chapter:2=600KB or total=5MB (none removes a default budget)')
+    parser.add_argument('--delta-screenshots', action='store_true',
+                        help='embed only the changed region of screenshots that nearly duplicate an '
+                             'earlier one in the same chapter (see python -m manual.similar)')
+    parser.add_argument('--draft', nargs='?', const='thumbnail', choices=('thumbnail', 'placeholder'),
+                        help='fast review build: low-resolution thumbnails (or labelled placeholders) '
+                             'instead of screenshots, no roster charts, written to *_draft.docx')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running: rebuild changed sections when inputs change and serve a '
+                             'live HTML preview (written to the --html directory if given)')
+    parser.add_argument('--port', type=int, default=8000,
+                        help='port of the --watch preview server (default: 8000)')
+    return parser.parse_args()
 
 if __name__ == '__main__':
+    args = parse_args()
     try:
-        create_manual()
+        # Part of every fragment cache key, so delta and full builds are cached separately
+        SCREENSHOT_SETTINGS['delta'] = args.delta_screenshots
+        SCREENSHOT_SETTINGS['draft'] = args.draft
+        renders = {name: path for name, path in (('html', args.html), ('markdown', args.markdown)) if path}
+        variants = list(MANUAL_VARIANTS) if 'all' in (args.variant or ()) else args.variant or ['full']
+        if args.watch:
+            try:
+                watch_manual(args.html or os.path.join(CACHE_DIR, 'preview'), args.port,
+                             jobs=args.jobs or os.cpu_count(), output=args.output,
+                             variants=list(dict.fromkeys(variants)), draft=bool(args.draft))
+            except KeyboardInterrupt:
+                print("\n👋 Stopped watching")
+            raise SystemExit(0)
+        budgets = parse_budgets(args.budget)
+        if args.trace:
+            enable_trace(args.trace)
+        outputs = create_manual(jobs=args.jobs or os.cpu_count(), use_cache=not args.no_cache,
+                                output=args.output, renders=renders, variants=list(dict.fromkeys(variants)),
+                                draft=bool(args.draft), force=args.force)
+        failures = []
+        for path in outputs:
+            report = size_report(path)
+            if args.size_report:
+                print_size_report(report)
+            failures += [f'{path}: {failure}' for failure in check_budgets(report, budgets)]
+        if args.employee_docs:
+            create_employee_documents(args.employee_docs, jobs=args.jobs or os.cpu_count(),
+                                      use_cache=not args.no_cache)
+        if args.trace:
+            summarize(finish_trace())
+            print(f"\n🔍 Trace written to {args.trace} (open in chrome://tracing or ui.perfetto.dev)")
+        if failures:
+            print("\n❌ Size budget exceeded:")
+            for failure in failures:
+                print(f"  - {failure}")
+            raise SystemExit(1)
         print("\n✅ SUCCESS: Complete user manual has been generated!")
-        print("📄 File location: USER_MANUAL.docx")
+        print(f"📄 File location: {', '.join(outputs)}")
         print("📸 Screenshots folder: MANUAL_SCREENSHOTS/")
         print("\nThe manual includes:")
         print("  ✓ Table of Contents")
@@ -0,0 +1,4 @@
+"""
+Support modules for generate_manual.py.
+Each module implements one stage of the user manual build.
+"""
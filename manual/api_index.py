@@ -0,0 +1,266 @@
+"""
+API reference extracted from the Next.js route handlers under app/api.
+Each route.ts is scanned for its exported HTTP method handlers, the fields it reads from
+the JSON body, form data, query string and path, whether it checks the admin session, and
+the shapes of the objects it returns with NextResponse.json. Results are kept in a
+persistent index; a file is re-parsed only when its mtime changed and its contents hash
+differently from the indexed copy.
+"""
+
+import glob
+import json
+import os
+import re
+
+from manual.cache import CACHE_DIR, file_digest, write_atomic
+
+# Bump when the extracted fields change
+API_INDEX_VERSION = 2
+
+API_ROOT = 'app/api'
+ROUTE_FILES = 'app/api/**/route.ts'
+
+HTTP_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+HANDLER = re.compile(r'export\s+(?:async\s+)?function\s+(' + '|'.join(HTTP_METHODS) + r')\s*\(')
+LINE_COMMENT = re.compile(r'(?m)(^|\s)//[^\n]*$')
+BLOCK_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+JSON_BODY = re.compile(r'const\s+(\{[^}]*\}|\w+)\s*=\s*await\s+\w+\.json\(\)')
+DESTRUCTURE = re.compile(r'const\s*(\{[^}]*\})\s*=\s*(\w+)\s*;?')
+FORM_FIELD = re.compile(r'formData\.get\(\s*[\'"]([^\'"]+)[\'"]')
+QUERY_PARAM = re.compile(r'searchParams\.get\(\s*[\'"]([^\'"]+)[\'"]')
+JSON_RESPONSE = re.compile(r'NextResponse\.json\(')
+RAW_RESPONSE = re.compile(r'new\s+NextResponse\(')
+CONTENT_TYPE = re.compile(r'[\'"]Content-Type[\'"]\s*:\s*[\'"]([^\'"]+)[\'"]')
+STATUS = re.compile(r'status\s*:\s*(\d{3})')
+PATH_PARAM = re.compile(r'\[(\w+)\]')
+
+def index_path():
+    """Return the location of the persistent API index"""
+    return os.path.join(CACHE_DIR, 'api_index.json')
+
+def endpoint_path(route_file, root=API_ROOT):
+    """Return the URL path served by a route file, e.g. '/api/admin/login'"""
+    rel = os.path.relpath(os.path.dirname(route_file), os.path.dirname(root))
+    return '/' + rel.replace(os.sep, '/')
+
+def strip_comments(source):
+    """Remove // and /* */ comments, leaving string contents alone where it matters"""
+    source = BLOCK_COMMENT.sub('', source)
+    return LINE_COMMENT.sub(r'\1', source)
+
+def split_top_level(text, sep=','):
+    """Split text on sep where it is not nested in brackets or quotes"""
+    parts, depth, quote, start = [], 0, None, 0
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if quote:
+            if ch == '\\':
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in '\'"`':
+            quote = ch
+        elif ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+        i += 1
+    parts.append(text[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+def call_arguments(source, open_paren):
+    """Return the argument list of the call whose '(' is at open_paren"""
+    depth, quote = 0, None
+    i = open_paren
+    while i < len(source):
+        ch = source[i]
+        if quote:
+            if ch == '\\':
+                i += 1
+            elif ch == quote:
+                quote = None
+        elif ch in '\'"`':
+            quote = ch
+        elif ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+            if depth == 0:
+                return split_top_level(source[open_paren + 1:i])
+        i += 1
+    return []
+
+def destructured_names(pattern):
+    """Return the names bound by an object pattern such as '{ a, b: c, d = 1 }'"""
+    names = []
+    for entry in split_top_level(pattern.strip()[1:-1]):
+        name = re.split(r'[:=]', entry, 1)[0].strip().lstrip('.')
+        if name:
+            names.append(name)
+    return names
+
+def literal_shape(expr):
+    """Describe a JS expression as a JSON-like shape: object keys kept, values abstracted"""
+    expr = expr.strip()
+    if expr.startswith('{') and expr.endswith('}'):
+        fields = {}
+        for entry in split_top_level(expr[1:-1]):
+            if entry.startswith('...'):
+                continue
+            key, _, value = entry.partition(':')
+            key = key.strip().strip('\'"')
+            fields[key] = literal_shape(value) if value else '...'
+        return fields
+    if expr in ('true', 'false'):
+        return expr == 'true'
+    if expr == 'null':
+        return None
+    if re.fullmatch(r'-?\d+(\.\d+)?', expr):
+        return float(expr) if '.' in expr else int(expr)
+    if expr[:1] in '\'"`':
+        return 'string'
+    if expr.startswith('['):
+        return ['...']
+    return '...'
+
+def format_shape(shape):
+    """Render a shape from literal_shape as compact JSON-like text"""
+    if isinstance(shape, dict):
+        return '{' + ', '.join(f'"{k}": {format_shape(v)}' for k, v in shape.items()) + '}'
+    if isinstance(shape, list):
+        return '[...]'
+    if shape == '...':
+        return '...'
+    return json.dumps(shape)
+
+def handler_bodies(source):
+    """Yield (method, source of the handler) for each exported HTTP method"""
+    matches = list(HANDLER.finditer(source))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(source)
+        yield match.group(1), source[match.start():end]
+
+def parse_handler(method, body):
+    """Extract the request and response description of one handler"""
+    request = []
+    for target in JSON_BODY.findall(body):
+        if target.startswith('{'):
+            request += destructured_names(target)
+        else:
+            for pattern, name in DESTRUCTURE.findall(body):
+                if name == target:
+                    request += destructured_names(pattern)
+    form = FORM_FIELD.findall(body)
+    query = QUERY_PARAM.findall(body)
+
+    responses = []
+    for match in JSON_RESPONSE.finditer(body):
+        args = call_arguments(body, match.end() - 1)
+        if not args:
+            continue
+        status = STATUS.search(args[1]) if len(args) > 1 else None
+        responses.append({
+            'status': int(status.group(1)) if status else 200,
+            'shape': literal_shape(args[0]),
+            'expression': args[0] if not args[0].startswith('{') else None,
+        })
+    for match in RAW_RESPONSE.finditer(body):
+        args = call_arguments(body, match.end() - 1)
+        content_type = CONTENT_TYPE.search(args[1]) if len(args) > 1 else None
+        status = STATUS.search(args[1]) if len(args) > 1 else None
+        responses.append({
+            'status': int(status.group(1)) if status else 200,
+            'shape': None,
+            'expression': content_type.group(1) if content_type else 'text/plain',
+        })
+
+    return {
+        'method': method,
+        'auth': 'getSessionUser()' in body,
+        'json_fields': list(dict.fromkeys(request)),
+        'form_fields': list(dict.fromkeys(form)),
+        'query_params': list(dict.fromkeys(query)),
+        'responses': responses,
+    }
+
+def parse_route_file(path, root=API_ROOT):
+    """Return the index entries for every handler exported by one route.ts"""
+    with open(path, encoding='utf-8') as f:
+        source = strip_comments(f.read())
+    endpoint = endpoint_path(path, root)
+    params = PATH_PARAM.findall(endpoint)
+    routes = []
+    for method, body in handler_bodies(source):
+        route = parse_handler(method, body)
+        route['path'] = endpoint
+        route['path_params'] = params
+        routes.append(route)
+    return routes
+
+def success_response(route):
+    """Return the response a successful call produces: the last 2xx without an error key"""
+    candidates = [r for r in route['responses'] if r['status'] < 400
+                  and not (isinstance(r['shape'], dict) and 'error' in r['shape'])]
+    return candidates[-1] if candidates else None
+
+def error_statuses(route):
+    """Return the distinct HTTP error statuses a route can answer with"""
+    return sorted({r['status'] for r in route['responses'] if r['status'] >= 400})
+
+def describe_response(response):
+    """Return display text for a response entry"""
+    if response is None:
+        return 'None'
+    if response['shape'] is None:
+        return f"{response['expression']} file download"
+    if response['expression']:
+        return f"Result of {response['expression']}"
+    return format_shape(response['shape'])
+
+def load_api_index(pattern=ROUTE_FILES, root=API_ROOT, use_cache=True):
+    """Return the API index, re-parsing only route files whose contents changed.
+
+    The index maps route file paths to their mtime, size, digest and parsed routes.
+    """
+    path = index_path()
+    index = {}
+    if use_cache and os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored.get('version') == API_INDEX_VERSION:
+            index = stored['files']
+
+    files = {}
+    changed = False
+    for route_file in sorted(glob.glob(pattern, recursive=True)):
+        rel = os.path.relpath(route_file).replace(os.sep, '/')
+        st = os.stat(route_file)
+        entry = index.get(rel)
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            files[rel] = entry
+            continue
+        digest = file_digest(route_file)
+        if entry and entry['sha256'] == digest:
+            entry = dict(entry, mtime_ns=st.st_mtime_ns, size=st.st_size)
+        else:
+            entry = {'sha256': digest, 'routes': parse_route_file(route_file, root)}
+            entry.update(mtime_ns=st.st_mtime_ns, size=st.st_size)
+        files[rel] = entry
+        changed = True
+
+    if use_cache and (changed or files.keys() != index.keys()):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Keys keep their source order: response shapes are printed in that order
+        data = json.dumps({'version': API_INDEX_VERSION, 'files': files}, indent=1)
+        write_atomic(path, data.encode('utf-8'))
+    return files
+
+def api_routes(pattern=ROUTE_FILES, root=API_ROOT, use_cache=True):
+    """Return every indexed route, sorted by path and method"""
+    routes = [route for entry in load_api_index(pattern, root, use_cache).values() for route in entry['routes']]
+    return sorted(routes, key=lambda r: (r['path'], HTTP_METHODS.index(r['method'])))
@@ -0,0 +1,253 @@
+"""
+Screenshot asset manifest.
+Every file under MANUAL_SCREENSHOTS is indexed in a SQLite database in the cache with
+its content hash, pixel dimensions, DPI and byte size, plus the processed copies built
+from its current contents. A row is re-read only when the file's mtime or size changed,
+so builds take hashes (and, for delta rendering, dimensions) from the index instead of
+reading every screenshot again.
+`python -m manual.assets` refreshes the index and reports missing, orphaned and
+oversized screenshots.
+"""
+
+import argparse
+import glob
+import os
+import sqlite3
+import threading
+
+from manual.cache import cache_path, file_digest
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; screenshots are indexed without dimensions
+    Image = None
+
+# Bump when the manifest schema changes; older manifests are rebuilt
+MANIFEST_VERSION = 2
+
+SCREENSHOT_DIR = 'MANUAL_SCREENSHOTS'
+SCREENSHOT_FILES = 'MANUAL_SCREENSHOTS/**/*.png'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS screenshots (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    width INTEGER,
+    height INTEGER,
+    dpi REAL
+);
+CREATE TABLE IF NOT EXISTS variants (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    location TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    width_in REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS variants_path ON variants (path);
+"""
+
+# One connection per process and manifest file, shared by threads under the lock
+_manifest = {'pid': None, 'path': None, 'db': None, 'lock': None}
+
+def manifest_path():
+    """Return the location of the manifest database"""
+    return cache_path('manifest', 'screenshots', '.sqlite')
+
+def _state():
+    if _manifest['pid'] != os.getpid():
+        # SQLite connections and locks must not be shared with forked worker processes
+        _manifest.update(pid=os.getpid(), path=None, db=None, lock=threading.Lock())
+    return _manifest
+
+def _db():
+    """Return this process's connection; call with the lock held"""
+    path = manifest_path()
+    if _manifest['path'] != path:
+        db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        db.execute('PRAGMA journal_mode=WAL')
+        if db.execute('PRAGMA user_version').fetchone()[0] != MANIFEST_VERSION:
+            db.executescript('DROP TABLE IF EXISTS screenshots; DROP TABLE IF EXISTS variants;')
+            db.execute(f'PRAGMA user_version = {MANIFEST_VERSION}')
+        db.executescript(SCHEMA)
+        _manifest.update(path=path, db=db)
+    return _manifest['db']
+
+def is_screenshot(path):
+    """Return whether a path lies under the screenshot directory"""
+    return os.path.relpath(path).split(os.sep)[0] == SCREENSHOT_DIR
+
+def _read_asset(path, st):
+    """Hash and probe one file; only the image header is read for its dimensions"""
+    row = {'path': path, 'mtime_ns': st.st_mtime_ns, 'bytes': st.st_size, 'sha256': file_digest(path),
+           'width': None, 'height': None, 'dpi': None}
+    if Image is not None:
+        try:
+            with Image.open(path) as im:
+                row['width'], row['height'] = im.size
+                dpi = im.info.get('dpi')
+                row['dpi'] = float(dpi[0]) if dpi else None
+        except OSError:
+            pass
+    return row
+
+def _store(db, row):
+    db.execute('INSERT OR REPLACE INTO screenshots '
+               'VALUES (:path, :mtime_ns, :bytes, :sha256, :width, :height, :dpi)', row)
+
+def asset_info(path):
+    """Return the manifest row of a screenshot as a dict, re-indexing it if it changed; None if missing"""
+    path = os.path.relpath(path)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    with _state()['lock']:
+        db = _db()
+        row = db.execute('SELECT * FROM screenshots WHERE path = ?', (path,)).fetchone()
+    if row is not None and row['mtime_ns'] == st.st_mtime_ns and row['bytes'] == st.st_size:
+        return dict(row)
+    row = _read_asset(path, st)
+    with _state()['lock']:
+        _store(_db(), row)
+    return row
+
+def asset_digest(path):
+    """Return the SHA-256 of a file, from the manifest for screenshots"""
+    if is_screenshot(path):
+        info = asset_info(path)
+        if info is not None:
+            return info['sha256']
+    return file_digest(path)
+
+def asset_size(path):
+    """Return the (width, height) of a screenshot from the manifest, or None if unknown"""
+    info = asset_info(path) if is_screenshot(path) else None
+    if info is None or info['width'] is None:
+        return None
+    return info['width'], info['height']
+
+def record_variant(path, key, location, width_in):
+    """Note a processed copy of a screenshot, built under cache key.
+
+    Copies built from an earlier version of the file are dropped.
+    """
+    sha = asset_digest(path)
+    path = os.path.relpath(path)
+    with _state()['lock']:
+        db = _db()
+        if db.execute('SELECT 1 FROM variants WHERE key = ? AND location = ?', (key, location)).fetchone():
+            return
+        db.execute('BEGIN')
+        db.execute('DELETE FROM variants WHERE path = ? AND sha256 != ?', (path, sha))
+        db.execute('INSERT OR REPLACE INTO variants VALUES (?, ?, ?, ?, ?, ?)',
+                   (key, path, sha, location, os.path.getsize(location), width_in))
+        db.execute('COMMIT')
+
+def refresh_manifest(pattern=SCREENSHOT_FILES):
+    """Bring the manifest up to date with the screenshot directory.
+
+    Only files whose mtime or size changed are read again. Rows of deleted files, variants
+    built from an earlier version of a file and variants whose cached copy was evicted are
+    removed. Returns (indexed, re-read, removed).
+    """
+    paths = sorted(os.path.relpath(path) for path in glob.glob(pattern, recursive=True))
+    with _state()['lock']:
+        db = _db()
+        known = {row['path']: (row['mtime_ns'], row['bytes'])
+                 for row in db.execute('SELECT path, mtime_ns, bytes FROM screenshots')}
+    changed = []
+    for path in paths:
+        st = os.stat(path)
+        if known.get(path) != (st.st_mtime_ns, st.st_size):
+            changed.append(_read_asset(path, st))
+    removed = sorted(set(known) - set(paths))
+    with _state()['lock']:
+        db = _db()
+        db.execute('BEGIN')
+        for row in changed:
+            _store(db, row)
+        db.executemany('DELETE FROM screenshots WHERE path = ?', [(path,) for path in removed])
+        db.executemany('DELETE FROM variants WHERE path = ?', [(path,) for path in removed])
+        db.execute('DELETE FROM variants WHERE sha256 != '
+                   '(SELECT sha256 FROM screenshots WHERE screenshots.path = variants.path)')
+        evicted = [(row['key'],) for row in db.execute('SELECT key, location FROM variants')
+                   if not os.path.exists(row['location'])]
+        db.executemany('DELETE FROM variants WHERE key = ?', evicted)
+        db.execute('COMMIT')
+    return len(paths), len(changed), len(removed)
+
+def referenced_screenshots():
+    """Return {path: [(content section, Screenshot node), ...]} for every screenshot the content files embed"""
+    from manual.content import CONTENT_DIR, screenshot_nodes
+
+    references = {}
+    for source in sorted(glob.glob(os.path.join(CONTENT_DIR, '*.md'))):
+        name = os.path.splitext(os.path.basename(source))[0]
+        for node in screenshot_nodes(name):
+            references.setdefault(os.path.normpath(node.path), []).append((name, node))
+    return references
+
+def manifest_report(max_bytes):
+    """Return missing, orphaned and oversized screenshots according to the manifest.
+
+    Call refresh_manifest() first. A screenshot is oversized when a copy processed with the
+    current SCREENSHOT_SETTINGS (for any crop and callouts the content gives it), or its
+    source file if no such copy has been built yet, exceeds max_bytes.
+    """
+    from manual.images import variant_key
+
+    references = referenced_screenshots()
+    current = {variant_key(path, None, node.crop, node.callouts)
+               for path, uses in references.items() if os.path.exists(path) for _, node in uses}
+    with _state()['lock']:
+        db = _db()
+        rows = {row['path']: dict(row) for row in db.execute('SELECT * FROM screenshots')}
+        variants = db.execute('SELECT key, path, bytes FROM variants').fetchall()
+    embedded = {}
+    for row in variants:
+        if row['key'] in current:
+            embedded[row['path']] = max(embedded.get(row['path'], 0), row['bytes'])
+    oversized = []
+    for path, row in rows.items():
+        size = embedded.get(path, row['bytes'])
+        if size > max_bytes:
+            oversized.append(dict(row, embedded_bytes=size, processed=path in embedded))
+    return {
+        'indexed': len(rows),
+        'missing': {path: sorted({name for name, _ in uses}) for path, uses in sorted(references.items())
+                    if path not in rows},
+        'orphaned': sorted(path for path in rows if path not in references),
+        'oversized': sorted(oversized, key=lambda row: -row['embedded_bytes']),
+    }
+
+def main():
+    from manual.size import SIZE_BUDGETS, format_size, parse_size
+
+    parser = argparse.ArgumentParser(description='Report missing, orphaned and oversized manual screenshots')
+    parser.add_argument('--max-size', default=SIZE_BUDGETS['image'],
+                        help=f"largest acceptable embedded screenshot (default: {SIZE_BUDGETS['image']})")
+    args = parser.parse_args()
+
+    indexed, reread, removed = refresh_manifest()
+    print(f"🗂️  {indexed} screenshots indexed ({reread} re-read, {removed} removed) in {manifest_path()}")
+    report = manifest_report(parse_size(args.max_size))
+    print(f"\n❓ Missing ({len(report['missing'])}): referenced by content but not on disk")
+    for path, names in report['missing'].items():
+        print(f"  {path}  ({', '.join(names)})")
+    print(f"\n🧹 Orphaned ({len(report['orphaned'])}): on disk but not referenced by any content file")
+    for path in report['orphaned']:
+        print(f"  {path}")
+    print(f"\n🐘 Oversized ({len(report['oversized'])}): larger than {args.max_size} as embedded")
+    for row in report['oversized']:
+        dims = f"{row['width']}x{row['height']}" if row['width'] else '?'
+        if row['dpi']:
+            dims += f" @ {row['dpi']:.0f} dpi"
+        kind = 'embedded' if row['processed'] else 'source, not yet processed'
+        print(f"  {row['path']}  {dims}  {format_size(row['embedded_bytes'])} ({kind})")
+
+if __name__ == '__main__':
+    main()
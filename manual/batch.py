@@ -0,0 +1,164 @@
+"""
+Batch generation of personalised schedule documents, one per employee.
+Each document holds the employee's rows from every roster CSV, their pending schedule
+requests, and excerpts from the manual (rendered once as cached fragments). Documents are
+rendered in a process pool; every worker parses the document template once and reuses
+it for all of its employees. Output goes to a directory or into a single .zip file.
+"""
+
+import io
+import json
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from manual.emit import add_paragraphs, add_table
+from manual.fragments import append_fragment
+from manual.roster import SHIFT_LABELS
+
+REQUESTS_FILE = 'data/schedule_requests.json'
+
+# Per-process state set up once by _init_worker
+_worker = {}
+
+def load_pending_requests(path=REQUESTS_FILE):
+    """Return the pending shift change and swap requests from the app's data file"""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    requests = data.get('shift_change_requests', []) + data.get('swap_requests', [])
+    return [r for r in requests if r.get('status') == 'pending']
+
+def employee_records(rosters, requests=()):
+    """Collect each employee's roster rows and pending requests, in roster order"""
+    records = {}
+    for roster in rosters:
+        roster_name = os.path.splitext(os.path.basename(roster.source))[0]
+        for i, employee_id in enumerate(roster.employee_ids):
+            record = records.setdefault(employee_id, {
+                'id': employee_id,
+                'name': roster.employee_names[i],
+                'team': roster.teams[roster.team_index[i]],
+                'schedules': [],
+                'requests': [],
+            })
+            days = [(date, roster.codes[c]) for date, c in zip(roster.dates, roster.shifts[i]) if c]
+            if days:
+                record['schedules'].append((roster_name, days))
+
+    for request in requests:
+        for key in ('employee_id', 'requester_id', 'target_employee_id'):
+            if request.get(key) in records:
+                records[request[key]]['requests'].append(request)
+    return list(records.values())
+
+def document_filename(record):
+    """Return a filesystem-safe file name for an employee's document"""
+    return re.sub(r'[^\w.-]+', '_', f"{record['id']}_{record['name']}").strip('_') + '.docx'
+
+def _init_worker(excerpts, output_dir):
+    # Parse the template once; every document is built in this one reset between employees
+    _worker['doc'] = Document()
+    _worker['excerpts'] = excerpts
+    _worker['output_dir'] = output_dir
+
+def _reset(doc):
+    body = doc.element.body
+    for el in list(body):
+        if el.tag != qn('w:sectPr'):
+            body.remove(el)
+
+def render_employee_document(record):
+    """Render one employee's document and return (file name, bytes or None if written)"""
+    doc = _worker['doc']
+    _reset(doc)
+    doc.core_properties.title = f"Schedule - {record['name']} ({record['id']})"
+    doc.core_properties.author = "Cartup CxP Team"
+
+    doc.add_heading(f"Personal Schedule: {record['name']}", 0)
+    add_paragraphs(doc, [
+        [('Employee ID: ', True), record['id']],
+        [('Team: ', True), record['team']],
+    ])
+
+    for roster_name, days in record['schedules']:
+        doc.add_heading(f'Schedule: {roster_name}', 1)
+        add_table(
+            doc,
+            [(date, code, SHIFT_LABELS.get(code, code)) for date, code in days],
+            header=['Date', 'Shift', 'Time/Type'],
+            style='Light Grid Accent 1',
+        )
+
+    doc.add_heading('Pending Requests', 1)
+    if record['requests']:
+        add_table(doc, [_request_row(record, r) for r in record['requests']],
+                  header=['Date', 'Type', 'Details', 'Submitted'], style='Light Grid Accent 1')
+    else:
+        doc.add_paragraph('You have no pending shift change or swap requests.')
+
+    if _worker['excerpts']:
+        doc.add_heading('From the User Manual', 1)
+        for fragment in _worker['excerpts']:
+            append_fragment(doc, fragment)
+
+    name = document_filename(record)
+    output_dir = _worker['output_dir']
+    if output_dir is not None:
+        doc.save(os.path.join(output_dir, name))
+        return name, None
+    buf = io.BytesIO()
+    doc.save(buf)
+    return name, buf.getvalue()
+
+def _request_row(record, request):
+    if request.get('type') == 'swap':
+        other = (request.get('target_employee_name') if request.get('requester_id') == record['id']
+                 else request.get('requester_name'))
+        details = f"Swap with {other}"
+        kind = 'Shift Swap'
+    else:
+        details = f"{request.get('current_shift', '')} → {request.get('requested_shift', '')}"
+        kind = 'Shift Change'
+    return (request.get('date', ''), kind, details, (request.get('created_at') or '')[:10])
+
+def write_employee_documents(records, excerpts, output, jobs=1):
+    """Render a document per record into a directory, or a .zip if output ends in .zip.
+
+    excerpts is a list of manual section fragments appended to every document.
+    Returns the number of documents written.
+    """
+    to_zip = output.lower().endswith('.zip')
+    output_dir = None if to_zip else output
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    archive = zipfile.ZipFile(output, 'w') if to_zip else None
+
+    count = 0
+    try:
+        if jobs > 1 and len(records) > 1:
+            chunksize = max(1, len(records) // (jobs * 8))
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(excerpts, output_dir)) as pool:
+                results = pool.map(render_employee_document, records, chunksize=chunksize)
+                for name, data in results:
+                    count += _store(archive, name, data)
+        else:
+            _init_worker(excerpts, output_dir)
+            for record in records:
+                count += _store(archive, *render_employee_document(record))
+    finally:
+        if archive is not None:
+            archive.close()
+    return count
+
+def _store(archive, name, data):
+    if archive is not None:
+        # .docx files are already deflated; store them as-is
+        archive.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+    return 1
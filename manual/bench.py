@@ -0,0 +1,273 @@
+"""
+Benchmark suite for the manual generator.
+Each scenario builds a document in stages - paragraph emission, table building, image
+embedding and save - and records wall time, CPU time, peak Python heap (tracemalloc)
+and peak resident memory for every stage. The 'manual' scenario uses the real content
+and screenshots; the others scale it up synthetically. Results are appended to a JSON
+Lines file together with the git commit, and each run is compared with the most recent
+run of the same scenario on a different commit, so regressions show up between commits.
+
+    python -m manual.bench                      # default scenarios
+    python -m manual.bench -s table-10k -s sections-100x
+    python -m manual.bench --cold               # empty image cache: include resampling
+"""
+
+import argparse
+import glob
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from docx import Document
+
+from manual import cache
+from manual.content import CONTENT_DIR, Screenshot, load_content
+from manual.emit import add_paragraphs, add_table
+from manual.images import add_screenshot
+from manual.model import Heading, Paragraph, Table
+from manual.size import format_size
+
+SCREENSHOT_FILES = 'MANUAL_SCREENSHOTS/**/*.png'
+
+# name -> (content repetitions, synthetic table rows, screenshots: 'real', a count, or 0)
+SCENARIOS = {
+    'manual': (1, 0, 'real'),
+    'sections-10x': (10, 0, 0),
+    'sections-100x': (100, 0, 0),
+    'table-1k': (1, 1000, 0),
+    'table-10k': (1, 10000, 0),
+    'screenshots-200': (1, 0, 200),
+    'build': None,  # end-to-end create_manual with no fragment cache
+}
+
+DEFAULT_SCENARIOS = ('manual', 'sections-10x', 'table-1k', 'screenshots-200', 'build')
+
+STAGES = ('paragraphs', 'tables', 'images', 'save')
+
+# Relative slowdown reported as a regression against the previous commit's run
+REGRESSION_THRESHOLD = 0.10
+
+def _reset_peak_rss():
+    try:
+        # Linux: writing 5 resets the VmHWM high-water mark of this process
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def _peak_rss():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def measure(func, *args):
+    """Run func(*args) and return (result, metrics dict)"""
+    _reset_peak_rss()
+    tracemalloc.start()
+    wall, cpu = time.perf_counter(), time.process_time()
+    result = func(*args)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {'wall': wall, 'cpu': cpu, 'py_peak': py_peak, 'rss_peak': _peak_rss()}
+
+def content_nodes():
+    """Return all compiled content nodes, flattening conditional blocks"""
+    nodes = []
+    for path in sorted(glob.glob(os.path.join(CONTENT_DIR, '*.md'))):
+        pending = list(load_content(os.path.splitext(os.path.basename(path))[0]))
+        while pending:
+            node = pending.pop(0)
+            children = getattr(node, 'children', None)
+            if children is not None:
+                pending[:0] = children
+            else:
+                nodes.append(node)
+    return nodes
+
+def synthetic_screenshots(count):
+    """Return paths of `count` distinct screenshots derived from the real ones"""
+    from PIL import Image
+
+    sources = sorted(glob.glob(SCREENSHOT_FILES, recursive=True))
+    directory = os.path.join(cache.CACHE_DIR, 'bench', 'screens')
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f'{i:04d}.png')
+        if not os.path.exists(path):
+            with Image.open(sources[i % len(sources)]) as im:
+                im = im.convert('RGB')
+                # Stamp a pixel so every copy has distinct bytes and is embedded separately
+                im.putpixel((i % im.width, 0), (i % 256, (i // 256) % 256, 0))
+                im.save(path, 'PNG')
+        paths.append(os.path.relpath(path))
+    return paths
+
+def roster_rows(count, days=31):
+    """Return roster-like rows: team, name, ID and a shift code per day"""
+    codes = ('M2', 'M3', 'M4', 'D1', 'D2', 'DO', 'SL')
+    return [[f'Team {i % 12}', f'Employee {i}', f'SLL-{10000 + i}'] +
+            [codes[(i + d) % len(codes)] for d in range(days)] for i in range(count)]
+
+def run_stages(repeat, table_rows, screenshots):
+    """Build a synthetic document stage by stage and return {stage: metrics}"""
+    nodes = content_nodes()
+    paragraphs = [[(text, bold) for text, bold, _ in n.runs] for n in nodes if isinstance(n, Paragraph)]
+    headings = [n for n in nodes if isinstance(n, Heading)]
+    tables = [n for n in nodes if isinstance(n, Table)]
+    if screenshots == 'real':
+        screenshots = [n.path for n in nodes if isinstance(n, Screenshot)]
+    else:
+        screenshots = synthetic_screenshots(screenshots) if screenshots else []
+    doc = Document()
+
+    def emit_paragraphs():
+        for _ in range(repeat):
+            for heading in headings:
+                doc.add_heading(heading.text, heading.level)
+            add_paragraphs(doc, paragraphs)
+
+    def build_tables():
+        for _ in range(repeat):
+            for table in tables:
+                add_table(doc, table.rows[1:], header=table.rows[0], style=table.style)
+        if table_rows:
+            rows = roster_rows(table_rows)
+            add_table(doc, rows, header=['Team', 'Name', 'ID'] + [f'{d + 1}Oct' for d in range(31)],
+                      style='Light Grid Accent 1')
+
+    def embed_images():
+        for path in screenshots:
+            add_screenshot(doc, path, os.path.basename(path))
+
+    def save():
+        buf = io.BytesIO()
+        doc.save(buf)
+        return len(buf.getvalue())
+
+    results = {}
+    for stage, func in zip(STAGES, (emit_paragraphs, build_tables, embed_images, save)):
+        size, results[stage] = measure(func)
+    results['save']['bytes'] = size
+    return results
+
+def run_build():
+    """Time an end-to-end build of the full manual without the fragment cache"""
+    import generate_manual
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'manual.docx')
+        variant = dict(generate_manual.MANUAL_VARIANTS['full'], output=output)
+        generate_manual.MANUAL_VARIANTS['bench'] = variant
+        try:
+            _, metrics = measure(generate_manual.create_manual, 1, False, 'memory', None, ('bench',))
+        finally:
+            del generate_manual.MANUAL_VARIANTS['bench']
+        metrics['bytes'] = os.path.getsize(output)
+    return {'total': metrics}
+
+def git_commit():
+    """Return (short commit hash, whether the tree has uncommitted changes), or (None, False)"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+    return commit, dirty
+
+def load_results(path):
+    """Return the stored benchmark records, oldest first"""
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def previous_run(records, scenario, commit, cold):
+    """Return the latest stored run of a scenario from another commit"""
+    for record in reversed(records):
+        if record['scenario'] == scenario and record['commit'] != commit and record.get('cold') == cold:
+            return record
+    return None
+
+def report(scenario, stages, baseline):
+    """Print one scenario's stage table and return the stages that regressed"""
+    print(f"\n📊 {scenario}" + (f"  (vs {baseline['commit']})" if baseline else ''))
+    print(f"  {'stage':<12}{'wall':>10}{'cpu':>10}{'py peak':>12}{'rss peak':>12}{'change':>10}")
+    regressions = []
+    for stage, m in stages.items():
+        change = ''
+        before = baseline['stages'].get(stage) if baseline else None
+        if before and before['wall'] > 0.01:
+            delta = m['wall'] / before['wall'] - 1
+            change = f'{delta:+.0%}'
+            if delta > REGRESSION_THRESHOLD:
+                change += ' ⚠️'
+                regressions.append(stage)
+        print(f"  {stage:<12}{m['wall']:>9.3f}s{m['cpu']:>9.3f}s{format_size(m['py_peak']):>12}"
+              f"{format_size(m['rss_peak']):>12}{change:>10}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the manual generator')
+    parser.add_argument('-s', '--scenario', action='append', choices=sorted(SCENARIOS),
+                        help='scenario to run; repeat for several (default: %s)' % ', '.join(DEFAULT_SCENARIOS))
+    parser.add_argument('--cold', action='store_true',
+                        help='use an empty cache so screenshot resampling is included')
+    parser.add_argument('--results', default=os.path.join(cache.CACHE_DIR, 'bench', 'results.jsonl'),
+                        help='JSON Lines file the results are appended to')
+    args = parser.parse_args()
+
+    commit, dirty = git_commit()
+    records = load_results(args.results)
+    cold_dir = tempfile.TemporaryDirectory() if args.cold else None
+    if cold_dir:
+        cache.CACHE_DIR = cold_dir.name
+
+    regressions = {}
+    new_records = []
+    try:
+        for scenario in args.scenario or DEFAULT_SCENARIOS:
+            params = SCENARIOS[scenario]
+            stages = run_build() if params is None else run_stages(*params)
+            record = {
+                'scenario': scenario,
+                'commit': commit,
+                'dirty': dirty,
+                'cold': args.cold,
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'cpus': os.cpu_count(),
+                'stages': stages,
+            }
+            new_records.append(record)
+            slower = report(scenario, stages, previous_run(records, scenario, commit, args.cold))
+            if slower:
+                regressions[scenario] = slower
+    finally:
+        if cold_dir:
+            cold_dir.cleanup()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.results)), exist_ok=True)
+    with open(args.results, 'a', encoding='utf-8') as f:
+        for record in new_records:
+            f.write(json.dumps(record, sort_keys=True) + '\n')
+    print(f"\n💾 Results appended to {args.results}")
+    for scenario, stages in regressions.items():
+        print(f"⚠️  {scenario}: {', '.join(stages)} more than {REGRESSION_THRESHOLD:.0%} slower than the previous commit")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+On-disk cache shared by the manual build stages.
+Entries are content-addressed: the key is a hash of everything that affects the output.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+CACHE_DIR = os.environ.get('MANUAL_CACHE_DIR', os.path.join(os.getcwd(), '.manual_cache'))
+
+def file_digest(path):
+    """Return the SHA-256 hex digest of a file's contents"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def make_key(*parts):
+    """Build a cache key from JSON-serializable parts"""
+    blob = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()
+
+def cache_path(namespace, key, ext=''):
+    """Return the path of a cache entry, creating its directory"""
+    directory = os.path.join(CACHE_DIR, namespace)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, key + ext)
+
+def write_atomic(path, data):
+    """Write bytes to path so concurrent readers never see a partial file"""
+    # Unique per thread as well as per process: screenshot threads may write the same entry
+    tmp = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
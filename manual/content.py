@@ -0,0 +1,259 @@
+"""
+Declarative manual content.
+Static sections are written as small Markdown-like files under manual/content and
+compiled into a tree of slotted nodes (manual.model plus the source-level nodes below).
+Compiled trees are pickled in the cache keyed by the file's hash, so a build only
+parses files whose text changed, and other tools can load the tree without a parser.
+
+Source format, one paragraph per line (blank lines only separate blocks visually):
+
+    # Title / ## Section / ### Subsection    headings of level 1-3
+    Plain text with **bold** spans          a Normal paragraph
+    - item                                  'List Bullet' paragraph
+      - item                                'List Bullet 2' paragraph
+    #. item                                 'List Number' paragraph
+    | a | b |                               table row; a following |---| row marks a header
+    {style: Light List Accent 1}            style of the table just above (default Light Grid Accent 1)
+    ![Caption](MANUAL_SCREENSHOTS/...)      screenshot with caption
+    ![Caption](...){crop: x0,y0,x1,y1}      ... zoomed to a region given in source pixels
+    ![Caption](...){callout: x0,y0,x1,y1}   ... with a region outlined; options are separated
+                                            by ';' and callout may repeat
+    {blank}                                 empty paragraph
+    {pagebreak}                             page break
+    {if role=admin} ... {end}               included only when the render context matches;
+    {if role!=admin} ... {end}              an empty value matches an unset key
+    <!-- comment -->                        ignored
+    \\- text                                a backslash keeps a leading marker literal
+"""
+
+import functools
+import os
+import pickle
+import re
+
+from manual.cache import cache_path, file_digest, make_key, write_atomic
+from manual.emit import add_styled_paragraphs, add_table
+from manual.images import add_screenshot
+from manual.model import Heading, Paragraph, Table
+
+# Bump when the compiled node layout changes
+CONTENT_FORMAT_VERSION = 2
+
+CONTENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content')
+
+DEFAULT_TABLE_STYLE = 'Light Grid Accent 1'
+
+# Line prefixes of list paragraphs and the Word style ID each one gets
+LIST_MARKERS = (
+    ('  - ', 'ListBullet2'),
+    ('- ', 'ListBullet'),
+    ('#. ', 'ListNumber'),
+)
+
+HEADING = re.compile(r'^(#{1,3}) (.*)$')
+IMAGE = re.compile(r'^!\[(.*)\]\(([^)]+)\)(?:\{(.*)\})?$')
+CONDITION = re.compile(r'^\{if (\w+)(!?=)(.*)\}$')
+TABLE_STYLE = re.compile(r'^\{style: (.+)\}$')
+HEADER_RULE = re.compile(r'^\|(\s*:?-+:?\s*\|)+$')
+
+class Screenshot:
+    """A screenshot file with its caption, optional crop box and callout boxes"""
+
+    __slots__ = ('path', 'caption', 'crop', 'callouts')
+
+    def __init__(self, path, caption='', crop=None, callouts=()):
+        self.path = path
+        self.caption = caption
+        self.crop = crop
+        self.callouts = callouts
+
+class PageBreak:
+    """A page break"""
+
+    __slots__ = ()
+
+class Conditional:
+    """Children that are rendered only when context[key] equals (or differs from) value"""
+
+    __slots__ = ('key', 'value', 'negate', 'children')
+
+    def __init__(self, key, value, negate, children):
+        self.key = key
+        self.value = value
+        self.negate = negate
+        self.children = children
+
+    def applies(self, context):
+        matched = (context.get(self.key) or '') == self.value
+        return matched != self.negate
+
+def content_path(name):
+    """Return the source file of a content section, e.g. 'faq'"""
+    return os.path.join(CONTENT_DIR, f'{name}.md')
+
+def parse_runs(text):
+    """Split text on **bold** markers into (text, bold, italic) runs"""
+    runs = []
+    for i, part in enumerate(text.split('**')):
+        if part:
+            runs.append((part, i % 2 == 1, False))
+    return runs
+
+def parse_image_options(text, source):
+    """Parse 'crop: x0,y0,x1,y1; callout: x0,y0,x1,y1' into (crop, callouts)"""
+    crop, callouts = None, []
+    for option in filter(None, (part.strip() for part in (text or '').split(';'))):
+        name, _, value = option.partition(':')
+        try:
+            box = tuple(int(v) for v in value.split(','))
+        except ValueError:
+            box = ()
+        if len(box) != 4 or name.strip() not in ('crop', 'callout'):
+            raise ValueError(f'{source}: invalid screenshot option {option!r}')
+        if name.strip() == 'crop':
+            crop = box
+        else:
+            callouts.append(box)
+    return crop, tuple(callouts)
+
+def parse_content(text, source='<content>'):
+    """Compile content source text into a list of nodes"""
+    root = []
+    stack = [root]
+    table = None
+    for number, raw in enumerate(text.splitlines(), 1):
+        line = raw.rstrip()
+        nodes = stack[-1]
+        if not line.startswith('|'):
+            table = None
+
+        if not line.strip() or (line.startswith('<!--') and line.endswith('-->')):
+            continue
+        if line.startswith('\\'):
+            nodes.append(Paragraph(parse_runs(line[1:])))
+            continue
+        if line == '{blank}':
+            nodes.append(Paragraph([]))
+            continue
+        if line == '{pagebreak}':
+            nodes.append(PageBreak())
+            continue
+        match = CONDITION.match(line)
+        if match:
+            key, op, value = match.groups()
+            block = Conditional(key, value.strip(), op == '!=', [])
+            nodes.append(block)
+            stack.append(block.children)
+            continue
+        if line == '{end}':
+            if len(stack) == 1:
+                raise ValueError(f'{source}:{number}: {{end}} without {{if}}')
+            stack.pop()
+            continue
+        match = TABLE_STYLE.match(line)
+        if match:
+            if not nodes or not isinstance(nodes[-1], Table):
+                raise ValueError(f'{source}:{number}: {{style}} must follow a table')
+            nodes[-1].style = match.group(1)
+            continue
+        if line.startswith('{'):
+            raise ValueError(f'{source}:{number}: unknown directive {line}')
+        if line.startswith('|'):
+            if HEADER_RULE.match(line):
+                if table is None:
+                    raise ValueError(f'{source}:{number}: header rule without a table row above it')
+                table.header = True
+                continue
+            cells = [cell.strip() for cell in line.strip('|').split('|')]
+            if table is None:
+                table = Table([], False, DEFAULT_TABLE_STYLE)
+                nodes.append(table)
+            table.rows.append(cells)
+            continue
+        match = HEADING.match(line)
+        if match:
+            nodes.append(Heading(len(match.group(1)), match.group(2)))
+            continue
+        match = IMAGE.match(line)
+        if match:
+            crop, callouts = parse_image_options(match.group(3), f'{source}:{number}')
+            nodes.append(Screenshot(match.group(2), match.group(1), crop, callouts))
+            continue
+        for marker, style in LIST_MARKERS:
+            if line.startswith(marker):
+                nodes.append(Paragraph(parse_runs(line[len(marker):]), style))
+                break
+        else:
+            nodes.append(Paragraph(parse_runs(line)))
+    if len(stack) > 1:
+        raise ValueError(f'{source}: {{if}} without {{end}}')
+    return root
+
+def load_content(name, use_cache=True):
+    """Return the compiled node tree of a content section, compiling it only when it changed"""
+    path = content_path(name)
+    if not use_cache:
+        with open(path, encoding='utf-8') as f:
+            return parse_content(f.read(), path)
+    key = make_key('content', CONTENT_FORMAT_VERSION, file_digest(path))
+    compiled = cache_path('content', key, '.pickle')
+    if os.path.exists(compiled):
+        with open(compiled, 'rb') as f:
+            return pickle.load(f)
+    with open(path, encoding='utf-8') as f:
+        nodes = parse_content(f.read(), path)
+    write_atomic(compiled, pickle.dumps(nodes, protocol=pickle.HIGHEST_PROTOCOL))
+    return nodes
+
+def screenshot_nodes(name):
+    """Return every Screenshot node of a content section in document order, conditional or not"""
+    nodes = []
+    pending = list(load_content(name))
+    while pending:
+        node = pending.pop(0)
+        if isinstance(node, Screenshot):
+            nodes.append(node)
+        elif isinstance(node, Conditional):
+            pending[:0] = node.children
+    return nodes
+
+def content_screenshots(name):
+    """Return every screenshot a content section embeds"""
+    return [node.path for node in screenshot_nodes(name)]
+
+def content_files(name):
+    """Return @uses_files inputs of a content section: its source file and its screenshots.
+
+    The screenshots are looked up when a cache key is built, so a long-running process
+    (watch mode) sees screenshots added to the source after start-up.
+    """
+    return [os.path.relpath(content_path(name)), functools.partial(content_screenshots, name)]
+
+def add_content(doc, name, **context):
+    """Render a content section into the document"""
+    _render(doc, load_content(name), context)
+
+def _render(doc, nodes, context):
+    batch = []
+    for node in nodes:
+        if isinstance(node, Paragraph):
+            # Runs of consecutive paragraphs go out as one batch of XML
+            batch.append(([(text, bold) for text, bold, _ in node.runs], node.style))
+            continue
+        if batch:
+            add_styled_paragraphs(doc, batch)
+            batch = []
+        if isinstance(node, Heading):
+            doc.add_heading(node.text, node.level)
+        elif isinstance(node, Table):
+            header = node.rows[0] if node.header else None
+            add_table(doc, node.rows[1:] if node.header else node.rows, header=header, style=node.style)
+        elif isinstance(node, Screenshot):
+            add_screenshot(doc, node.path, node.caption, node.crop, node.callouts)
+        elif isinstance(node, PageBreak):
+            doc.add_page_break()
+        elif isinstance(node, Conditional):
+            if node.applies(context):
+                _render(doc, node.children, context)
+    if batch:
+        add_styled_paragraphs(doc, batch)
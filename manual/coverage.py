@@ -0,0 +1,137 @@
+"""
+Hourly staffing coverage computed from roster shift codes.
+Each shift code maps to a time window. Per-team [hour, day] headcounts come from one
+bincount over (team, day, code) followed by a matrix product with the code -> hour
+window table, so a year of rosters for every team takes a few array operations.
+Heatmap images are rendered with Pillow and cached by the matrix they show.
+"""
+
+import io
+import os
+
+import numpy as np
+
+from manual.cache import cache_path, make_key, write_atomic
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # Pillow is optional; heatmaps are skipped without it
+    Image = None
+
+# Working hours per shift code, as [start, end) on a 24-hour clock (see SHIFT_MAP in lib/constants.ts)
+SHIFT_WINDOWS = {
+    'M2': (8, 17),
+    'G': (9, 18),
+    'M3': (9, 18),
+    'M4': (10, 19),
+    'D1': (12, 21),
+    'D2': (13, 22),
+}
+
+# Hours the support desk is expected to be staffed: the union of all shift windows
+OPERATING_HOURS = range(8, 22)
+
+HEATMAP_SETTINGS = {
+    'cell': 22,
+    'min_staff': 1,
+    'hours': [OPERATING_HOURS.start, OPERATING_HOURS.stop],
+}
+
+def window_matrix(codes):
+    """Return a [code value, hour] 0/1 matrix marking the hours each code works"""
+    windows = np.zeros((len(codes), 24), dtype=np.int32)
+    for i, code in enumerate(codes):
+        if code in SHIFT_WINDOWS:
+            start, end = SHIFT_WINDOWS[code]
+            windows[i, start:end] = 1
+    return windows
+
+def coverage_matrix(roster):
+    """Return a [team, hour, day] headcount array for a roster"""
+    n_teams, n_days, n_codes = len(roster.teams), len(roster.dates), len(roster.codes)
+    days = np.arange(n_days, dtype=np.int64)
+    flat = (roster.team_index.astype(np.int64)[:, None] * n_days + days) * n_codes + roster.shifts
+    counts = np.bincount(flat.ravel(), minlength=n_teams * n_days * n_codes)
+    counts = counts.reshape(n_teams, n_days, n_codes)
+    return (counts @ window_matrix(roster.codes)).transpose(0, 2, 1)
+
+def assigned_days(roster):
+    """Return a [day] boolean array marking days on which anyone has a shift code entered"""
+    return (np.asarray(roster.shifts) != 0).any(axis=0)
+
+def coverage_gaps(roster, matrix, min_staff=1, hours=OPERATING_HOURS):
+    """Return (team, date, first hour, end hour) runs where headcount is below min_staff.
+
+    Days nobody has been scheduled for yet are not gaps and are left out.
+    """
+    gaps = []
+    hours = list(hours)
+    short = (matrix[:, hours, :] < min_staff) & assigned_days(roster)
+    for t, d in zip(*np.nonzero(short.any(axis=1))):
+        start = None
+        for k, hour in enumerate(hours + [None]):
+            is_short = hour is not None and short[t, k, d]
+            if is_short and start is None:
+                start = hour
+            elif not is_short and start is not None:
+                gaps.append((roster.teams[t], roster.dates[d], start, hours[k - 1] + 1))
+                start = None
+    return gaps
+
+def format_hour(hour):
+    """Return a 24-hour clock value as '8 AM', '12 PM', '10 PM'"""
+    suffix = 'AM' if hour % 24 < 12 else 'PM'
+    return f'{(hour - 1) % 12 + 1} {suffix}'
+
+def render_heatmap(counts, dates, title, settings=None):
+    """Render an [hour, day] headcount matrix as PNG bytes"""
+    settings = dict(HEATMAP_SETTINGS, **(settings or {}))
+    cell = settings['cell']
+    first, last = settings['hours']
+    rows = counts[first:last]
+    font = ImageFont.load_default(size=max(9, cell // 2))
+
+    left, top = 4 * cell, 3 * cell
+    width = left + cell * rows.shape[1] + cell
+    height = top + cell * rows.shape[0] + 2 * cell
+    im = Image.new('RGB', (width, height), 'white')
+    draw = ImageDraw.Draw(im)
+    draw.text((4, 4), title, fill='black', font=font)
+
+    peak = max(int(rows.max()), 1)
+    for d, label in enumerate(dates):
+        x = left + d * cell
+        draw.text((x + 2, top - cell), ''.join(ch for ch in label if ch.isdigit()) or label[:3],
+                  fill='black', font=font)
+    for h in range(rows.shape[0]):
+        y = top + h * cell
+        draw.text((4, y + 4), format_hour(first + h), fill='black', font=font)
+        for d in range(rows.shape[1]):
+            n = int(rows[h, d])
+            if n < settings['min_staff']:
+                color = (220, 60, 60)
+            else:
+                # White to dark blue as headcount approaches the peak
+                shade = n / peak
+                color = (int(235 - 200 * shade), int(242 - 160 * shade), int(255 - 90 * shade))
+            x = left + d * cell
+            draw.rectangle([x, y, x + cell - 1, y + cell - 1], fill=color, outline='white')
+            if cell >= 18:
+                draw.text((x + 4, y + 4), str(n), fill='black' if n < peak * 0.6 else 'white', font=font)
+
+    draw.text((4, height - cell - 2), f'Headcount per hour (peak {peak}); red = below {settings["min_staff"]} on duty',
+              fill='black', font=font)
+    buf = io.BytesIO()
+    im.save(buf, 'PNG', optimize=True)
+    return buf.getvalue()
+
+def heatmap_image(counts, dates, title, settings=None):
+    """Return the path of a cached heatmap PNG, rendering it only when the data changed"""
+    if Image is None:
+        return None
+    settings = dict(HEATMAP_SETTINGS, **(settings or {}))
+    key = make_key('heatmap', counts.tolist(), dates, title, settings)
+    path = cache_path('heatmaps', key, '.png')
+    if not os.path.exists(path):
+        write_atomic(path, render_heatmap(counts, dates, title, settings))
+    return path
@@ -0,0 +1,129 @@
+"""
+Batched paragraph and table emission for the manual's content builders.
+python-docx resolves the style by name and walks the body for every add_paragraph call,
+and re-walks the row and cell XML for every table cell access. These helpers cache
+resolved style IDs per document and emit whole lists of paragraphs, or a whole table,
+with a single XML parse, returning handles to the new content.
+"""
+
+import weakref
+from xml.sax.saxutils import escape
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.shared import Emu
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+_style_ids = weakref.WeakKeyDictionary()
+
+def style_id(doc, name):
+    """Return the style ID for a style name, cached per document"""
+    cache = _style_ids.setdefault(doc.part, {})
+    if name not in cache:
+        cache[name] = doc.styles[name].style_id
+    return cache[name]
+
+def run_xml(text, bold=False):
+    """Return WordprocessingML for one run, mapping newlines and tabs like python-docx does"""
+    parts = []
+    for i, line in enumerate(text.split('\n')):
+        if i:
+            parts.append('<w:br/>')
+        for j, chunk in enumerate(line.split('\t')):
+            if j:
+                parts.append('<w:tab/>')
+            if chunk:
+                parts.append(f'<w:t xml:space="preserve">{escape(chunk)}</w:t>')
+    props = '<w:rPr><w:b/></w:rPr>' if bold else ''
+    return f'<w:r>{props}{"".join(parts)}</w:r>'
+
+def paragraph_xml(content, style=None):
+    """Return WordprocessingML for one paragraph.
+
+    content is either a string or a list of runs, where each run is a string or a
+    (text, bold) pair.
+    """
+    props = f'<w:pPr><w:pStyle w:val="{style}"/></w:pPr>' if style else ''
+    if isinstance(content, str):
+        runs = run_xml(content) if content else ''
+    else:
+        runs = ''.join(run_xml(run) if isinstance(run, str) else run_xml(*run) for run in content)
+    return f'<w:p>{props}{runs}</w:p>'
+
+def add_paragraphs(doc, paragraphs, style=None):
+    """Append paragraphs to the end of the document in one batch and return their handles"""
+    sid = style_id(doc, style) if style else None
+    xml = ''.join(paragraph_xml(content, sid) for content in paragraphs)
+    if not xml:
+        return []
+    return [Paragraph(p, doc._body) for p in _append_xml(doc, xml)]
+
+def add_styled_paragraphs(doc, paragraphs):
+    """Append (content, style ID or None) pairs in one batch and return their handles"""
+    xml = ''.join(paragraph_xml(content, sid) for content, sid in paragraphs)
+    if not xml:
+        return []
+    return [Paragraph(p, doc._body) for p in _append_xml(doc, xml)]
+
+def _append_xml(doc, xml):
+    """Parse body-level XML in one pass and move the elements to the end of the body"""
+    wrapper = parse_xml(f'<w:body {nsdecls("w")}>{xml}</w:body>')
+    body = doc.element.body
+    sect_pr = body.find(qn('w:sectPr'))
+    # Move the wrapper into the document first and unwrap it there. Moving its children
+    # across documents one by one makes lxml reconcile namespaces node by node, which
+    # takes seconds for a roster-sized table.
+    if sect_pr is not None:
+        sect_pr.addprevious(wrapper)
+    else:
+        body.append(wrapper)
+    elements = list(wrapper)
+    for el in elements:
+        wrapper.addprevious(el)
+    body.remove(wrapper)
+    return elements
+
+def add_table(doc, rows, header=None, style=None, repeat_header=True):
+    """Append a table built from rows of cell values in one pass and return its handle.
+
+    rows is any iterable of sequences, such as a list of tuples or a csv.reader. Cell
+    values are converted with str(). When repeat_header is set the header row is marked
+    to repeat at the top of every page the table spans.
+    """
+    rows = [list(row) for row in rows]
+    if header is not None:
+        rows.insert(0, list(header))
+    cols = max((len(row) for row in rows), default=0)
+    if not cols:
+        return None
+
+    section = doc.sections[-1]
+    block_width = Emu(section.page_width - section.left_margin - section.right_margin)
+    col_width = block_width.twips // cols
+    cell_props = f'<w:tcPr><w:tcW w:type="dxa" w:w="{col_width}"/></w:tcPr>'
+
+    table_props = '<w:tblPr>'
+    if style:
+        table_props += f'<w:tblStyle w:val="{style_id(doc, style)}"/>'
+    table_props += ('<w:tblW w:type="auto" w:w="0"/>'
+                    '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+                    'w:noHBand="0" w:noVBand="1" w:val="04A0"/></w:tblPr>')
+    parts = [f'<w:tbl>{table_props}<w:tblGrid>', f'<w:gridCol w:w="{col_width}"/>' * cols, '</w:tblGrid>']
+    for i, row in enumerate(rows):
+        parts.append('<w:tr>')
+        if i == 0 and header is not None and repeat_header:
+            parts.append('<w:trPr><w:tblHeader/></w:trPr>')
+        for j in range(cols):
+            value = row[j] if j < len(row) else ''
+            text = '' if value is None else str(value)
+            parts.append(f'<w:tc>{cell_props}{paragraph_xml(text)}</w:tc>')
+        parts.append('</w:tr>')
+    parts.append('</w:tbl>')
+
+    tbl, = _append_xml(doc, ''.join(parts))
+    return Table(tbl, doc._body)
+
+def add_column_table(doc, columns, header=None, style=None, repeat_header=True):
+    """Append a table given as a list of column sequences instead of rows"""
+    return add_table(doc, zip(*columns), header, style, repeat_header)
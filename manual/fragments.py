@@ -0,0 +1,259 @@
+"""
+Per-section fragment caching for the manual.
+A section builder is rendered into a scratch document, and the resulting body XML is
+cached together with the images it references. On later builds the fragment is stitched
+into the main document, so only sections whose inputs changed are rebuilt.
+Fragments that do need rendering can be built in parallel worker processes; the
+screenshots they embed are processed on a thread pool, scheduled before rendering starts.
+"""
+
+import glob
+import hashlib
+import inspect
+import io
+import json
+import os
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+import docx
+from docx import Document
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from manual.assets import asset_digest
+from manual.cache import cache_path, file_digest, make_key, write_atomic
+from manual.images import SCREENSHOT_SETTINGS, prefetch_screenshots
+
+# Bump when the fragment format or stitching logic changes
+FRAGMENT_VERSION = 1
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+R_EMBED = qn('r:embed')
+
+def uses_files(*patterns):
+    """Declare data files a section builder reads, for its cache key.
+    
+    Each entry is a glob pattern or a callable returning a list of paths.
+    """
+    def decorate(func):
+        func.input_files = patterns
+        return func
+    return decorate
+
+def builder_functions(builder):
+    """Return a builder and every module-level function it calls, directly or indirectly"""
+    found = {}
+    pending = [builder]
+    while pending:
+        # Traced builders are wrappers; their callees are found in the wrapped function
+        func = inspect.unwrap(pending.pop())
+        if func.__name__ in found:
+            continue
+        found[func.__name__] = func
+        for name in _code_names(func.__code__):
+            callee = func.__globals__.get(name)
+            if isinstance(callee, types.FunctionType) and callee.__module__ == builder.__module__:
+                pending.append(callee)
+    return [found[name] for name in sorted(found)]
+
+# Module-level values of these types are hashed into fragment keys when a builder reads them
+DATA_TYPES = (str, int, float, bool, type(None), tuple, list, dict, set, frozenset)
+
+def builder_constants(builder):
+    """Return {name: value} of the module-level data (not functions) a builder and its callees read"""
+    constants = {}
+    for func in builder_functions(builder):
+        for name in sorted(_code_names(func.__code__)):
+            if name in func.__globals__ and not name.startswith('__'):
+                value = func.__globals__[name]
+                if isinstance(value, DATA_TYPES):
+                    constants[name] = value
+    return constants
+
+def builder_sources(builder):
+    """Return {name: source} for a builder and its callees"""
+    return {func.__name__: inspect.getsource(func) for func in builder_functions(builder)}
+
+def builder_assets(builder):
+    """Return the image paths referenced by string literals in a builder and its callees"""
+    assets = set()
+    for func in builder_functions(builder):
+        for const in _code_consts(func.__code__):
+            if isinstance(const, str) and const.lower().endswith(IMAGE_EXTENSIONS):
+                assets.add(const)
+    return sorted(assets)
+
+def _code_names(code):
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+def _code_consts(code):
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            yield from _code_consts(const)
+        else:
+            yield const
+
+def builder_data_files(builder):
+    """Return the data files declared with @uses_files by a builder and its callees"""
+    paths = set()
+    for func in builder_functions(builder):
+        for pattern in getattr(func, 'input_files', ()):
+            paths.update(pattern() if callable(pattern) else glob.glob(pattern, recursive=True))
+    return sorted(paths)
+
+def section_screenshots(builder):
+    """Return (path, crop, callouts) for every screenshot in the content files a builder declares"""
+    from manual.content import CONTENT_DIR, screenshot_nodes
+
+    requests = []
+    for path in builder_data_files(builder):
+        if path.endswith('.md') and os.path.dirname(os.path.abspath(path)) == CONTENT_DIR:
+            name = os.path.splitext(os.path.basename(path))[0]
+            requests += [(node.path, node.crop, node.callouts) for node in screenshot_nodes(name)]
+    return requests
+
+def helper_sources_digest():
+    """Hash the manual package itself, so changes to shared helpers invalidate fragments"""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    return make_key(*(file_digest(path) for path in sorted(glob.glob(os.path.join(package_dir, '*.py')))))
+
+def fragment_key(builder, args=()):
+    """Build the cache key for a section from its code, arguments and referenced files"""
+    assets = {}
+    for path in builder_assets(builder) + builder_data_files(builder):
+        full_path = os.path.join(os.getcwd(), path)
+        assets[path] = asset_digest(full_path) if os.path.exists(full_path) else None
+    return make_key(
+        'fragment', FRAGMENT_VERSION, docx.__version__, helper_sources_digest(),
+        builder.__name__, builder_sources(builder), builder_constants(builder), list(args), assets,
+        SCREENSHOT_SETTINGS,
+    )
+
+def render_fragment(builder, args=()):
+    """Render a section builder into a scratch document and capture its body XML and images"""
+    scratch = Document()
+    builder(scratch, *args)
+
+    body = scratch.element.body
+    elements = [etree.tostring(el, encoding='unicode') for el in body if el.tag != qn('w:sectPr')]
+    media = {}
+    for rId, rel in scratch.part.rels.items():
+        if rel.is_external or not rel.reltype.endswith('/image'):
+            continue
+        part = rel.target_part
+        media[rId] = store_media(part.blob, os.path.splitext(part.partname)[1])
+    return {'elements': elements, 'media': media}
+
+def store_media(blob, ext):
+    """Save an image blob in the content-addressed media store and return its reference"""
+    sha = hashlib.sha256(blob).hexdigest()
+    path = cache_path('media', sha, ext)
+    if not os.path.exists(path):
+        write_atomic(path, blob)
+    return {'sha': sha, 'ext': ext}
+
+def media_path(ref):
+    """Return the on-disk location of a media reference"""
+    return cache_path('media', ref['sha'], ref['ext'])
+
+def fragment_size(fragment, seen_media=None):
+    """Return (xml_bytes, media_bytes) a fragment adds to a package.
+    
+    Media already in seen_media (a set of digests, updated in place) is not counted again.
+    """
+    xml_bytes = sum(len(xml.encode('utf-8')) for xml in fragment['elements'])
+    media_bytes = 0
+    for ref in fragment['media'].values():
+        if seen_media is None or ref['sha'] not in seen_media:
+            media_bytes += os.path.getsize(media_path(ref))
+            if seen_media is not None:
+                seen_media.add(ref['sha'])
+    return xml_bytes, media_bytes
+
+def append_fragment(doc, fragment):
+    """Stitch a fragment into the end of a document, remapping image relationships"""
+    rid_map = {}
+    for old_rId, ref in fragment['media'].items():
+        with open(media_path(ref), 'rb') as f:
+            rid_map[old_rId], _ = doc.part.get_or_add_image(io.BytesIO(f.read()))
+
+    body = doc.element.body
+    sect_pr = body.find(qn('w:sectPr'))
+    next_id = doc.part.next_id
+    for xml in fragment['elements']:
+        el = parse_xml(xml)
+        next_id = remap_element(el, rid_map, next_id)
+        if sect_pr is not None:
+            sect_pr.addprevious(el)
+        else:
+            body.append(el)
+
+def remap_element(el, rid_map, next_id):
+    """Rewrite image relationship IDs and drawing IDs in el; return the next free drawing ID"""
+    for node in el.iter():
+        old_rId = node.get(R_EMBED)
+        if old_rId in rid_map:
+            node.set(R_EMBED, rid_map[old_rId])
+    # Drawing ids must stay unique across the stitched document
+    for node in el.iter(qn('wp:docPr'), qn('pic:cNvPr')):
+        node.set('id', str(next_id))
+        next_id += 1
+    return next_id
+
+def load_fragment(key):
+    """Return a cached fragment, or None if it is missing or its media was evicted"""
+    path = cache_path('fragments', key, '.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        fragment = json.load(f)
+    if not all(os.path.exists(media_path(ref)) for ref in fragment['media'].values()):
+        return None
+    return fragment
+
+def save_fragment(key, fragment):
+    """Write a fragment to the cache"""
+    path = cache_path('fragments', key, '.json')
+    write_atomic(path, json.dumps(fragment).encode('utf-8'))
+
+def _render_and_save(builder, args, key):
+    """Worker entry point: render one fragment and cache it under key"""
+    with prefetch_screenshots(section_screenshots(builder)):
+        fragment = render_fragment(builder, args)
+    if key is not None:
+        save_fragment(key, fragment)
+    return fragment
+
+def build_fragments(builders, jobs=1, use_cache=True):
+    """Return (fragments, cache_hits) for builders, rendering misses across `jobs` processes.
+    
+    Each entry of builders is a section builder or a (builder, args) pair. fragments is
+    an iterator that yields each fragment in document order as soon as it and every
+    fragment before it are ready, so output can be streamed.
+    """
+    sections = [entry if isinstance(entry, tuple) else (entry, ()) for entry in builders]
+    keys = [fragment_key(builder, args) if use_cache else None for builder, args in sections]
+    cached = [load_fragment(key) if key else None for key in keys]
+    cache_hits = sum(fragment is not None for fragment in cached)
+    return _iter_fragments(sections, keys, cached, jobs), cache_hits
+
+def _iter_fragments(sections, keys, cached, jobs):
+    misses = [i for i, fragment in enumerate(cached) if fragment is None]
+    if jobs > 1 and len(misses) > 1:
+        # Workers return only XML strings and media references; image bytes travel through
+        # the content-addressed media store, and append_fragment dedupes and remaps them
+        with ProcessPoolExecutor(max_workers=min(jobs, len(misses))) as pool:
+            futures = {i: pool.submit(_render_and_save, *sections[i], keys[i]) for i in misses}
+            for i, fragment in enumerate(cached):
+                yield fragment if fragment is not None else futures.pop(i).result()
+    else:
+        # Screenshots of every section to render are processed while earlier sections are built
+        with prefetch_screenshots([request for i in misses for request in section_screenshots(sections[i][0])]):
+            for i, fragment in enumerate(cached):
+                yield fragment if fragment is not None else _render_and_save(*sections[i], keys[i])
@@ -0,0 +1,263 @@
+"""
+Screenshot preprocessing for the manual.
+Screenshots are cropped, annotated, resampled to the size they are printed at and
+re-encoded before they are embedded. Uniform borders are trimmed automatically while
+keeping the print scale; a declared crop region is instead zoomed to the full width.
+Callouts are outlined boxes drawn over regions of interest. Results are cached by
+source hash plus settings, crop and callouts.
+
+Once the sections to render are known, their screenshots can be scheduled on a thread
+pool (Pillow releases the GIL while decoding, resampling and encoding); add_screenshot
+then takes each result in document order instead of processing the file inline.
+"""
+
+import io
+import json
+import os
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.shared import Inches, Pt, RGBColor
+
+from manual.assets import asset_digest, is_screenshot, record_variant
+from manual.cache import cache_path, make_key, write_atomic
+from manual.similar import changed_region, is_near_duplicate
+from manual.trace import span
+
+try:
+    from PIL import Image, ImageChops, ImageDraw
+except ImportError:  # Pillow is optional; screenshots are embedded unchanged without it
+    Image = None
+
+SCREENSHOT_SETTINGS = {
+    'width_in': 6.0,        # printed width used by add_screenshot
+    'dpi': 150,             # target print resolution
+    'encoding': 'palette',  # 'palette', 'jpeg' or 'png'
+    'colors': 256,
+    'quality': 82,
+    'trim': True,           # trim borders that match the top-left corner colour
+    'trim_tolerance': 12,   # max per-channel difference still counted as border
+    'trim_margin': 16,      # source pixels of border kept around the content
+    'callout_color': (220, 38, 38),
+    'callout_width_in': 0.02,
+    'delta': False,         # embed only the changed region of near-duplicate follow-up shots
+    'draft': None,          # None, 'thumbnail' or 'placeholder' for fast review builds
+    'draft_dpi': 24,
+    'draft_colors': 32,
+}
+
+# Threads that process prefetched screenshots
+IMAGE_THREADS = min(8, (os.cpu_count() or 1) + 2)
+
+# Source screenshots already embedded in each document, for delta rendering
+_embedded = weakref.WeakKeyDictionary()
+
+# Thread pool and pending futures of prefetched screenshots, for the owning process
+_prefetch = {'pid': None, 'pool': None, 'pending': {}}
+
+def optimize_screenshot(path, settings=None, crop=None, callouts=(), zoom=True):
+    """Return (path, printed width in inches) of a processed copy of a screenshot, building it if needed.
+    
+    crop is an (x0, y0, x1, y1) box in source pixels that is zoomed to the full printed
+    width, or kept at the screenshot's print scale when zoom is false; callouts are boxes
+    in source pixels that get outlined.
+    """
+    settings = dict(SCREENSHOT_SETTINGS, **(settings or {}))
+    if Image is None:
+        return path, settings['width_in']
+    ext = '.jpg' if settings['encoding'] == 'jpeg' else '.png'
+    key = variant_key(path, settings, crop, callouts, zoom)
+    out = cache_path('images', key, ext)
+    meta = cache_path('images', key, '.json')
+    if not (os.path.exists(out) and os.path.exists(meta)):
+        data, width_in, edited = encode_screenshot(path, settings, crop, callouts, zoom)
+        if not edited and len(data) >= os.path.getsize(path) and ext == os.path.splitext(path)[1].lower():
+            # Re-encoding did not help; keep the original bytes
+            with open(path, 'rb') as f:
+                data = f.read()
+        write_atomic(out, data)
+        write_atomic(meta, json.dumps({'width_in': width_in}).encode('utf-8'))
+    with open(meta, encoding='utf-8') as f:
+        width_in = json.load(f)['width_in']
+    if is_screenshot(path):
+        record_variant(path, key, out, width_in)
+    return out, width_in
+
+def variant_key(path, settings=None, crop=None, callouts=(), zoom=True):
+    """Return the cache key of a processed copy of a screenshot"""
+    settings = dict(SCREENSHOT_SETTINGS, **(settings or {}))
+    crop = list(crop) if crop else None
+    callouts = [list(box) for box in callouts]
+    return make_key('screenshot', asset_digest(path), settings, crop, callouts, zoom)
+
+def content_box(im, tolerance, margin):
+    """Return the bounding box of everything that differs from the top-left corner colour"""
+    background = Image.new('RGB', im.size, im.getpixel((0, 0)))
+    mask = ImageChops.difference(im, background).convert('L').point(lambda v: 255 if v > tolerance else 0)
+    box = mask.getbbox()
+    if box is None:
+        return (0, 0) + im.size
+    x0, y0, x1, y1 = box
+    return (max(0, x0 - margin), max(0, y0 - margin), min(im.width, x1 + margin), min(im.height, y1 + margin))
+
+def encode_screenshot(path, settings, crop=None, callouts=(), zoom=True):
+    """Crop, annotate, resample and re-encode one screenshot.
+    
+    Returns (encoded bytes, printed width in inches, whether the pixels were edited).
+    """
+    with Image.open(path) as im:
+        im = im.convert('RGB')
+        source_width = im.width
+        width_in = settings['width_in']
+        if crop:
+            box = (max(0, crop[0]), max(0, crop[1]), min(im.width, crop[2]), min(im.height, crop[3]))
+            if not zoom:
+                width_in = settings['width_in'] * (box[2] - box[0]) / source_width
+        elif settings['trim']:
+            box = content_box(im, settings['trim_tolerance'], settings['trim_margin'])
+            # Trimmed screenshots keep their print scale, so text stays the same size
+            width_in = settings['width_in'] * (box[2] - box[0]) / source_width
+        else:
+            box = (0, 0) + im.size
+        edited = box != (0, 0) + im.size or bool(callouts)
+        im = im.crop(box)
+        
+        dpi = settings['draft_dpi'] if settings['draft'] else settings['dpi']
+        target = round(width_in * dpi)
+        scale = min(1.0, target / im.width)
+        if callouts:
+            draw = ImageDraw.Draw(im)
+            line = max(2, round(settings['callout_width_in'] * settings['dpi'] / scale))
+            for x0, y0, x1, y1 in callouts:
+                draw.rectangle((x0 - box[0], y0 - box[1], x1 - box[0], y1 - box[1]),
+                               outline=tuple(settings['callout_color']), width=line)
+        if scale < 1.0:
+            height = max(1, round(im.height * scale))
+            im = im.resize((target, height), Image.Resampling.LANCZOS)
+        if settings['draft'] == 'placeholder':
+            im = placeholder_image(im.size, os.path.basename(path))
+        
+        buf = io.BytesIO()
+        if settings['draft']:
+            # Same printed size as the final image, so page layout matches the production build
+            im = im.quantize(colors=settings['draft_colors'], method=Image.Quantize.FASTOCTREE)
+            im.save(buf, 'PNG', optimize=True, dpi=(dpi, dpi))
+            return buf.getvalue(), width_in, True
+        
+        dpi = (dpi, dpi)
+        if settings['encoding'] == 'jpeg':
+            im.save(buf, 'JPEG', quality=settings['quality'], optimize=True, progressive=True, dpi=dpi)
+        elif settings['encoding'] == 'palette':
+            im = im.quantize(colors=settings['colors'], method=Image.Quantize.FASTOCTREE)
+            im.save(buf, 'PNG', optimize=True, dpi=dpi)
+        else:
+            im.save(buf, 'PNG', optimize=True, dpi=dpi)
+    return buf.getvalue(), width_in, edited
+
+def delta_region(doc, path):
+    """Return the region of path that changed since the latest near-duplicate already in doc, or None"""
+    # Captured screenshots are the only images eligible (charts are not)
+    if not is_screenshot(path):
+        return None
+    embedded = _embedded.setdefault(doc.part, [])
+    region = None
+    for base in reversed(embedded):
+        if is_near_duplicate(base, path):
+            region = changed_region(base, path)
+            break
+    embedded.append(path)
+    return region
+
+def placeholder_image(size, label):
+    """Return a light grey image of the given size, outlined and labelled with label"""
+    im = Image.new('RGB', size, (236, 238, 241))
+    draw = ImageDraw.Draw(im)
+    draw.rectangle((0, 0, size[0] - 1, size[1] - 1), outline=(160, 166, 173))
+    draw.text((4, 4), label, fill=(90, 96, 104))
+    return im
+
+def _prefetch_state():
+    if _prefetch['pid'] != os.getpid():
+        # Threads and futures do not survive a fork into a worker process
+        _prefetch.update(pid=os.getpid(), pool=None, pending={})
+    return _prefetch
+
+def _screenshot_key(full_path, crop, callouts, zoom=True):
+    return full_path, tuple(crop) if crop else None, tuple(tuple(box) for box in callouts), zoom
+
+def _process_screenshot(full_path, crop, callouts):
+    with span(os.path.relpath(full_path), 'image'):
+        return optimize_screenshot(full_path, crop=crop, callouts=callouts)
+
+@contextmanager
+def prefetch_screenshots(requests):
+    """Process (path, crop, callouts) screenshots on the image thread pool while the block runs.
+    
+    Results that add_screenshot has not taken by the end of the block are dropped, so a
+    later build never sees a result computed from an older file.
+    """
+    state = _prefetch_state()
+    submitted = []
+    for path, crop, callouts in requests if Image is not None else ():
+        full_path = os.path.join(os.getcwd(), path)
+        # A delta follow-up shot's region depends on what precedes it in the document
+        if (SCREENSHOT_SETTINGS['delta'] and crop is None) or not os.path.exists(full_path):
+            continue
+        key = _screenshot_key(full_path, crop, callouts)
+        if key in state['pending']:
+            continue
+        if state['pool'] is None:
+            state['pool'] = ThreadPoolExecutor(IMAGE_THREADS, thread_name_prefix='screenshot')
+        state['pending'][key] = state['pool'].submit(_process_screenshot, full_path, crop, callouts)
+        submitted.append(key)
+    try:
+        yield
+    finally:
+        for key in submitted:
+            future = state['pending'].pop(key, None)
+            if future is not None:
+                future.cancel()
+
+def processed_screenshot(full_path, crop=None, callouts=(), zoom=True):
+    """Return optimize_screenshot's result, waiting for the prefetched one if it was scheduled"""
+    future = _prefetch_state()['pending'].pop(_screenshot_key(full_path, crop, callouts, zoom), None)
+    if future is not None and not future.cancelled():
+        return future.result()
+    return optimize_screenshot(full_path, crop=crop, callouts=callouts, zoom=zoom)
+
+def add_screenshot(doc, image_path, caption='', crop=None, callouts=()):
+    """Add a screenshot image to the document with optional caption, crop region and callouts"""
+    full_path = os.path.join(os.getcwd(), image_path)
+    if os.path.exists(full_path):
+        try:
+            # Add the centered image at up to 6 inches wide, trimmed and resampled for print.
+            # The paragraph handle is kept directly; doc.paragraphs[-1] rebuilds the whole
+            # paragraph list on every call.
+            with span(os.path.relpath(full_path), 'screenshot') as trace:
+                # Follow-up shots of an unchanged screen show only what changed, at print scale
+                delta = delta_region(doc, full_path) if SCREENSHOT_SETTINGS['delta'] and crop is None else None
+                if delta:
+                    caption = f'{caption} (detail: only the area that changed from the screenshot above)'.lstrip()
+                picture, width_in = processed_screenshot(full_path, crop or delta, callouts, zoom=delta is None)
+                trace['bytes'] = os.path.getsize(picture)
+                picture_paragraph = doc.add_paragraph()
+                picture_paragraph.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                shape = picture_paragraph.add_run().add_picture(picture, width=Inches(width_in))
+                # Record the source file rather than the cached copy, so size reports can name it
+                shape._inline.graphic.graphicData.pic.nvPicPr.cNvPr.set('name', os.path.relpath(full_path))
+            
+            # Add caption if provided
+            if caption:
+                p = doc.add_paragraph(caption)
+                p.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                p.runs[0].font.size = Pt(10)
+                p.runs[0].font.italic = True
+                p.runs[0].font.color.rgb = RGBColor(128, 128, 128)
+            
+            doc.add_paragraph()  # Add spacing after image
+        except Exception as e:
+            doc.add_paragraph(f'📸 Screenshot: {image_path} (Image could not be loaded: {e})')
+    else:
+        doc.add_paragraph(f'📸 Screenshot: {image_path} (Image file not found)')
@@ -0,0 +1,157 @@
+"""
+Format-neutral content model of the manual.
+Section builders write WordprocessingML through python-docx; this module reads that body
+XML (from the live document or from cached chapter fragments) back into a flat list of
+small nodes: headings, paragraphs of runs, tables and images. Renderers other than DOCX
+work from these nodes only, so they never have to know about Word markup.
+"""
+
+import os
+import re
+
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+
+from manual.fragments import R_EMBED, store_media
+
+HEADING_STYLE = re.compile(r'^Heading(\d)$')
+
+class Heading:
+    """A heading; level 0 is the document title"""
+
+    __slots__ = ('level', 'text')
+
+    def __init__(self, level, text):
+        self.level = level
+        self.text = text
+
+class Paragraph:
+    """A paragraph of (text, bold, italic) runs"""
+
+    __slots__ = ('runs', 'style', 'align')
+
+    def __init__(self, runs, style=None, align=None):
+        self.runs = runs
+        self.style = style      # Word style ID, e.g. 'ListBullet'
+        self.align = align      # 'center', 'right' or None
+
+    @property
+    def text(self):
+        return ''.join(text for text, _, _ in self.runs)
+
+class Table:
+    """A table of cell strings; the first row is a header when `header` is set"""
+
+    __slots__ = ('rows', 'header', 'style')
+
+    def __init__(self, rows, header=False, style=None):
+        self.rows = rows
+        self.header = header
+        self.style = style      # Word table style name, when known
+
+class Image:
+    """An image from the media store, with its display size in EMU"""
+
+    __slots__ = ('media', 'width', 'height', 'caption')
+
+    def __init__(self, media, width, height, caption=''):
+        self.media = media      # {'sha', 'ext'} reference, see manual.fragments.store_media
+        self.width = width
+        self.height = height
+        self.caption = caption
+
+def element_nodes(el, media):
+    """Return the nodes for one body-level element; media maps rIds to media references"""
+    if el.tag == qn('w:tbl'):
+        return [_table(el)]
+    if el.tag != qn('w:p'):
+        return []
+
+    nodes = []
+    for blip in el.iter(qn('a:blip')):
+        ref = media.get(blip.get(R_EMBED))
+        if ref is None:
+            continue
+        extent = next(el.iter(qn('wp:extent')), None)
+        width = int(extent.get('cx')) if extent is not None else 0
+        height = int(extent.get('cy')) if extent is not None else 0
+        nodes.append(Image(ref, width, height))
+    if nodes:
+        return nodes
+
+    style = el.find(f"{qn('w:pPr')}/{qn('w:pStyle')}")
+    style = style.get(qn('w:val')) if style is not None else None
+    runs = _runs(el)
+    if style == 'Title':
+        return [Heading(0, _plain(runs))]
+    match = HEADING_STYLE.match(style or '')
+    if match:
+        return [Heading(int(match.group(1)), _plain(runs))]
+    align = el.find(f"{qn('w:pPr')}/{qn('w:jc')}")
+    align = align.get(qn('w:val')) if align is not None else None
+    if not runs and el.find(f".//{qn('w:br')}[@{qn('w:type')}='page']") is not None:
+        return []  # page breaks have no meaning outside paged output
+    return [Paragraph(runs, style, align if align in ('center', 'right') else None)]
+
+def elements_model(elements, media):
+    """Return the nodes for a sequence of body elements, attaching captions to images"""
+    nodes = []
+    for el in elements:
+        for node in element_nodes(el, media):
+            # add_screenshot writes its caption as a centered, italic paragraph
+            previous = nodes[-1] if nodes else None
+            if (isinstance(node, Paragraph) and isinstance(previous, Image) and not previous.caption
+                    and node.align == 'center' and node.runs and all(italic for _, _, italic in node.runs)):
+                previous.caption = node.text
+                continue
+            nodes.append(node)
+    return nodes
+
+def document_model(doc):
+    """Return the nodes of everything currently in a python-docx document's body"""
+    media = {}
+    for rId, rel in doc.part.rels.items():
+        if not rel.is_external and rel.reltype.endswith('/image'):
+            part = rel.target_part
+            media[rId] = store_media(part.blob, os.path.splitext(part.partname)[1])
+    body = [el for el in doc.element.body if el.tag != qn('w:sectPr')]
+    return elements_model(body, media)
+
+def fragment_model(fragment, heading=None):
+    """Return the nodes of a chapter fragment, optionally preceded by its chapter heading"""
+    nodes = [Heading(1, heading)] if heading else []
+    return nodes + elements_model((parse_xml(xml) for xml in fragment['elements']), fragment['media'])
+
+def _runs(p):
+    runs = []
+    for r in p.iter(qn('w:r')):
+        parts = []
+        for child in r:
+            if child.tag == qn('w:t'):
+                parts.append(child.text or '')
+            elif child.tag == qn('w:br') and child.get(qn('w:type')) != 'page':
+                parts.append('\n')
+            elif child.tag == qn('w:tab'):
+                parts.append('\t')
+        text = ''.join(parts)
+        if text:
+            runs.append((text, _flag(r, 'w:b'), _flag(r, 'w:i')))
+    return runs
+
+def _flag(r, tag):
+    prop = r.find(f"{qn('w:rPr')}/{qn(tag)}")
+    return prop is not None and prop.get(qn('w:val')) not in ('0', 'false')
+
+def _plain(runs):
+    return ''.join(text for text, _, _ in runs).strip()
+
+def _table(tbl):
+    rows = []
+    for tr in tbl.iter(qn('w:tr')):
+        cells = []
+        for tc in tr.iter(qn('w:tc')):
+            cells.append('\n'.join(_plain(_runs(p)) for p in tc.iter(qn('w:p'))).strip())
+        rows.append(cells)
+    first = tbl.find(qn('w:tr'))
+    header = first is not None and first.find(f"{qn('w:trPr')}/{qn('w:tblHeader')}") is not None
+    return Table(rows, header)
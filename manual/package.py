@@ -0,0 +1,297 @@
+"""
+Output backends for the manual package.
+DocumentOutput keeps the whole document in memory and saves it at the end.
+StreamingDocxWriter writes the body to disk as chapters finish and copies media
+straight from the media store into the archive, so peak memory stays flat.
+PatchingDocxOutput saves like DocumentOutput but copies every entry that is unchanged
+since the previous package raw, without decompressing or recompressing it.
+
+Every backend writes reproducible packages: entries come in python-docx's order with a
+fixed timestamp (SOURCE_DATE_EPOCH when set), so unchanged inputs give identical bytes.
+"""
+
+import copy
+import datetime
+import os
+import shutil
+import struct
+import tempfile
+import zipfile
+import zlib
+from xml.sax.saxutils import quoteattr
+
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import CONTENT_TYPES_URI, PACKAGE_URI
+from docx.opc.pkgwriter import _ContentTypesItem
+from docx.oxml import parse_xml
+from docx.oxml.ns import qn
+from lxml import etree
+
+from manual.fragments import append_fragment, media_path, remap_element
+
+# Already-compressed formats are stored as-is instead of being deflated a second time
+STORED_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif')
+
+MEDIA_CONTENT_TYPES = {
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'gif': 'image/gif',
+}
+
+def package_date_time():
+    """Return the timestamp of every package entry: SOURCE_DATE_EPOCH, or the zip epoch"""
+    epoch = os.environ.get('SOURCE_DATE_EPOCH')
+    if not epoch:
+        return (1980, 1, 1, 0, 0, 0)
+    stamp = datetime.datetime.fromtimestamp(int(epoch), datetime.timezone.utc)
+    return max((1980, 1, 1, 0, 0, 0), stamp.timetuple()[:6])
+
+def compress_type_for(name):
+    """Return the zip compression to use for an archive entry"""
+    if name.lower().endswith(STORED_EXTENSIONS):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+def zip_info(name):
+    """Return the ZipInfo of a package entry, with a fixed timestamp"""
+    info = zipfile.ZipInfo(name, package_date_time())
+    info.compress_type = compress_type_for(name)
+    info.external_attr = 0o600 << 16
+    return info
+
+class DocumentOutput:
+    """Default backend: stitch chapters into the in-memory document and save at the end"""
+
+    def __init__(self, path, doc):
+        self.path = path
+
+    def append_fragment(self, doc, fragment):
+        append_fragment(doc, fragment)
+
+    def close(self, doc):
+        self.save(package_entries(doc))
+
+    def save(self, entries, previous=None):
+        """Write entries to the output path atomically; return (entries reused, bytes copied)"""
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        reused, copied = write_package(tmp, entries, previous)
+        os.replace(tmp, self.path)
+        return reused, copied
+
+class StreamingDocxWriter:
+    """Low-memory backend that writes word/document.xml incrementally"""
+
+    def __init__(self, path, doc):
+        self.path = path
+        self.zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED)
+        # zipfile allows only one open entry at a time, so document.xml is spooled to a
+        # temporary file while media entries are added to the archive as they arrive
+        self.body = tempfile.TemporaryFile()
+        self.media = {}        # sha -> (rId, partname)
+        self.next_id = doc.part.next_id
+
+        shell = copy.deepcopy(doc.element)
+        for child in list(shell.body):
+            shell.body.remove(child)
+        head, tail = etree.tostring(shell, xml_declaration=True, encoding='UTF-8',
+                                    standalone=True).split(b'<w:body/>')
+        self.tail = tail
+        # Namespaces the document root declares; each body element would repeat them otherwise
+        self.declared = [f' xmlns:{prefix}="{uri}"' if prefix else f' xmlns="{uri}"'
+                         for prefix, uri in shell.nsmap.items()]
+        self.body.write(head + b'<w:body>')
+        self.flush(doc)
+
+    def flush(self, doc):
+        """Move everything in doc's body except the section properties to the output"""
+        for el in list(doc.element.body):
+            if el.tag == qn('w:sectPr'):
+                continue
+            self.next_id = remap_element(el, {}, self.next_id)
+            self.write_element(el)
+            doc.element.body.remove(el)
+
+    def append_fragment(self, doc, fragment):
+        self.flush(doc)
+        rid_map = {}
+        for old_rId, ref in fragment['media'].items():
+            rid_map[old_rId] = self.add_media(ref)
+        for xml in fragment['elements']:
+            el = parse_xml(xml)
+            self.next_id = remap_element(el, rid_map, self.next_id)
+            self.write_element(el)
+
+    def write_element(self, el):
+        """Write a body element without the namespace declarations the document root already makes"""
+        xml = etree.tostring(el, encoding='unicode')
+        end = xml.index('>')
+        start_tag = xml[:end]
+        for declaration in self.declared:
+            start_tag = start_tag.replace(declaration, '', 1)
+        self.body.write((start_tag + xml[end:]).encode('utf-8'))
+
+    def add_media(self, ref):
+        """Copy a media file into the archive once and return its relationship ID"""
+        if ref['sha'] not in self.media:
+            n = len(self.media) + 1
+            partname = f'word/media/image{n}{ref["ext"]}'
+            with open(media_path(ref), 'rb') as src, self.zip.open(zip_info(partname), 'w') as dest:
+                shutil.copyfileobj(src, dest)
+            self.media[ref['sha']] = (f'rIdImg{n}', partname)
+        return self.media[ref['sha']][0]
+
+    def close(self, doc):
+        self.flush(doc)
+        sect_pr = doc.element.body.find(qn('w:sectPr'))
+        if sect_pr is not None:
+            self.write_element(sect_pr)
+        self.body.write(b'</w:body>' + self.tail)
+
+        self.body.seek(0)
+        with self.zip.open(zip_info('word/document.xml'), 'w', force_zip64=True) as dest:
+            shutil.copyfileobj(self.body, dest)
+        self.body.close()
+
+        self.write_template_parts(doc)
+        self.zip.close()
+
+    def write_template_parts(self, doc):
+        """Write every part of the template package except the streamed document body"""
+        package = doc.part.package
+        overrides = {}
+        for part in package.iter_parts():
+            name = part.partname.lstrip('/')
+            ext = os.path.splitext(name)[1].lstrip('.').lower()
+            if ext not in MEDIA_CONTENT_TYPES:
+                overrides[part.partname] = part.content_type
+            if part is doc.part:
+                self.zip.writestr(zip_info('word/_rels/document.xml.rels'), self.document_rels(doc))
+                continue
+            self.zip.writestr(zip_info(name), part.blob)
+            if len(part.rels):
+                self.zip.writestr(zip_info(part.partname.rels_uri.lstrip('/')), part.rels.xml)
+        self.zip.writestr(zip_info('_rels/.rels'), package.rels.xml)
+        self.zip.writestr(zip_info('[Content_Types].xml'), content_types_xml(overrides))
+
+    def document_rels(self, doc):
+        """Return the document part's relationships plus one per streamed image"""
+        root = etree.fromstring(doc.part.rels.xml)
+        for rId, partname in self.media.values():
+            rel = etree.SubElement(root, root.tag.replace('Relationships', 'Relationship'))
+            rel.set('Id', rId)
+            rel.set('Type', RT.IMAGE)
+            rel.set('Target', partname[len('word/'):])
+        return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+class PatchingDocxOutput(DocumentOutput):
+    """In-memory backend that rewrites only the package entries that changed"""
+
+    def close(self, doc):
+        entries = package_entries(doc)
+        if os.path.exists(self.path) and zipfile.is_zipfile(self.path):
+            with zipfile.ZipFile(self.path) as previous:
+                reused, copied = self.save(entries, previous)
+        else:
+            reused, copied = self.save(entries)
+        print(f"♻️  Reused {reused} of {len(entries)} package entries ({copied / 1024:.0f} KB copied raw)")
+
+# Package backends by name, as selected with --stream / --patch
+OUTPUT_BACKENDS = {
+    'memory': DocumentOutput,
+    'stream': StreamingDocxWriter,
+    'patch': PatchingDocxOutput,
+}
+
+def package_entries(doc):
+    """Return the (member name, bytes) entries python-docx would save for doc, in its order"""
+    package = doc.part.package
+    parts = list(package.parts)
+    for part in parts:
+        part.before_marshal()
+    entries = [(CONTENT_TYPES_URI.membername, _ContentTypesItem.from_parts(parts).blob),
+               (PACKAGE_URI.rels_uri.membername, package.rels.xml)]
+    for part in parts:
+        entries.append((part.partname.membername, part.blob))
+        if len(part.rels):
+            entries.append((part.partname.rels_uri.membername, part.rels.xml))
+    return entries
+
+def write_package(path, entries, previous=None):
+    """Write (name, bytes) entries as a zip at path; return (entries reused, bytes copied).
+
+    Entries unchanged in the previous zip (same CRC-32 and size) have their compressed
+    bytes copied as they are. All entries get the fixed package_date_time().
+    """
+    old = {info.filename: info for info in previous.infolist()} if previous else {}
+    date_time = package_date_time()
+    reused = copied = 0
+    directory = []
+    with open(path, 'wb') as out:
+        for name, blob in entries:
+            crc = zlib.crc32(blob)
+            info = old.get(name)
+            if info and info.CRC == crc and info.file_size == len(blob) and not info.flag_bits & 0x1:
+                # Unchanged: copy the compressed bytes as they are
+                data = _raw_entry_data(previous.fp, info)
+                method = info.compress_type
+                reused += 1
+                copied += len(data)
+            else:
+                method = compress_type_for(name)
+                data = blob if method == zipfile.ZIP_STORED else _deflate(blob)
+            directory.append(_write_local_entry(out, name, data, crc, len(blob), method, date_time))
+        _write_central_directory(out, directory)
+    return reused, copied
+
+def _deflate(blob):
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+    return compressor.compress(blob) + compressor.flush()
+
+def _raw_entry_data(src, info):
+    """Read an entry's compressed bytes straight from the archive file"""
+    src.seek(info.header_offset)
+    header = src.read(30)
+    name_length, extra_length = struct.unpack('<HH', header[26:30])
+    src.seek(info.header_offset + 30 + name_length + extra_length)
+    return src.read(info.compress_size)
+
+def _dos_time(date_time):
+    year, month, day, hour, minute, second = date_time
+    return (hour << 11 | minute << 5 | second // 2), ((year - 1980) << 9 | month << 5 | day)
+
+def _write_local_entry(out, name, data, crc, size, method, date_time):
+    """Write one local file header plus data; return what its central directory record needs"""
+    offset = out.tell()
+    encoded = name.encode('utf-8')
+    if max(offset, len(data), size) >= 0xFFFFFFFF:
+        raise ValueError(f'{name}: package too large for patch mode; use --stream')
+    dos_time, dos_date = _dos_time(date_time)
+    out.write(struct.pack('<IHHHHHIIIHH', 0x04034B50, 20, 0, method, dos_time, dos_date,
+                          crc, len(data), size, len(encoded), 0))
+    out.write(encoded)
+    out.write(data)
+    return encoded, method, dos_time, dos_date, crc, len(data), size, offset
+
+def _write_central_directory(out, directory):
+    start = out.tell()
+    for encoded, method, dos_time, dos_date, crc, compressed, size, offset in directory:
+        out.write(struct.pack('<IHHHHHHIIIHHHHHII', 0x02014B50, 20, 20, 0, method, dos_time, dos_date,
+                              crc, compressed, size, len(encoded), 0, 0, 0, 0, 0, offset))
+        out.write(encoded)
+    end = out.tell()
+    out.write(struct.pack('<IHHHHIIH', 0x06054B50, 0, 0, len(directory), len(directory), end - start, start, 0))
+
+def content_types_xml(overrides):
+    """Return [Content_Types].xml for the given partname -> content type overrides"""
+    defaults = dict(MEDIA_CONTENT_TYPES)
+    defaults['rels'] = 'application/vnd.openxmlformats-package.relationships+xml'
+    defaults['xml'] = 'application/xml'
+    lines = ['<?xml version="1.0" encoding="UTF-8" standalone="yes"?>',
+             '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">']
+    for ext in sorted(defaults):
+        lines.append(f'<Default Extension={quoteattr(ext)} ContentType={quoteattr(defaults[ext])}/>')
+    for partname in sorted(overrides):
+        lines.append(f'<Override PartName={quoteattr(partname)} ContentType={quoteattr(overrides[partname])}/>')
+    lines.append('</Types>')
+    return ''.join(lines).encode('utf-8')
@@ -0,0 +1,350 @@
+"""
+Renderers that turn the content model (manual.model) into formats other than DOCX.
+- html: a static help site the Next.js app can serve from public/. One page per
+  chapter, screenshots offered in several widths through srcset and lazy-loaded, asset
+  names content-hashed so they can be cached forever, and text assets written next to
+  pre-compressed .gz (and .br when the brotli module is installed) copies.
+- markdown: one Markdown file per chapter plus an index, for wikis and repositories.
+
+Each renderer takes (nodes, output directory) and returns the list of files it wrote.
+The files are listed in a manifest in the output directory, so the next render removes
+only its own stale files; a non-empty directory without a manifest is refused.
+"""
+
+import gzip
+import html
+import io
+import json
+import os
+import re
+import shutil
+
+from manual.cache import cache_path, make_key, write_atomic
+from manual.fragments import media_path
+from manual.model import Heading, Image, Paragraph, Table
+
+try:
+    from PIL import Image as PILImage
+except ImportError:  # Pillow is optional; the site then serves each image at one size
+    PILImage = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; .gz copies are always written
+    brotli = None
+
+SITE_SETTINGS = {
+    'widths': [480, 960, 1440],
+    'max_display_width': 960,
+    'compress_min_bytes': 512,
+}
+
+# Pages with no meaning outside paged output; the site builds its own navigation
+SKIPPED_PAGES = ('Table of Contents',)
+
+# Lists the files a render wrote, relative to its output directory
+RENDER_MANIFEST = '.manual-render.json'
+
+# List paragraph styles and the HTML list each one belongs to
+LIST_STYLES = {'ListBullet': 'ul', 'ListBullet2': 'ul', 'ListNumber': 'ol'}
+
+SITE_CSS = """\
+*{box-sizing:border-box}
+body{margin:0;font:16px/1.55 system-ui,-apple-system,"Segoe UI",Roboto,sans-serif;color:#1f2933;background:#fff}
+.layout{display:flex;min-height:100vh}
+nav{flex:0 0 260px;padding:1rem;background:#f5f7fa;border-right:1px solid #e4e7eb;font-size:.9rem}
+nav ol{padding-left:1.1rem;margin:.25rem 0}
+nav a{color:#1f4e79;text-decoration:none}
+nav a[aria-current]{font-weight:600}
+main{flex:1;min-width:0;max-width:960px;padding:1rem 2rem}
+img{max-width:100%;height:auto}
+figure{margin:1rem 0;text-align:center}
+figcaption{font-size:.85rem;font-style:italic;color:#7b8794}
+.table-wrap{overflow-x:auto}
+table{border-collapse:collapse;margin:1rem 0;font-size:.9rem}
+th,td{border:1px solid #cbd2d9;padding:.3rem .5rem;text-align:left;vertical-align:top}
+th{background:#e4ecf7}
+.center{text-align:center}
+.pager{display:flex;justify-content:space-between;margin:2rem 0;padding-top:1rem;border-top:1px solid #e4e7eb}
+@media (max-width:800px){.layout{display:block}nav{border-right:0;border-bottom:1px solid #e4e7eb}main{padding:1rem}}
+"""
+
+def slugify(text):
+    """Return a URL-safe slug for a heading"""
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'section'
+
+def split_pages(nodes):
+    """Split nodes into (title, nodes) pages at level-1 headings"""
+    pages = [[None, []]]
+    for node in nodes:
+        if isinstance(node, Heading) and node.level == 1:
+            pages.append([node.text, []])
+        pages[-1][1].append(node)
+    first = pages[0]
+    title = next((n.text for n in first[1] if isinstance(n, Heading) and n.level == 0), 'Home')
+    first[0] = title
+    return [(title, page) for title, page in pages
+            if page and title not in SKIPPED_PAGES]
+
+def page_files(pages, ext):
+    """Return the output file name of each page: index for the first, slugs after it"""
+    return [f'index{ext}' if i == 0 else f'{slugify(title)}{ext}' for i, (title, _) in enumerate(pages)]
+
+def image_variants(ref, widths):
+    """Return [(pixel width, pixel height, path)] for an image resized to each width.
+
+    Widths larger than the image are dropped and the original is always included.
+    Resized copies are cached by image hash and width.
+    """
+    source = media_path(ref)
+    if PILImage is None:
+        return [(None, None, source)]
+    with PILImage.open(source) as im:
+        full = im.size
+        variants = []
+        for width in sorted(w for w in widths if w < full[0]):
+            height = round(full[1] * width / full[0])
+            path = cache_path('site', make_key('variant', ref['sha'], width), ref['ext'])
+            if not os.path.exists(path):
+                buf = io.BytesIO()
+                resized = im.convert('RGBA' if 'A' in im.getbands() else 'RGB').resize((width, height), PILImage.LANCZOS)
+                resized.save(buf, 'JPEG' if ref['ext'] in ('.jpg', '.jpeg') else 'PNG', optimize=True)
+                write_atomic(path, buf.getvalue())
+            variants.append((width, height, path))
+    variants.append((full[0], full[1], source))
+    return variants
+
+class _Assets:
+    """Copies images into the output once, under content-hashed names"""
+
+    def __init__(self, output_dir, widths):
+        self.output_dir = output_dir
+        self.widths = widths
+        self.written = {}
+        os.makedirs(os.path.join(output_dir, 'assets'), exist_ok=True)
+
+    def variants(self, ref):
+        if ref['sha'] not in self.written:
+            entries = []
+            for width, height, path in image_variants(ref, self.widths):
+                name = f"assets/{ref['sha'][:16]}-{width or 'full'}{ref['ext']}"
+                target = os.path.join(self.output_dir, name)
+                if not os.path.exists(target):
+                    shutil.copyfile(path, target)
+                entries.append((width, height, name))
+            self.written[ref['sha']] = entries
+        return self.written[ref['sha']]
+
+    def paths(self):
+        """Return the output paths of every image copied so far"""
+        return [os.path.join(self.output_dir, name) for entries in self.written.values() for _, _, name in entries]
+
+def check_output_dir(output_dir):
+    """Refuse to render into a non-empty directory that an earlier render did not create"""
+    if (os.path.isdir(output_dir) and os.listdir(output_dir)
+            and not os.path.exists(os.path.join(output_dir, RENDER_MANIFEST))):
+        raise ValueError(f'{output_dir} is not empty and holds no {RENDER_MANIFEST}; '
+                         'render into an empty or dedicated directory')
+
+def remove_stale(output_dir, written):
+    """Delete files the previous render listed but this one did not write; record the new list"""
+    manifest = os.path.join(output_dir, RENDER_MANIFEST)
+    previous = []
+    if os.path.exists(manifest):
+        with open(manifest, encoding='utf-8') as f:
+            previous = json.load(f)
+    current = sorted({os.path.relpath(path, output_dir).replace(os.sep, '/') for path in written})
+    for name in sorted(set(previous) - set(current)):
+        path = os.path.normpath(os.path.join(output_dir, name))
+        if os.path.relpath(path, output_dir).startswith('..') or not os.path.isfile(path):
+            continue
+        os.remove(path)
+        directory = os.path.dirname(path)
+        while os.path.abspath(directory) != os.path.abspath(output_dir) and not os.listdir(directory):
+            os.rmdir(directory)
+            directory = os.path.dirname(directory)
+    write_atomic(manifest, json.dumps(current, indent=1).encode('utf-8'))
+
+def _inline_html(runs):
+    parts = []
+    for text, bold, italic in runs:
+        text = html.escape(text).replace('\n', '<br>').replace('\t', '&emsp;')
+        if bold:
+            text = f'<strong>{text}</strong>'
+        if italic:
+            text = f'<em>{text}</em>'
+        parts.append(text)
+    return ''.join(parts)
+
+def _image_html(node, assets, settings):
+    variants = assets.variants(node.media)
+    width, height, src = variants[-1]
+    display = settings['max_display_width']
+    srcset = ', '.join(f'{name} {w}w' for w, _, name in variants if w)
+    size_attrs = f' width="{width}" height="{height}"' if width else ''
+    srcset_attrs = (f' srcset="{srcset}" sizes="(max-width: {display}px) 100vw, {display}px"'
+                    if len(variants) > 1 else '')
+    alt = html.escape(node.caption or 'Screenshot')
+    caption = f'<figcaption>{html.escape(node.caption)}</figcaption>' if node.caption else ''
+    return (f'<figure><img src="{src}"{srcset_attrs}{size_attrs} alt="{alt}" '
+            f'loading="lazy" decoding="async">{caption}</figure>')
+
+def _table_html(node):
+    rows = []
+    for i, row in enumerate(node.rows):
+        cell = 'th' if i == 0 and node.header else 'td'
+        cells = ''.join(f'<{cell}>{html.escape(text).replace(chr(10), "<br>")}</{cell}>' for text in row)
+        rows.append(f'<tr>{cells}</tr>')
+    return f'<div class="table-wrap"><table>{"".join(rows)}</table></div>'
+
+def _body_html(nodes, assets, settings):
+    out = []
+    in_list = None
+    for node in nodes:
+        is_item = isinstance(node, Paragraph) and node.style in LIST_STYLES
+        if in_list and (not is_item or LIST_STYLES[node.style] != in_list):
+            # A change between bulleted and numbered items starts a new list
+            out.append(f'</{in_list}>')
+            in_list = None
+        if isinstance(node, Heading):
+            level = min(node.level + 1, 6)
+            out.append(f'<h{level} id="{slugify(node.text)}">{html.escape(node.text)}</h{level}>')
+        elif isinstance(node, Image):
+            out.append(_image_html(node, assets, settings))
+        elif isinstance(node, Table):
+            out.append(_table_html(node))
+        elif is_item:
+            if not in_list:
+                in_list = LIST_STYLES[node.style]
+                out.append(f'<{in_list}>')
+            out.append(f'<li>{_inline_html(node.runs).lstrip("• ")}</li>')
+        elif node.text.strip():
+            cls = f' class="{node.align}"' if node.align else ''
+            out.append(f'<p{cls}>{_inline_html(node.runs)}</p>')
+    if in_list:
+        out.append(f'</{in_list}>')
+    return '\n'.join(out)
+
+def _nav_html(pages, files, current):
+    items = []
+    for i, ((title, nodes), name) in enumerate(zip(pages, files)):
+        attr = ' aria-current="page"' if i == current else ''
+        sub = ''
+        if i == current:
+            links = [f'<li><a href="#{slugify(n.text)}">{html.escape(n.text)}</a></li>'
+                     for n in nodes if isinstance(n, Heading) and n.level == 2]
+            sub = f'<ol>{"".join(links)}</ol>' if links else ''
+        items.append(f'<li><a href="{name}"{attr}>{html.escape(title)}</a>{sub}</li>')
+    return f'<nav><ol>{"".join(items)}</ol></nav>'
+
+def _pager_html(pages, files, i):
+    prev_link = f'<a href="{files[i - 1]}">← {html.escape(pages[i - 1][0])}</a>' if i > 0 else '<span></span>'
+    next_link = f'<a href="{files[i + 1]}">{html.escape(pages[i + 1][0])} →</a>' if i + 1 < len(pages) else '<span></span>'
+    return f'<div class="pager">{prev_link}{next_link}</div>'
+
+def precompress(path, settings=SITE_SETTINGS):
+    """Write .gz (and .br) copies of a text asset next to it; return their paths"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < settings['compress_min_bytes']:
+        return []
+    written = [path + '.gz']
+    # mtime=0 keeps the .gz bytes identical across builds of the same page
+    write_atomic(path + '.gz', gzip.compress(data, 9, mtime=0))
+    if brotli is not None:
+        write_atomic(path + '.br', brotli.compress(data))
+        written.append(path + '.br')
+    return written
+
+def render_html_site(nodes, output_dir, settings=None):
+    """Render the manual as a static HTML help site"""
+    check_output_dir(output_dir)
+    settings = dict(SITE_SETTINGS, **(settings or {}))
+    pages = split_pages(nodes)
+    files = page_files(pages, '.html')
+    assets = _Assets(output_dir, settings['widths'])
+    site_title = pages[0][0]
+
+    written = []
+    css_path = os.path.join(output_dir, 'assets', 'site.css')
+    write_atomic(css_path, SITE_CSS.encode('utf-8'))
+    written.append(css_path)
+    for i, ((title, page_nodes), name) in enumerate(zip(pages, files)):
+        page_title = site_title if i == 0 else f'{title} - {site_title}'
+        document = (
+            '<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+            '<meta name="viewport" content="width=device-width, initial-scale=1">\n'
+            f'<title>{html.escape(page_title)}</title>\n'
+            '<link rel="stylesheet" href="assets/site.css">\n</head>\n<body>\n<div class="layout">\n'
+            f'{_nav_html(pages, files, i)}\n<main>\n{_body_html(page_nodes, assets, settings)}\n'
+            f'{_pager_html(pages, files, i)}\n</main>\n</div>\n</body>\n</html>\n'
+        )
+        path = os.path.join(output_dir, name)
+        write_atomic(path, document.encode('utf-8'))
+        written.append(path)
+    for path in list(written):
+        written += precompress(path, settings)
+    written += assets.paths()
+    remove_stale(output_dir, written)
+    return written
+
+def _inline_markdown(runs):
+    parts = []
+    for text, bold, italic in runs:
+        text = text.replace('\t', ' ').replace('\n', '  \n')
+        stripped = text.strip()
+        if stripped and (bold or italic):
+            marker = '**' if bold else '_'
+            text = text.replace(stripped, f'{marker}{stripped}{marker}', 1)
+        parts.append(text)
+    return ''.join(parts)
+
+def _table_markdown(node):
+    rows = [[text.replace('|', '\\|').replace('\n', '<br>') for text in row] for row in node.rows]
+    if not rows:
+        return ''
+    cols = max(len(row) for row in rows)
+    rows = [row + [''] * (cols - len(row)) for row in rows]
+    # Markdown tables always have a header row; a blank one stands in when the source has none
+    header = rows.pop(0) if node.header else [''] * cols
+    lines = ['| ' + ' | '.join(header) + ' |', '|' + '---|' * cols]
+    lines += ['| ' + ' | '.join(row) + ' |' for row in rows]
+    return '\n'.join(lines)
+
+def render_markdown(nodes, output_dir, settings=None):
+    """Render the manual as Markdown files, one per chapter"""
+    check_output_dir(output_dir)
+    pages = split_pages(nodes)
+    files = page_files(pages, '.md')
+    assets = _Assets(output_dir, [])
+
+    written = []
+    for (title, page_nodes), name in zip(pages, files):
+        blocks = []
+        for node in page_nodes:
+            if isinstance(node, Heading):
+                blocks.append('#' * max(node.level, 1) + ' ' + node.text)
+            elif isinstance(node, Image):
+                _, _, src = assets.variants(node.media)[-1]
+                blocks.append(f'![{node.caption or "Screenshot"}]({src})' +
+                              (f'\n\n_{node.caption}_' if node.caption else ''))
+            elif isinstance(node, Table):
+                blocks.append(_table_markdown(node))
+            elif node.text.strip():
+                text = _inline_markdown(node.runs)
+                if node.style in LIST_STYLES:
+                    marker = '1. ' if LIST_STYLES[node.style] == 'ol' else '- '
+                    text = marker + text.lstrip('• ')
+                blocks.append(text)
+        path = os.path.join(output_dir, name)
+        write_atomic(path, ('\n\n'.join(blocks) + '\n').encode('utf-8'))
+        written.append(path)
+    written += assets.paths()
+    remove_stale(output_dir, written)
+    return written
+
+# Output formats besides DOCX, by name
+RENDERERS = {
+    'html': render_html_site,
+    'markdown': render_markdown,
+}
@@ -0,0 +1,216 @@
+"""
+Columnar ingest of roster CSVs for data-driven manual content.
+Two layouts are understood:
+
+- Google Sheet exports such as 'data/Roster - Sheet2.csv': two header rows (weekday
+  names, then 'Employee ID' and date labels like '1Oct'), team names carried down from
+  the row above, and trailing per-code count columns.
+- Roster templates such as 'data/roster_templates/November-2025.csv': one header row
+  'Employee ID,Employee Name,Team,Day1,...' with the team on every row.
+
+A parsed roster is an integer-coded shift matrix plus employee, team and date index
+arrays. Results are cached as .npy files keyed by the source hash and loaded
+memory-mapped, so later builds skip CSV parsing entirely.
+"""
+
+import csv
+import json
+import os
+import re
+
+import numpy as np
+
+from manual.cache import cache_path, file_digest, make_key, write_atomic
+
+# Bump when the parsed layout changes
+ROSTER_FORMAT_VERSION = 1
+
+# Code 0 is a blank cell; codes not listed here are appended as they are first seen
+SHIFT_CODES = ('', 'M2', 'M3', 'M4', 'D1', 'D2', 'DO', 'SL', 'CL', 'EL', 'HL')
+
+# Display text per shift code, mirroring SHIFT_MAP in lib/constants.ts
+SHIFT_LABELS = {
+    'M2': '8 AM – 5 PM',
+    'G': '9 AM – 6 PM',
+    'M3': '9 AM – 6 PM',
+    'M4': '10 AM – 7 PM',
+    'D1': '12 PM – 9 PM',
+    'D2': '1 PM – 10 PM',
+    'DO': 'OFF',
+    'SL': 'Sick Leave',
+    'CL': 'Casual Leave',
+    'EL': 'Emergency Leave',
+    'HL': 'Holiday Leave',
+    '': 'N/A',
+}
+
+DATE_HEADER = re.compile(r'^(\d{1,2})[-.\s]*(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)', re.I)
+
+class Roster:
+    """One roster file in columnar form"""
+
+    __slots__ = ('source', 'codes', 'shifts', 'dates', 'employee_ids', 'employee_names',
+                 'teams', 'team_index', 'summary_columns', 'summary')
+
+    def __init__(self, source, codes, shifts, dates, employee_ids, employee_names,
+                 teams, team_index, summary_columns=(), summary=None):
+        self.source = source
+        self.codes = tuple(codes)                  # code value -> shift code string
+        self.shifts = shifts                       # int8 [employee, day] code values
+        self.dates = list(dates)                   # date labels, e.g. '1Oct' or 'Day1'
+        self.employee_ids = list(employee_ids)
+        self.employee_names = list(employee_names)
+        self.teams = list(teams)                   # distinct team names in file order
+        self.team_index = team_index               # int16 [employee] -> index into teams
+        self.summary_columns = list(summary_columns)
+        if summary is None:
+            summary = np.zeros((len(self.employee_ids), 0), dtype=np.int32)
+        self.summary = summary                     # int32 [employee, summary column]
+
+    def __len__(self):
+        return len(self.employee_ids)
+
+    def code(self, name):
+        """Return the integer value of a shift code, or -1 if it never occurs"""
+        try:
+            return self.codes.index(name)
+        except ValueError:
+            return -1
+
+    def employee_row(self, employee_id):
+        """Return the shift codes of one employee as strings, or None if not present"""
+        try:
+            i = self.employee_ids.index(employee_id)
+        except ValueError:
+            return None
+        return [self.codes[c] for c in self.shifts[i]]
+
+def _clean(value):
+    # Sheets pad names and IDs with spaces and sometimes stray quotes
+    return value.strip().strip('"').strip()
+
+def parse_roster_csv(path):
+    """Parse a roster CSV into a Roster"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        rows = [[_clean(cell) for cell in row] for row in csv.reader(f)]
+    if not rows:
+        raise ValueError(f'{path}: empty roster')
+    if rows[0] and rows[0][0].lower() == 'employee id':
+        return _parse_template(path, rows)
+    return _parse_sheet(path, rows)
+
+def _parse_sheet(path, rows):
+    if len(rows) < 3:
+        raise ValueError(f'{path}: expected two header rows and at least one employee')
+    header = rows[1]
+    date_cols = [i for i in range(3, len(header)) if DATE_HEADER.match(header[i])]
+    if not date_cols:
+        raise ValueError(f'{path}: no date headers found in the second header row')
+    last_date = date_cols[-1]
+    summary_cols = [i for i in range(last_date + 1, len(header)) if header[i]]
+    dates = [_normalize_date(header[i]) for i in date_cols]
+
+    records = []
+    team = ''
+    for row in rows[2:]:
+        row = row + [''] * (len(header) - len(row))
+        if row[0]:
+            team = row[0]
+        name, employee_id = row[1], row[2]
+        # Legend and total rows at the bottom have no employee ID
+        if not (name and employee_id):
+            continue
+        shifts = [row[i] for i in date_cols]
+        counts = [_to_int(row[i]) for i in summary_cols]
+        records.append((employee_id, name, team, shifts, counts))
+    return _build(path, dates, records, [header[i] for i in summary_cols])
+
+def _parse_template(path, rows):
+    header = rows[0]
+    dates = [h for h in header[3:] if h]
+    records = []
+    for row in rows[1:]:
+        row = row + [''] * (len(header) - len(row))
+        employee_id, name, team = row[0], row[1], row[2]
+        if not (name and employee_id):
+            continue
+        records.append((employee_id, name, team, row[3:3 + len(dates)], []))
+    return _build(path, dates, records, [])
+
+def _normalize_date(raw):
+    # Same normalisation as normalizeDateHeader in lib/utils.ts: '01-oct' -> '1Oct'
+    match = DATE_HEADER.match(raw.replace(' ', ''))
+    return f'{int(match.group(1))}{match.group(2).capitalize()}'
+
+def _to_int(value):
+    try:
+        return int(float(value))
+    except ValueError:
+        return 0
+
+def _build(path, dates, records, summary_columns):
+    codes = list(SHIFT_CODES)
+    lookup = {code: i for i, code in enumerate(codes)}
+    teams = []
+    team_lookup = {}
+
+    shifts = np.zeros((len(records), len(dates)), dtype=np.int8)
+    team_index = np.zeros(len(records), dtype=np.int16)
+    summary = np.zeros((len(records), len(summary_columns)), dtype=np.int32)
+    for i, (_, _, team, row, counts) in enumerate(records):
+        if team not in team_lookup:
+            team_lookup[team] = len(teams)
+            teams.append(team)
+        team_index[i] = team_lookup[team]
+        for j, value in enumerate(row):
+            value = value.upper()
+            if value not in lookup:
+                lookup[value] = len(codes)
+                codes.append(value)
+            shifts[i, j] = lookup[value]
+        summary[i, :len(counts)] = counts
+
+    return Roster(
+        source=os.path.relpath(path),
+        codes=codes,
+        shifts=shifts,
+        dates=dates,
+        employee_ids=[r[0] for r in records],
+        employee_names=[r[1] for r in records],
+        teams=teams,
+        team_index=team_index,
+        summary_columns=summary_columns,
+        summary=summary,
+    )
+
+ARRAY_FIELDS = ('shifts', 'team_index', 'summary')
+META_FIELDS = ('source', 'codes', 'dates', 'employee_ids', 'employee_names', 'teams', 'summary_columns')
+
+def save_roster(roster, directory):
+    """Write a roster as .npy arrays plus a JSON metadata file"""
+    os.makedirs(directory, exist_ok=True)
+    for field in ARRAY_FIELDS:
+        tmp = os.path.join(directory, f'{field}.{os.getpid()}.tmp.npy')
+        np.save(tmp, getattr(roster, field))
+        os.replace(tmp, os.path.join(directory, f'{field}.npy'))
+    meta = {field: getattr(roster, field) for field in META_FIELDS}
+    # meta.json is written last and marks the entry as complete
+    write_atomic(os.path.join(directory, 'meta.json'), json.dumps(meta).encode('utf-8'))
+
+def open_roster(directory):
+    """Load a saved roster with its arrays memory-mapped read-only"""
+    with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+        meta = json.load(f)
+    arrays = {field: np.load(os.path.join(directory, f'{field}.npy'), mmap_mode='r')
+              for field in ARRAY_FIELDS}
+    return Roster(**meta, **arrays)
+
+def load_roster(path, use_cache=True):
+    """Return the Roster for a CSV, parsing it only when its contents changed"""
+    if not use_cache:
+        return parse_roster_csv(path)
+    key = make_key('roster', ROSTER_FORMAT_VERSION, file_digest(path))
+    directory = cache_path('roster', key)
+    if not os.path.exists(os.path.join(directory, 'meta.json')):
+        save_roster(parse_roster_csv(path), directory)
+    return open_roster(directory)
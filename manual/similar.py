@@ -0,0 +1,191 @@
+"""
+Near-duplicate screenshot detection.
+Screenshots are compared by a difference hash (a 256-bit perceptual hash that survives
+re-encoding and small changes). For a near-duplicate pair of the same size, the region
+that actually changed is the largest cluster of tiles whose pixels differ, which skips
+scattered noise such as clocks and counters. With delta rendering enabled, add_screenshot
+embeds only that region of a follow-up shot; `python -m manual.similar` reports every
+redundant pair and the bytes delta rendering would save.
+"""
+
+import argparse
+import glob
+import json
+import os
+
+from manual.assets import asset_digest, asset_size
+from manual.cache import cache_path, make_key, write_atomic
+
+try:
+    from PIL import Image, ImageChops, ImageStat
+except ImportError:  # Pillow is optional; no near-duplicates are detected without it
+    Image = None
+
+SIMILARITY_SETTINGS = {
+    'hash_size': 16,        # hash is hash_size x hash_size bits
+    'max_distance': 24,     # differing hash bits still counted as a near-duplicate
+    'pixel_threshold': 40,  # grey-level difference counted as a changed pixel
+    'tile': 32,             # changed pixels are grouped in tiles of this many pixels
+    'tile_threshold': 0.02, # fraction of changed pixels that marks a tile as changed
+    'max_area': 0.5,        # larger changed regions are embedded in full instead
+    'max_mean_difference': 8,  # a larger mean channel difference is a global change (e.g. a theme)
+    'margin': 16,           # pixels kept around the changed region
+}
+
+SCREENSHOT_FILES = 'MANUAL_SCREENSHOTS/**/*.png'
+
+def perceptual_hash(path, settings=None):
+    """Return the difference hash of an image as an int, cached by file digest"""
+    settings = dict(SIMILARITY_SETTINGS, **(settings or {}))
+    n = settings['hash_size']
+    cached = cache_path('phash', make_key('dhash', asset_digest(path), n), '.txt')
+    if os.path.exists(cached):
+        with open(cached, encoding='utf-8') as f:
+            return int(f.read(), 16)
+    with Image.open(path) as im:
+        small = im.convert('L').resize((n + 1, n), Image.Resampling.LANCZOS)
+    pixels = small.tobytes()
+    bits = 0
+    for y in range(n):
+        row = pixels[y * (n + 1):(y + 1) * (n + 1)]
+        for x in range(n):
+            bits = bits << 1 | (row[x] > row[x + 1])
+    write_atomic(cached, format(bits, 'x').encode('ascii'))
+    return bits
+
+def hash_distance(a, b):
+    """Return the number of differing bits between two hashes"""
+    return bin(a ^ b).count('1')
+
+def is_near_duplicate(a, b, settings=None):
+    """Return whether two screenshots are perceptually near-identical"""
+    if Image is None:
+        return False
+    settings = dict(SIMILARITY_SETTINGS, **(settings or {}))
+    return hash_distance(perceptual_hash(a, settings), perceptual_hash(b, settings)) <= settings['max_distance']
+
+def changed_region(base, path, settings=None):
+    """Return the (x0, y0, x1, y1) box of path that differs from base, or None.
+
+    None means the images differ in size, are identical, changed over more than max_area
+    of the frame or changed colour overall. Results are cached by both file digests.
+    """
+    settings = dict(SIMILARITY_SETTINGS, **(settings or {}))
+    sizes = asset_size(base), asset_size(path)
+    if None not in sizes and sizes[0] != sizes[1]:
+        # Differently sized shots never have a delta region; the manifest knows without decoding
+        return None
+    cached = cache_path('delta', make_key('region', asset_digest(base), asset_digest(path), settings), '.json')
+    if os.path.exists(cached):
+        with open(cached, encoding='utf-8') as f:
+            region = json.load(f)['region']
+        return tuple(region) if region else None
+
+    region = _changed_region(base, path, settings)
+    write_atomic(cached, json.dumps({'region': region}).encode('utf-8'))
+    return tuple(region) if region else None
+
+def _changed_region(base, path, settings):
+    with Image.open(base) as a, Image.open(path) as b:
+        if a.size != b.size:
+            return None
+        threshold = settings['pixel_threshold']
+        difference = ImageChops.difference(a.convert('RGB'), b.convert('RGB'))
+        if max(ImageStat.Stat(difference).mean) > settings['max_mean_difference']:
+            return None
+        mask = difference.convert('L').point(lambda v: 255 if v > threshold else 0)
+    width, height = mask.size
+    tile = settings['tile']
+    cols, rows = -(-width // tile), -(-height // tile)
+    # Box-resampling the mask gives each tile's share of changed pixels
+    shares = mask.resize((cols, rows), Image.Resampling.BOX).tobytes()
+    changed = {(i % cols, i // cols) for i, share in enumerate(shares) if share > settings['tile_threshold'] * 255}
+    if not changed:
+        return None
+
+    # Largest cluster of changed tiles, where tiles up to one tile apart are joined
+    best, seen = [], set()
+    for start in changed:
+        if start in seen:
+            continue
+        cluster, pending = [], [start]
+        seen.add(start)
+        while pending:
+            x, y = pending.pop()
+            cluster.append((x, y))
+            for dx in (-2, -1, 0, 1, 2):
+                for dy in (-2, -1, 0, 1, 2):
+                    neighbour = (x + dx, y + dy)
+                    if neighbour in changed and neighbour not in seen:
+                        seen.add(neighbour)
+                        pending.append(neighbour)
+        if len(cluster) > len(best):
+            best = cluster
+
+    margin = settings['margin']
+    x0 = max(0, min(x for x, _ in best) * tile - margin)
+    y0 = max(0, min(y for _, y in best) * tile - margin)
+    x1 = min(width, (max(x for x, _ in best) + 1) * tile + margin)
+    y1 = min(height, (max(y for _, y in best) + 1) * tile + margin)
+    if (x1 - x0) * (y1 - y0) > settings['max_area'] * width * height:
+        return None
+    return [x0, y0, x1, y1]
+
+def near_duplicates(paths, settings=None):
+    """Return (earlier, later, distance) for every near-duplicate pair, in path order"""
+    settings = dict(SIMILARITY_SETTINGS, **(settings or {}))
+    hashes = [(path, perceptual_hash(path, settings)) for path in paths]
+    pairs = []
+    for i, (a, hash_a) in enumerate(hashes):
+        for b, hash_b in hashes[i + 1:]:
+            distance = hash_distance(hash_a, hash_b)
+            if distance <= settings['max_distance']:
+                pairs.append((a, b, distance))
+    return pairs
+
+def redundancy_report(paths, settings=None):
+    """Return a row per near-duplicate pair with its changed region and embedded sizes"""
+    from manual.images import optimize_screenshot
+
+    rows = []
+    for base, path, distance in near_duplicates(paths, settings):
+        region = changed_region(base, path, settings)
+        full, _ = optimize_screenshot(path)
+        delta = optimize_screenshot(path, crop=region, zoom=False)[0] if region else full
+        with Image.open(path) as im:
+            area = (region[2] - region[0]) * (region[3] - region[1]) / (im.width * im.height) if region else 1.0
+        rows.append({
+            'base': base,
+            'path': path,
+            'distance': distance,
+            'region': region,
+            'area': area,
+            'full_bytes': os.path.getsize(full),
+            'delta_bytes': os.path.getsize(delta),
+        })
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Report near-duplicate manual screenshots')
+    parser.add_argument('paths', nargs='*', help=f'screenshots to compare (default: {SCREENSHOT_FILES})')
+    parser.add_argument('--max-distance', type=int, default=SIMILARITY_SETTINGS['max_distance'],
+                        help='differing hash bits still counted as a near-duplicate')
+    args = parser.parse_args()
+    if Image is None:
+        raise SystemExit('❌ Pillow is required for screenshot comparison')
+
+    paths = args.paths or sorted(glob.glob(SCREENSHOT_FILES, recursive=True))
+    rows = redundancy_report(paths, {'max_distance': args.max_distance})
+    print(f"🔍 {len(rows)} near-duplicate pairs among {len(paths)} screenshots\n")
+    print(f"  {'follow-up shot':<46}{'similar to':<40}{'bits':>5}{'changed':>9}{'full':>10}{'delta':>10}")
+    saved = {}
+    for row in rows:
+        changed = f"{row['area']:.0%}" if row['region'] else 'all'
+        print(f"  {row['path'][-45:]:<46}{os.path.basename(row['base'])[:39]:<40}{row['distance']:>5}"
+              f"{changed:>9}{row['full_bytes'] / 1024:>8.1f}KB{row['delta_bytes'] / 1024:>8.1f}KB")
+        saved[row['path']] = max(saved.get(row['path'], 0), row['full_bytes'] - row['delta_bytes'])
+    print(f"\n💾 Delta rendering (--delta-screenshots) would save up to {sum(saved.values()) / 1024:.1f} KB "
+          f"across {sum(1 for n in saved.values() if n > 0)} screenshots")
+
+if __name__ == '__main__':
+    main()
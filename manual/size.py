@@ -0,0 +1,146 @@
+"""
+Package size report and budgets for the manual.
+A saved .docx is broken down into the compressed bytes of each numbered chapter (its
+share of word/document.xml plus the media it is first to reference; unnumbered Heading1
+sections count towards the chapter before them), each embedded image and
+XML versus media overall. Budgets cap any of these; a build that exceeds one fails,
+so an oversized screenshot is caught before the manual hits attachment limits.
+"""
+
+import re
+import zipfile
+
+from docx.oxml.ns import qn
+from lxml import etree
+
+# Default budgets; override with --budget KEY=SIZE. Keys: total, xml, media, image
+# (any single embedded image) and chapter:N (chapter number N). 'none' removes a budget.
+SIZE_BUDGETS = {
+    'total': '5MB',
+    'image': '150KB',
+}
+
+SIZE_UNITS = {'': 1, 'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+SIZE = re.compile(r'^\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*$', re.I)
+
+R_EMBED = qn('r:embed')
+REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+def parse_size(text):
+    """Return the byte count of a size such as '150KB', '2.5MB' or '4096'"""
+    match = SIZE.match(text)
+    if not match:
+        raise ValueError(f'invalid size: {text!r}')
+    number, unit = match.groups()
+    return int(float(number) * SIZE_UNITS[unit.upper()])
+
+def parse_budgets(overrides=()):
+    """Return {key: bytes} from SIZE_BUDGETS updated with 'KEY=SIZE' overrides"""
+    budgets = dict(SIZE_BUDGETS)
+    for item in overrides:
+        key, sep, value = item.partition('=')
+        if not sep or not re.match(r'^(total|xml|media|image|chapter:\w+)$', key.strip()):
+            raise ValueError(f'invalid budget {item!r}; expected KEY=SIZE with KEY total, xml, media, image or chapter:N')
+        budgets[key.strip()] = value.strip()
+    return {key: parse_size(value) for key, value in budgets.items() if value and value.lower() != 'none'}
+
+def _chapter_title(p):
+    style = p.find(f"{qn('w:pPr')}/{qn('w:pStyle')}")
+    if style is None or style.get(qn('w:val')) != 'Heading1':
+        return None
+    return ''.join(t.text or '' for t in p.iter(qn('w:t'))).strip()
+
+def size_report(path):
+    """Return the size breakdown of a saved manual package"""
+    with zipfile.ZipFile(path) as archive:
+        entries = {info.filename: info for info in archive.infolist()}
+        body = etree.fromstring(archive.read('word/document.xml')).find(qn('w:body'))
+        rels = etree.fromstring(archive.read('word/_rels/document.xml.rels'))
+    targets = {rel.get('Id'): 'word/' + rel.get('Target').lstrip('/').removeprefix('word/')
+               for rel in rels.iter(f'{REL_NS}Relationship') if rel.get('TargetMode') != 'External'}
+
+    chapters = [{'title': 'Front matter', 'xml_raw': 0, 'images': []}]
+    images = {}
+    for el in body:
+        title = _chapter_title(el) if el.tag == qn('w:p') else None
+        # Unnumbered Heading1s (Table of Contents, Support & Contact) stay in the chapter before them
+        if title and chapter_number(title):
+            chapters.append({'title': title, 'xml_raw': 0, 'images': []})
+        chapter = chapters[-1]
+        chapter['xml_raw'] += len(etree.tostring(el, encoding='UTF-8'))
+        for blip in el.iter(qn('a:blip')):
+            part = targets.get(blip.get(R_EMBED))
+            if part not in entries or part in images:
+                continue
+            source = next(el.iter(qn('pic:cNvPr')), None)
+            images[part] = {
+                'part': part,
+                'source': source.get('name') if source is not None else part,
+                'chapter': chapter['title'],
+                'bytes': entries[part].compress_size,
+            }
+            chapter['images'].append(part)
+
+    # Chapters share one compressed document.xml; each gets its share by raw size
+    document = entries['word/document.xml']
+    raw_total = sum(c['xml_raw'] for c in chapters) or 1
+    for chapter in chapters:
+        chapter['xml'] = round(document.compress_size * chapter['xml_raw'] / raw_total)
+        chapter['media'] = sum(images[part]['bytes'] for part in chapter['images'])
+        chapter['bytes'] = chapter['xml'] + chapter['media']
+
+    media = sum(info.compress_size for name, info in entries.items() if name.startswith('word/media/'))
+    xml = sum(info.compress_size for name, info in entries.items() if not name.startswith('word/media/'))
+    return {
+        'path': path,
+        'total': sum(info.compress_size for info in entries.values()),
+        'xml': xml,
+        'media': media,
+        'chapters': chapters,
+        'images': sorted(images.values(), key=lambda image: -image['bytes']),
+    }
+
+def chapter_number(title):
+    """Return the number of a chapter heading such as '2. Client Panel User Guide'"""
+    return title.split('.')[0] if title[:1].isdigit() else None
+
+def check_budgets(report, budgets):
+    """Return a message for every budget the report exceeds"""
+    failures = []
+    for key in ('total', 'xml', 'media'):
+        if key in budgets and report[key] > budgets[key]:
+            failures.append(f"{key} is {format_size(report[key])} (budget {format_size(budgets[key])})")
+    for chapter in report['chapters']:
+        limit = budgets.get(f"chapter:{chapter_number(chapter['title'])}")
+        if limit is not None and chapter['bytes'] > limit:
+            failures.append(f"chapter '{chapter['title']}' is {format_size(chapter['bytes'])} "
+                            f"(budget {format_size(limit)})")
+    if 'image' in budgets:
+        for image in report['images']:
+            if image['bytes'] > budgets['image']:
+                failures.append(f"image {image['source']} in '{image['chapter']}' is "
+                                f"{format_size(image['bytes'])} (budget {format_size(budgets['image'])})")
+    return failures
+
+def format_size(n):
+    """Return a byte count, or a signed change in one, as B/KB/MB/GB text"""
+    sign = '-' if n < 0 else ''
+    n = abs(n)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if n < 1024 or unit == 'GB':
+            return f'{sign}{n:.0f} {unit}' if unit == 'B' else f'{sign}{n:.1f} {unit}'
+        n /= 1024
+
+def print_size_report(report, images=10):
+    """Print the chapter, XML/media and largest-image breakdown of a package"""
+    total = report['total'] or 1
+    print(f"\n📦 {report['path']}: {format_size(report['total'])} "
+          f"(XML {format_size(report['xml'])}, media {format_size(report['media'])})")
+    print(f"  {'chapter':<44}{'xml':>11}{'media':>11}{'total':>11}{'share':>8}")
+    for chapter in report['chapters']:
+        print(f"  {chapter['title'][:43]:<44}{format_size(chapter['xml']):>11}{format_size(chapter['media']):>11}"
+              f"{format_size(chapter['bytes']):>11}{chapter['bytes'] / total:>8.0%}")
+    print(f"  {'largest images':<44}{'':>11}{'bytes':>11}")
+    for image in report['images'][:images]:
+        source = image['source'] if len(image['source']) <= 54 else '…' + image['source'][-53:]
+        print(f"  {source:<55}{format_size(image['bytes']):>11}")
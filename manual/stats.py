@@ -0,0 +1,71 @@
+"""
+Shift-distribution statistics over parsed rosters.
+All counting is done with np.bincount over the encoded shift matrix, so the cost is a
+few array passes per roster regardless of how many employees and days it holds.
+"""
+
+import numpy as np
+
+# Codes reported in the statistics tables, in display order
+STAT_CODES = ('HL', 'M2', 'M3', 'M4', 'D1', 'D2', 'DO', 'SL', 'EL', 'CL')
+
+def employee_code_counts(roster):
+    """Return an [employee, code value] matrix of how often each code occurs"""
+    n_codes = len(roster.codes)
+    n = len(roster)
+    flat = np.arange(n, dtype=np.int64)[:, None] * n_codes + roster.shifts
+    return np.bincount(flat.ravel(), minlength=n * n_codes).reshape(n, n_codes)
+
+def team_code_counts(roster):
+    """Return a [team, code value] matrix of how often each code occurs"""
+    n_codes = len(roster.codes)
+    n_teams = len(roster.teams)
+    flat = roster.team_index.astype(np.int64)[:, None] * n_codes + roster.shifts
+    return np.bincount(flat.ravel(), minlength=n_teams * n_codes).reshape(n_teams, n_codes)
+
+def select_codes(counts, roster, codes=STAT_CODES):
+    """Reorder count columns to `codes`; codes absent from the roster count as zero"""
+    # Column -1 is an appended zero column, which is what roster.code() returns for misses
+    padded = np.concatenate([counts, np.zeros((counts.shape[0], 1), dtype=counts.dtype)], axis=1)
+    return padded[:, [roster.code(code) for code in codes]]
+
+def summary_mismatches(roster, counts):
+    """Compare computed counts with the sheet's own per-code count columns.
+
+    Returns (employee index, column name, sheet value, computed value) tuples.
+    """
+    mismatches = []
+    for k, column in enumerate(roster.summary_columns):
+        code = roster.code(column)
+        computed = counts[:, code] if code >= 0 else np.zeros(len(roster), dtype=counts.dtype)
+        expected = roster.summary[:, k]
+        for i in np.nonzero(computed != expected)[0]:
+            mismatches.append((int(i), column, int(expected[i]), int(computed[i])))
+    return mismatches
+
+def shift_statistics(rosters, codes=STAT_CODES):
+    """Aggregate per-team and per-employee code counts across rosters.
+
+    Returns a dict with 'codes', 'teams' (team -> counts), 'employees'
+    (employee ID -> (name, team, counts)) and 'mismatches' (rows of
+    source, employee ID, name, column, sheet value, computed value).
+    """
+    teams = {}
+    employees = {}
+    mismatches = []
+    for roster in rosters:
+        per_employee = employee_code_counts(roster)
+        per_team = select_codes(team_code_counts(roster), roster, codes)
+        for t, team in enumerate(roster.teams):
+            teams[team] = teams.get(team, 0) + per_team[t]
+
+        selected = select_codes(per_employee, roster, codes)
+        for i, employee_id in enumerate(roster.employee_ids):
+            team = roster.teams[roster.team_index[i]]
+            _, _, previous = employees.get(employee_id, (None, None, 0))
+            employees[employee_id] = (roster.employee_names[i], team, previous + selected[i])
+
+        for i, column, expected, computed in summary_mismatches(roster, per_employee):
+            mismatches.append((roster.source, roster.employee_ids[i], roster.employee_names[i],
+                               column, expected, computed))
+    return {'codes': codes, 'teams': teams, 'employees': employees, 'mismatches': mismatches}
@@ -0,0 +1,183 @@
+"""
+Build tracing for the manual.
+When enabled, spans around section builders, screenshots, chapter stitching and the
+package save record wall time, CPU time, net Python heap growth and peak heap (via
+tracemalloc), plus any byte counts the caller attaches. Events are written in the
+Chrome trace format, viewable in chrome://tracing or https://ui.perfetto.dev, and a
+summary table is printed at the end of the run. Disabled tracing costs one global lookup.
+CPU time and tracemalloc figures are process-wide, so they are recorded only for spans
+on each process's main thread, and they include anything a concurrent thread (the
+screenshot pool) allocates meanwhile. Spans on other threads record wall time alone.
+
+Worker processes inherit tracing (through the environment when they are spawned) and
+append their events to per-process part files that finish_trace() merges.
+"""
+
+import functools
+import glob
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from manual.size import format_size
+
+TRACE_ENV = 'MANUAL_TRACE'
+
+_tracer = None
+
+class Tracer:
+    """Collects complete ('X') events for one trace file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def part_path(self):
+        return f'{self.path}.{os.getpid()}.part'
+
+    def stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def write(self, event):
+        line = json.dumps(event, default=str) + '\n'
+        with self.lock, open(self.part_path(), 'a', encoding='utf-8') as f:
+            f.write(line)
+
+def enable_trace(path):
+    """Start tracing into a Chrome trace file at path; child processes inherit it"""
+    global _tracer
+    path = os.path.abspath(path)
+    for part in glob.glob(f'{path}.*.part'):
+        os.remove(part)
+    os.environ[TRACE_ENV] = path
+    _tracer = Tracer(path)
+    return _tracer
+
+@contextmanager
+def span(name, category='build', **args):
+    """Time a block as one trace event; the yielded dict takes extra args such as byte counts"""
+    tracer = _tracer
+    if tracer is None:
+        yield args
+        return
+
+    if threading.current_thread() is not threading.main_thread():
+        # Process-wide heap figures would mix in allocations of concurrent threads
+        start = time.perf_counter_ns()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter_ns()
+            tracer.write({
+                'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                'ts': start // 1000, 'dur': (end - start) // 1000, 'args': args,
+            })
+        return
+
+    stack = tracer.stack()
+    heap_start, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    frame = {'peak': heap_start}
+    stack.append(frame)
+    start, cpu = time.perf_counter_ns(), time.process_time_ns()
+    try:
+        yield args
+    finally:
+        end, cpu = time.perf_counter_ns(), time.process_time_ns() - cpu
+        heap_end, peak = tracemalloc.get_traced_memory()
+        stack.pop()
+        peak = max(peak, frame['peak'])
+        if stack:
+            # Child spans reset the peak counter, so carry this span's peak up to its parent
+            stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+        tracer.write({
+            'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+            'ts': start // 1000, 'dur': (end - start) // 1000,
+            'args': dict(args, cpu_ms=round(cpu / 1e6, 3), alloc_bytes=heap_end - heap_start,
+                         peak_bytes=peak - heap_start),
+        })
+
+def traced(func, category='section'):
+    """Wrap a function so every call is traced under its name"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _tracer is None:
+            return func(*args, **kwargs)
+        with span(func.__name__, category):
+            return func(*args, **kwargs)
+    return wrapper
+
+def instrument(namespace, prefix, category='section'):
+    """Trace every function in a module namespace whose name starts with prefix"""
+    module = namespace.get('__name__')
+    for name, value in list(namespace.items()):
+        if (name.startswith(prefix) and callable(value) and getattr(value, '__module__', None) == module
+                and not hasattr(value, '__wrapped__')):
+            namespace[name] = traced(value, category)
+
+def finish_trace():
+    """Merge the events of every process into the trace file and return them"""
+    global _tracer
+    tracer = _tracer
+    if tracer is None:
+        return []
+    events = []
+    for part in sorted(glob.glob(f'{tracer.path}.*.part')):
+        with open(part, encoding='utf-8') as f:
+            events += [json.loads(line) for line in f if line.strip()]
+        os.remove(part)
+    events.sort(key=lambda e: e['ts'])
+
+    main_pid = os.getpid()
+    names = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'args': {'name': 'main' if pid == main_pid else f'worker {pid}'}}
+             for pid in sorted({e['pid'] for e in events})]
+    with open(tracer.path, 'w', encoding='utf-8') as f:
+        json.dump({'traceEvents': names + events, 'displayTimeUnit': 'ms'}, f)
+    os.environ.pop(TRACE_ENV, None)
+    _tracer = None
+    return events
+
+def summarize(events, limit=15):
+    """Print per-category tables of the slowest spans, aggregated by name"""
+    totals = {}
+    for e in events:
+        row = totals.setdefault((e['cat'], e['name']),
+                                {'calls': 0, 'wall': 0, 'cpu': None, 'alloc': 0, 'peak': 0, 'bytes': 0})
+        row['calls'] += 1
+        row['wall'] += e['dur'] / 1000
+        row['bytes'] += e['args'].get('bytes', 0)
+        if 'cpu_ms' not in e['args']:
+            # Spans off the main thread have no CPU or memory figures
+            continue
+        row['cpu'] = (row['cpu'] or 0) + e['args']['cpu_ms']
+        row['alloc'] += e['args'].get('alloc_bytes', 0)
+        row['peak'] = max(row['peak'], e['args'].get('peak_bytes', 0))
+
+    for category in dict.fromkeys(cat for cat, _ in totals):
+        rows = sorted(((name, row) for (cat, name), row in totals.items() if cat == category),
+                      key=lambda item: -item[1]['wall'])
+        print(f"\n⏱️  {category} ({len(rows)})")
+        print(f"  {'name':<44}{'calls':>6}{'wall ms':>10}{'cpu ms':>10}{'alloc':>11}{'peak':>11}{'bytes':>11}")
+        for name, row in rows[:limit]:
+            label = name if len(name) <= 43 else '…' + name[-42:]
+            if row['cpu'] is None:
+                print(f"  {label:<44}{row['calls']:>6}{row['wall']:>10.1f}{'':>10}{'':>11}{'':>11}"
+                      f"{format_size(row['bytes']) if row['bytes'] else '':>11}")
+                continue
+            print(f"  {label:<44}{row['calls']:>6}{row['wall']:>10.1f}{row['cpu']:>10.1f}"
+                  f"{format_size(row['alloc']):>11}{format_size(row['peak']):>11}"
+                  f"{format_size(row['bytes']) if row['bytes'] else '':>11}")
+        if len(rows) > limit:
+            print(f"  ... {len(rows) - limit} more")
+
+if os.environ.get(TRACE_ENV) and _tracer is None:
+    # Spawned worker processes pick tracing up from the parent's environment
+    _tracer = Tracer(os.environ[TRACE_ENV])
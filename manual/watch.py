@@ -0,0 +1,141 @@
+"""
+Watch mode for the manual.
+Input files are polled for changes (mtime and size, so no extra dependency is needed);
+a burst of saves is debounced into one rebuild, and the rebuild itself only re-renders
+sections whose fragment cache keys changed. Edits to the generator's own code restart
+the process instead, since cached keys and imported builders would be stale.
+
+The HTML preview is served from localhost; every page gets a small script that polls
+the build counter and reloads the page when a rebuild finishes.
+"""
+
+import glob
+import os
+import sys
+import threading
+import time
+import traceback
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+WATCH_SETTINGS = {
+    'interval': 0.2,   # seconds between polls
+    'debounce': 0.3,   # quiet period after the last change before rebuilding
+}
+
+# Generator code; a change restarts the watcher
+CODE_FILES = ('generate_manual.py', 'manual/*.py')
+
+RELOAD_SCRIPT = b"""<script>
+(function () {
+  var build = null;
+  setInterval(function () {
+    fetch('/__build', {cache: 'no-store'}).then(function (r) { return r.text(); }).then(function (id) {
+      if (build !== null && id !== build) { location.reload(); }
+      build = id;
+    }).catch(function () {});
+  }, 500);
+})();
+</script>
+"""
+
+def snapshot(files):
+    """Return {path: (mtime_ns, size)} for the files that exist"""
+    state = {}
+    for path in files:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+def changed_files(before, after):
+    """Return the paths added, removed or modified between two snapshots"""
+    return sorted(path for path in before.keys() | after.keys() if before.get(path) != after.get(path))
+
+def code_files():
+    """Return the generator's source files"""
+    return sorted(path for pattern in CODE_FILES for path in glob.glob(pattern))
+
+class _PreviewHandler(SimpleHTTPRequestHandler):
+    """Serves the preview directory, injecting the reload script into HTML pages"""
+
+    def __init__(self, *args, server_state=None, **kwargs):
+        self.server_state = server_state
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        if self.path == '/__build':
+            return self._send(str(self.server_state['build']).encode(), 'text/plain')
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            path = os.path.join(path, 'index.html')
+        if path.endswith('.html') and os.path.exists(path):
+            with open(path, 'rb') as f:
+                page = f.read()
+            return self._send(page.replace(b'</body>', RELOAD_SCRIPT + b'</body>'), 'text/html; charset=utf-8')
+        return super().do_GET()
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def serve_preview(directory, port=8000):
+    """Serve directory on localhost in a background thread; return the build state dict.
+
+    Increment state['build'] after each rebuild to make open pages reload.
+    """
+    state = {'build': 0}
+    os.makedirs(directory, exist_ok=True)
+    handler = partial(_PreviewHandler, directory=directory, server_state=state)
+    ThreadingHTTPServer.allow_reuse_address = True
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return state
+
+def restart():
+    """Replace this process with a fresh run of the same command"""
+    print("🔁 Generator code changed; restarting")
+    sys.stdout.flush()
+    os.execv(sys.executable, [sys.executable] + sys.argv)
+
+def watch(input_files, rebuild, settings=None):
+    """Call rebuild(changed_paths) whenever any file from input_files() changes.
+
+    input_files is called on every poll, so newly referenced files are picked up.
+    Runs until interrupted.
+    """
+    settings = dict(WATCH_SETTINGS, **(settings or {}))
+    code = snapshot(code_files())
+    inputs = snapshot(input_files())
+    pending, last_change = set(), None
+    while True:
+        time.sleep(settings['interval'])
+        if changed_files(code, snapshot(code_files())):
+            restart()
+        current = snapshot(input_files())
+        changed = changed_files(inputs, current)
+        inputs = current
+        if changed:
+            pending.update(changed)
+            last_change = time.monotonic()
+            continue
+        if pending and time.monotonic() - last_change >= settings['debounce']:
+            paths, pending = sorted(pending), set()
+            print(f"\n✏️  Changed: {', '.join(paths[:5])}" + (f" and {len(paths) - 5} more" if len(paths) > 5 else ''))
+            start = time.perf_counter()
+            try:
+                rebuild(paths)
+            except Exception as e:
+                print(f"❌ Rebuild failed: {e}")
+                traceback.print_exc()
+                continue
+            print(f"⚡ Rebuilt in {time.perf_counter() - start:.2f}s")
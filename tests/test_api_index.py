@@ -0,0 +1,76 @@
+"""
+API reference extraction from Next.js route handlers.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from manual.api_index import describe_response, error_statuses, parse_route_file, success_response
+
+ROUTE = """import { NextRequest, NextResponse } from 'next/server';
+import { getSessionUser } from '@/lib/auth';
+
+// export async function PUT(req: NextRequest) is not exported yet
+export async function GET(req: NextRequest, { params }: { params: { team: string } }) {
+  const { searchParams } = new URL(req.url);
+  const month = searchParams.get('month');
+  /* the roster is read straight from the store */
+  return NextResponse.json({ team: params.team, month, shifts: [], count: 0 });
+}
+
+export async function POST(req: NextRequest) {
+  if (!getSessionUser()) return NextResponse.json({error:'Unauthorized'},{status:401});
+  const body = await req.json();
+  const { employeeId, shift: newShift } = body;
+  if (!employeeId) return NextResponse.json({ error: 'employeeId is required' }, { status: 400 });
+  return NextResponse.json({ success: true, note: 'saved, pending' });
+}
+
+export function DELETE() {
+  return new NextResponse(csv, { headers: { 'Content-Type': 'text/csv' } });
+}
+"""
+
+class ParseRouteFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, 'app', 'api')
+        directory = os.path.join(self.root, 'admin', 'roster', '[team]')
+        os.makedirs(directory)
+        self.path = os.path.join(directory, 'route.ts')
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(ROUTE)
+        self.routes = {route['method']: route for route in parse_route_file(self.path, self.root)}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_handlers_and_path(self):
+        self.assertEqual(sorted(self.routes), ['DELETE', 'GET', 'POST'])
+        get = self.routes['GET']
+        self.assertEqual(get['path'], '/api/admin/roster/[team]')
+        self.assertEqual(get['path_params'], ['team'])
+        self.assertEqual(get['query_params'], ['month'])
+        self.assertFalse(get['auth'])
+
+    def test_request_fields(self):
+        post = self.routes['POST']
+        self.assertTrue(post['auth'])
+        self.assertEqual(post['json_fields'], ['employeeId', 'shift'])
+
+    def test_responses(self):
+        post = self.routes['POST']
+        self.assertEqual(error_statuses(post), [400, 401])
+        self.assertEqual(describe_response(success_response(post)), '{"success": true, "note": "string"}')
+        self.assertEqual(describe_response(success_response(self.routes['GET'])),
+                         '{"team": ..., "month": ..., "shifts": [...], "count": 0}')
+        self.assertEqual(describe_response(success_response(self.routes['DELETE'])), 'text/csv file download')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Screenshot manifest bookkeeping and near-duplicate detection on generated images.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from PIL import Image, ImageDraw, ImageOps
+
+from manual import cache
+from manual.assets import asset_info, manifest_path, record_variant, refresh_manifest
+from manual.cache import file_digest
+from manual.similar import changed_region, is_near_duplicate, near_duplicates
+
+def screen(changed=False):
+    """Return a 400x300 mock screenshot; changed adds a small badge"""
+    im = Image.new('RGB', (400, 300), (245, 245, 250))
+    draw = ImageDraw.Draw(im)
+    draw.rectangle([0, 0, 399, 40], fill=(30, 60, 120))
+    for i in range(5):
+        draw.rectangle([20, 60 + i * 45, 380, 90 + i * 45], fill=(200, 210, 230), outline=(90, 90, 90))
+    draw.rectangle([300, 250, 380, 285], fill=(40, 160, 80))
+    if changed:
+        draw.rectangle([200, 120, 240, 160], fill=(220, 40, 40))
+    return im
+
+class AssetTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = cache.CACHE_DIR
+        cache.CACHE_DIR = os.path.join(self.tmp.name, 'cache')
+
+    def tearDown(self):
+        cache.CACHE_DIR = self.cache_dir
+        self.tmp.cleanup()
+
+    def save(self, name, im, **params):
+        path = os.path.join(self.tmp.name, name)
+        im.save(path, **params)
+        return path
+
+class ManifestTest(AssetTestCase):
+
+    def test_asset_info_rereads_changed_files(self):
+        path = self.save('shot.png', screen(), dpi=(144, 144))
+        info = asset_info(path)
+        self.assertEqual((info['width'], info['height'], round(info['dpi'])), (400, 300, 144))
+        self.assertEqual(info['sha256'], file_digest(path))
+        self.save('shot.png', screen().resize((200, 150)))
+        info = asset_info(path)
+        self.assertEqual((info['width'], info['height']), (200, 150))
+        self.assertEqual(info['sha256'], file_digest(path))
+        self.assertIsNone(asset_info(os.path.join(self.tmp.name, 'missing.png')))
+
+    def test_refresh_manifest(self):
+        pattern = os.path.join(self.tmp.name, '*.png')
+        first = self.save('a.png', screen())
+        self.save('b.png', screen(changed=True))
+        self.assertEqual(refresh_manifest(pattern), (2, 2, 0))
+        self.assertEqual(refresh_manifest(pattern), (2, 0, 0))
+        self.save('b.png', screen().resize((200, 150)))
+        self.assertEqual(refresh_manifest(pattern), (2, 1, 0))
+        os.remove(first)
+        self.assertEqual(refresh_manifest(pattern), (1, 0, 1))
+
+    def test_variants_of_earlier_versions_are_dropped(self):
+        path = self.save('shot.png', screen())
+        location = self.save('processed.png', screen().resize((100, 75)))
+        record_variant(path, 'old', location, 6.0)
+        self.save('shot.png', screen(changed=True))
+        record_variant(path, 'new', location, 6.0)
+        with sqlite3.connect(manifest_path()) as db:
+            rows = db.execute('SELECT key, sha256 FROM variants').fetchall()
+        self.assertEqual(rows, [('new', file_digest(path))])
+
+class SimilarTest(AssetTestCase):
+
+    def test_near_duplicates(self):
+        base = self.save('base.png', screen())
+        badge = self.save('badge.png', screen(changed=True))
+        inverted = self.save('inverted.png', ImageOps.invert(screen()))
+        self.assertTrue(is_near_duplicate(base, badge))
+        self.assertFalse(is_near_duplicate(base, inverted))
+        self.assertEqual([(a, b) for a, b, _ in near_duplicates([base, badge, inverted])], [(base, badge)])
+
+    def test_changed_region(self):
+        base = self.save('base.png', screen())
+        badge = self.save('badge.png', screen(changed=True))
+        x0, y0, x1, y1 = changed_region(base, badge)
+        self.assertTrue(x0 <= 200 and y0 <= 120 and x1 >= 240 and y1 >= 160)
+        self.assertLess((x1 - x0) * (y1 - y0), 0.5 * 400 * 300)
+        # Cached answers are the same
+        self.assertEqual(changed_region(base, badge), (x0, y0, x1, y1))
+        self.assertIsNone(changed_region(base, self.save('copy.png', screen())))
+        self.assertIsNone(changed_region(base, self.save('small.png', screen().resize((200, 150)))))
+        self.assertIsNone(changed_region(base, self.save('inverted.png', ImageOps.invert(screen()))))
+
+if __name__ == '__main__':
+    unittest.main()
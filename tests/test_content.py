@@ -0,0 +1,71 @@
+"""
+Parsing of the declarative content source format.
+"""
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from manual.content import Conditional, PageBreak, Screenshot, parse_content
+from manual.model import Heading, Paragraph, Table
+
+SOURCE = """# Client Guide
+<!-- not rendered -->
+Log in with your **Employee ID**.
+- first
+  - nested
+#. step
+\\- literal dash
+| Field | Meaning |
+|---|:---:|
+| ID | Employee ID |
+{style: Light List Accent 1}
+![Login page](MANUAL_SCREENSHOTS/client/login.png){crop: 0,0,100,50; callout: 1,2,3,4}
+{pagebreak}
+{if role!=admin}
+Super admins only.
+{end}
+"""
+
+class ParseContentTest(unittest.TestCase):
+
+    def test_nodes(self):
+        nodes = parse_content(SOURCE, 'guide.md')
+        kinds = [type(node) for node in nodes]
+        self.assertEqual(kinds, [Heading, Paragraph, Paragraph, Paragraph, Paragraph, Paragraph, Table,
+                                 Screenshot, PageBreak, Conditional])
+        heading, intro, bullet, nested, numbered, literal, table, shot, _, condition = nodes
+        self.assertEqual((heading.level, heading.text), (1, 'Client Guide'))
+        self.assertEqual(intro.runs, [('Log in with your ', False, False), ('Employee ID', True, False),
+                                      ('.', False, False)])
+        self.assertEqual([bullet.style, nested.style, numbered.style], ['ListBullet', 'ListBullet2', 'ListNumber'])
+        self.assertEqual(literal.runs, [('- literal dash', False, False)])
+        self.assertTrue(table.header)
+        self.assertEqual(table.rows, [['Field', 'Meaning'], ['ID', 'Employee ID']])
+        self.assertEqual(table.style, 'Light List Accent 1')
+        self.assertEqual((shot.path, shot.caption), ('MANUAL_SCREENSHOTS/client/login.png', 'Login page'))
+        self.assertEqual((shot.crop, shot.callouts), ((0, 0, 100, 50), ((1, 2, 3, 4),)))
+        self.assertTrue(condition.applies({'role': 'super_admin'}))
+        self.assertFalse(condition.applies({'role': 'admin'}))
+        self.assertEqual(len(condition.children), 1)
+
+    def test_syntax_errors(self):
+        cases = {
+            'Text\n|---|---|\n': 'guide.md:2: header rule without a table row above it',
+            '{style: Light List}\n': 'guide.md:1: {style} must follow a table',
+            '{end}\n': 'guide.md:1: {end} without {if}',
+            '{if role=admin}\nText\n': 'guide.md: {if} without {end}',
+            '{toc}\n': 'guide.md:1: unknown directive {toc}',
+            '![A](a.png){zoom: 2}\n': "guide.md:1: invalid screenshot option 'zoom: 2'",
+        }
+        for source, message in cases.items():
+            with self.subTest(source=source):
+                with self.assertRaises(ValueError) as raised:
+                    parse_content(source, 'guide.md')
+                self.assertEqual(str(raised.exception), message)
+
+if __name__ == '__main__':
+    unittest.main()
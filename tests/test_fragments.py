@@ -0,0 +1,46 @@
+"""
+Fragment cache keys: a section must be rebuilt whenever anything its builder reads changes,
+including module-level data such as the API descriptions.
+"""
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import generate_manual
+from manual.fragments import builder_constants, fragment_key
+
+class FragmentKeyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        os.chdir(ROOT)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def test_builder_constants_lists_module_data(self):
+        constants = builder_constants(generate_manual.add_api_documentation)
+        self.assertIn('API_DESCRIPTIONS', constants)
+        self.assertIn('API_SECTIONS', constants)
+        self.assertNotIn('add_table', constants)
+
+    def test_changed_module_constant_misses_cache(self):
+        builder = generate_manual.add_api_documentation
+        descriptions = generate_manual.API_DESCRIPTIONS
+        name = next(iter(descriptions))
+        before = fragment_key(builder)
+        self.assertEqual(before, fragment_key(builder))
+        original = descriptions[name]
+        descriptions[name] = f'{original} (edited)'
+        try:
+            self.assertNotEqual(before, fragment_key(builder))
+        finally:
+            descriptions[name] = original
+        self.assertEqual(before, fragment_key(builder))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Package backends: the streaming and patching writers must produce the same document as
+the default in-memory backend.
+"""
+
+import hashlib
+import io
+import os
+import re
+import sys
+import tempfile
+import unittest
+import zipfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from docx import Document
+from docx.shared import Inches
+from lxml import etree
+from PIL import Image
+
+from manual import cache
+from manual.emit import add_table
+from manual.fragments import render_fragment
+from manual.package import OUTPUT_BACKENDS
+
+def png(color):
+    buf = io.BytesIO()
+    Image.new('RGB', (40, 20), color).save(buf, 'PNG')
+    buf.seek(0)
+    return buf
+
+def add_chapter(doc, color):
+    doc.add_heading('Section', 2)
+    doc.add_paragraph('Body text with ').add_run('bold').bold = True
+    add_table(doc, [('a', 'b'), ('c', 'd')], header=['One', 'Two'], style='Light Grid Accent 1')
+    doc.add_picture(png(color), width=Inches(1))
+    # The same image twice is stored once
+    doc.add_picture(png(color), width=Inches(1))
+
+def write(backend, path, fragments):
+    doc = Document()
+    doc.add_heading('Manual', 0)
+    output = OUTPUT_BACKENDS[backend](path, doc)
+    for n, fragment in enumerate(fragments, 1):
+        doc.add_heading(f'{n}. Chapter', 1)
+        output.append_fragment(doc, fragment)
+    output.close(doc)
+
+def document_xml(path):
+    with zipfile.ZipFile(path) as archive:
+        return archive.read('word/document.xml')
+
+def canonical(xml):
+    """Return document XML in canonical form with relationship IDs blanked out"""
+    return re.sub(rb'rId\w+', b'rId', etree.tostring(etree.fromstring(xml), method='c14n'))
+
+def media_digests(path):
+    with zipfile.ZipFile(path) as archive:
+        return sorted(hashlib.sha256(archive.read(name)).hexdigest()
+                      for name in archive.namelist() if name.startswith('word/media/'))
+
+class BackendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = cache.CACHE_DIR
+        cache.CACHE_DIR = os.path.join(self.tmp.name, 'cache')
+        self.fragments = [render_fragment(add_chapter, ('red',)), render_fragment(add_chapter, ('blue',))]
+        self.memory = os.path.join(self.tmp.name, 'memory.docx')
+        write('memory', self.memory, self.fragments)
+
+    def tearDown(self):
+        cache.CACHE_DIR = self.cache_dir
+        self.tmp.cleanup()
+
+    def test_stream_matches_memory(self):
+        path = os.path.join(self.tmp.name, 'stream.docx')
+        write('stream', path, self.fragments)
+        expected, actual = document_xml(self.memory), document_xml(path)
+        self.assertEqual(canonical(actual), canonical(expected))
+        # Namespaces are declared on the root once, not on every body element
+        self.assertEqual(actual.count(b'xmlns'), expected.count(b'xmlns'))
+        self.assertEqual(media_digests(path), media_digests(self.memory))
+        self.assertEqual(len(media_digests(path)), 2)
+        Document(path)
+
+    def test_patch_matches_memory(self):
+        path = os.path.join(self.tmp.name, 'patch.docx')
+        with open(self.memory, 'rb') as f:
+            expected = f.read()
+        # Once without a previous package, then patching the first one, then patching another build
+        for fragments in (self.fragments, self.fragments, self.fragments[:1], self.fragments):
+            write('patch', path, fragments)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Reproducibility of the manual package: a cold build (empty cache) and builds that read
+back the cached API index and fragments must produce byte-identical files.
+"""
+
+import hashlib
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Builds the full manual into argv[1] with the given create_manual keyword arguments
+BUILD = """
+import sys
+import generate_manual
+generate_manual.MANUAL_VARIANTS['full']['output'] = sys.argv[1]
+generate_manual.create_manual(**eval(sys.argv[2]))
+"""
+
+def build(cache_dir, output, **kwargs):
+    """Build the manual in a subprocess using cache_dir; return the output's SHA-256"""
+    env = dict(os.environ, MANUAL_CACHE_DIR=cache_dir)
+    subprocess.run([sys.executable, '-c', BUILD, output, repr(kwargs)], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    with open(output, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class ReproducibleBuildTest(unittest.TestCase):
+
+    def test_cold_and_warm_builds_match(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = os.path.join(tmp, 'cache')
+            output = os.path.join(tmp, 'manual.docx')
+            cold = build(cache_dir, output)
+            warm = build(cache_dir, output, force=True)
+            uncached = build(cache_dir, output, use_cache=False)
+        self.assertEqual(cold, warm)
+        self.assertEqual(cold, uncached)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Roster ingest, shift statistics and staffing coverage on small hand-written rosters.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import generate_manual
+from manual import cache
+from manual.coverage import assigned_days, coverage_gaps, coverage_matrix
+from manual.roster import load_roster, parse_roster_csv
+from manual.stats import STAT_CODES, shift_statistics
+
+# Google Sheet export: weekday and date header rows, team carried down, per-code count columns
+SHEET = """Team,Employee Name,,Wed,Thu,Fri,,DO,M2
+,,Employee ID,1Oct,2-oct,3Oct,,DO,M2
+VOICE,Ana,E1,M2,DO,M2,,1,2
+,Ben,E2,d1,M2,,,0,5
+CHAT,Cy,E3,DO,DO,DO,,3,0
+,M2 = 8 AM - 5 PM,,,,,,,
+"""
+
+# Roster template with the second day not scheduled yet
+TEMPLATE = """Employee ID,Employee Name,Team,Day1,Day2
+E1,Ana,VOICE,M2,
+E2,Ben,VOICE,,
+"""
+
+EMPTY_TEMPLATE = """Employee ID,Employee Name,Team,Day1,Day2
+E1,Ana,VOICE,,
+"""
+
+class RosterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_dir = cache.CACHE_DIR
+        cache.CACHE_DIR = os.path.join(self.tmp.name, 'cache')
+
+    def tearDown(self):
+        cache.CACHE_DIR = self.cache_dir
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_parse_sheet(self):
+        roster = parse_roster_csv(self.write('sheet.csv', SHEET))
+        self.assertEqual(roster.dates, ['1Oct', '2Oct', '3Oct'])
+        self.assertEqual(roster.employee_ids, ['E1', 'E2', 'E3'])
+        self.assertEqual(roster.teams, ['VOICE', 'CHAT'])
+        self.assertEqual([roster.teams[t] for t in roster.team_index], ['VOICE', 'VOICE', 'CHAT'])
+        self.assertEqual(roster.employee_row('E2'), ['D1', 'M2', ''])
+        self.assertEqual(roster.summary_columns, ['DO', 'M2'])
+        self.assertIsNone(roster.employee_row('E9'))
+
+    def test_parse_template(self):
+        roster = parse_roster_csv(self.write('template.csv', TEMPLATE))
+        self.assertEqual(roster.dates, ['Day1', 'Day2'])
+        self.assertEqual(roster.teams, ['VOICE'])
+        self.assertEqual(roster.employee_row('E1'), ['M2', ''])
+
+    def test_cached_roster_matches_parse(self):
+        path = self.write('sheet.csv', SHEET)
+        parsed = parse_roster_csv(path)
+        for _ in range(2):
+            loaded = load_roster(path)
+            np.testing.assert_array_equal(loaded.shifts, parsed.shifts)
+            self.assertEqual(loaded.codes, parsed.codes)
+            self.assertEqual(loaded.employee_names, parsed.employee_names)
+
+    def test_shift_statistics(self):
+        roster = parse_roster_csv(self.write('sheet.csv', SHEET))
+        stats = shift_statistics([roster])
+        m2, do = STAT_CODES.index('M2'), STAT_CODES.index('DO')
+        name, team, counts = stats['employees']['E1']
+        self.assertEqual((name, team, counts[m2], counts[do]), ('Ana', 'VOICE', 2, 1))
+        self.assertEqual(stats['teams']['VOICE'][m2], 3)
+        self.assertEqual(stats['teams']['CHAT'][do], 3)
+        # Ben's sheet claims five M2 shifts but only one is entered
+        self.assertEqual(stats['mismatches'], [(roster.source, 'E2', 'Ben', 'M2', 5, 1)])
+
+    def test_coverage_gaps(self):
+        roster = parse_roster_csv(self.write('sheet.csv', SHEET))
+        gaps = coverage_gaps(roster, coverage_matrix(roster))
+        self.assertEqual(gaps, [
+            ('VOICE', '1Oct', 21, 22),
+            ('VOICE', '2Oct', 17, 22),
+            ('VOICE', '3Oct', 17, 22),
+            ('CHAT', '1Oct', 8, 22),
+            ('CHAT', '2Oct', 8, 22),
+            ('CHAT', '3Oct', 8, 22),
+        ])
+
+    def test_unscheduled_days_are_not_gaps(self):
+        roster = parse_roster_csv(self.write('template.csv', TEMPLATE))
+        self.assertEqual(assigned_days(roster).tolist(), [True, False])
+        self.assertEqual(coverage_gaps(roster, coverage_matrix(roster)), [('VOICE', 'Day1', 17, 22)])
+
+        empty = parse_roster_csv(self.write('empty.csv', EMPTY_TEMPLATE))
+        self.assertFalse(assigned_days(empty).any())
+        self.assertEqual(coverage_gaps(empty, coverage_matrix(empty)), [])
+
+    def test_roster_paths_skip_templates(self):
+        self.write('data/Roster.csv', SHEET)
+        self.write('data/2025/December.csv', SHEET)
+        self.write('data/roster_templates/November-2025.csv', EMPTY_TEMPLATE)
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            paths = generate_manual.roster_paths()
+        finally:
+            os.chdir(cwd)
+        self.assertEqual(paths, [os.path.join('data', '2025', 'December.csv'), os.path.join('data', 'Roster.csv')])
+
+if __name__ == '__main__':
+    unittest.main()
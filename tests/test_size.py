@@ -0,0 +1,80 @@
+"""
+Package size reports and budget checks.
+"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from docx import Document
+from docx.shared import Inches
+from PIL import Image
+
+from manual.size import check_budgets, format_size, parse_budgets, parse_size, size_report
+
+def noise_png(size):
+    buf = io.BytesIO()
+    Image.frombytes('L', size, os.urandom(size[0] * size[1])).save(buf, 'PNG')
+    buf.seek(0)
+    return buf
+
+class SizeReportTest(unittest.TestCase):
+
+    def test_parse_size_and_budgets(self):
+        self.assertEqual(parse_size('150KB'), 150 * 1024)
+        self.assertEqual(parse_size('2.5 mb'), int(2.5 * 1024 ** 2))
+        self.assertEqual(parse_size('4096'), 4096)
+        with self.assertRaises(ValueError):
+            parse_size('lots')
+        budgets = parse_budgets(['chapter:2=10KB', 'image=none', 'xml=1MB'])
+        self.assertEqual(budgets, {'total': 5 * 1024 ** 2, 'chapter:2': 10 * 1024, 'xml': 1024 ** 2})
+        with self.assertRaises(ValueError):
+            parse_budgets(['pages=10'])
+
+    def test_format_size(self):
+        self.assertEqual(format_size(512), '512 B')
+        self.assertEqual(format_size(1536), '1.5 KB')
+        self.assertEqual(format_size(-3 * 1024 ** 2), '-3.0 MB')
+        self.assertEqual(format_size(2 * 1024 ** 3), '2.0 GB')
+
+    def test_check_budgets(self):
+        report = {
+            'total': 300, 'xml': 100, 'media': 200,
+            'chapters': [{'title': 'Front matter', 'bytes': 50}, {'title': '1. Intro', 'bytes': 250}],
+            'images': [{'source': 'a.png', 'chapter': '1. Intro', 'bytes': 200}],
+        }
+        self.assertEqual(check_budgets(report, {'total': 300, 'chapter:1': 250, 'image': 200}), [])
+        self.assertEqual(check_budgets(report, {'media': 199, 'chapter:1': 249, 'image': 150}), [
+            'media is 200 B (budget 199 B)',
+            "chapter '1. Intro' is 250 B (budget 249 B)",
+            "image a.png in '1. Intro' is 200 B (budget 150 B)",
+        ])
+
+    def test_size_report_chapters(self):
+        doc = Document()
+        doc.add_heading('Table of Contents', 1)
+        doc.add_heading('1. Intro', 1)
+        doc.add_picture(noise_png((64, 64)), width=Inches(1))
+        # Unnumbered Heading1s belong to the chapter before them
+        doc.add_heading('Support & Contact', 1)
+        doc.add_heading('2. Usage', 1)
+        doc.add_paragraph('text')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'manual.docx')
+            doc.save(path)
+            report = size_report(path)
+        self.assertEqual([c['title'] for c in report['chapters']], ['Front matter', '1. Intro', '2. Usage'])
+        intro = report['chapters'][1]
+        self.assertEqual(len(report['images']), 1)
+        self.assertEqual(report['images'][0]['chapter'], '1. Intro')
+        self.assertEqual(intro['media'], report['media'])
+        self.assertEqual(report['chapters'][2]['media'], 0)
+        self.assertEqual(report['total'], report['xml'] + report['media'])
+
+if __name__ == '__main__':
+    unittest.main()